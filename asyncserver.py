@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+CHEN-KIT Asyncio Front End
+HTTP/1.1 on asyncio.start_server for the dashboard's Handler. The event loop
+reads requests and holds idle keep-alive connections; each request then runs
+the unchanged Handler.do_GET / do_POST against in-memory buffers on a thread
+pool. A phone idling on slow Wi-Fi costs a coroutine, not a thread.
+"""
+
+import asyncio
+import io
+import os
+import socket
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+MAX_HEAD = 64 * 1024            # request line + headers, like BaseHTTPRequestHandler's line limit
+MAX_BODY = 16 * 1024 * 1024     # edit forms and shopping list actions are a few kB
+
+
+def buffered_handler(handler_class, server, client_address, head):
+    """A handler instance for one request, reading from and writing to bytes instead of a socket.
+
+    BaseRequestHandler.__init__ would run the whole connection, so the
+    attributes it sets up are filled in here and parse_request() reads
+    the headers from head.
+    """
+    handler = handler_class.__new__(handler_class)
+    handler.server = server
+    handler.request = None
+    handler.client_address = client_address
+    handler.directory = os.getcwd()      # SimpleHTTPRequestHandler's default
+    line, _, headers = head.partition(b'\r\n')
+    handler.raw_requestline = line + b'\r\n'
+    handler.rfile = io.BytesIO(headers)
+    handler.wfile = io.BytesIO()
+    handler.close_connection = True
+    # The loop answers Expect: 100-continue itself, before it reads the body
+    handler.handle_expect_100 = lambda: True
+    return handler
+
+
+def dispatch(handler) -> bool:
+    """handle_one_request() minus the socket: run do_<METHOD>. False if it raised"""
+    method = getattr(handler, 'do_' + handler.command, None)
+    if method is None:
+        handler.send_error(HTTPStatus.NOT_IMPLEMENTED, f"Unsupported method ({handler.command!r})")
+        return True
+    try:
+        method()
+        return True
+    except Exception:
+        traceback.print_exc()            # what socketserver's handle_error does
+        return False
+
+
+class AsyncHTTPServer:
+    """
+    Same surface as the socketserver servers (socket, serve_forever,
+    service_actions, shutdown, server_close), so dashboard.py and
+    prefork.Prefork can run it in place of ThreadingHTTPServer.
+    """
+
+    def __init__(self, server_address, handler_class, threads=None):
+        self.RequestHandlerClass = handler_class
+        self.socket = socket.create_server(server_address, backlog=128)
+        self.server_address = self.socket.getsockname()[:2]
+        self.timeout = handler_class.timeout      # idle keep-alive and slow-upload limit
+        self.threads = threads
+        self.open_connections = 0
+        self._loop = None
+        self._stop = None
+        self._done = threading.Event()
+
+    def service_actions(self):
+        """Called about every poll_interval, like in socketserver"""
+
+    def serve_forever(self, poll_interval=0.5):
+        self._done.clear()
+        try:
+            asyncio.run(self._serve(poll_interval))
+        finally:
+            self._done.set()
+
+    def shutdown(self):
+        """Stop serve_forever() from another thread and wait for it"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+            self._done.wait()
+
+    def server_close(self):
+        self.socket.close()
+
+    async def _serve(self, poll_interval):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        # Threads are started here, not in __init__, so pre-fork workers each get their own
+        executor = ThreadPoolExecutor(self.threads, thread_name_prefix='chenkit-http')
+        self.socket.setblocking(False)
+        server = await asyncio.start_server(lambda r, w: self._connection(r, w, executor),
+                                            sock=self.socket, limit=MAX_HEAD)
+        try:
+            while not self._stop.is_set():
+                try:
+                    await asyncio.wait_for(self._stop.wait(), poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self.service_actions()
+        finally:
+            server.close()
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._loop = None
+
+    async def _connection(self, reader, writer, executor):
+        self.open_connections += 1
+        peer = writer.get_extra_info('peername')
+        try:
+            while await self._request(reader, writer, peer, executor):
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        finally:
+            self.open_connections -= 1
+            writer.close()
+
+    async def _request(self, reader, writer, peer, executor) -> bool:
+        """Read, run and answer one request. False when the connection should close"""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.timeout)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+            return False                 # closed or idle between requests
+        except asyncio.LimitOverrunError:
+            handler = buffered_handler(self.RequestHandlerClass, self, peer, b'GET / HTTP/1.1\r\n\r\n')
+            handler.parse_request()
+            handler.send_error(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+            await self._respond(writer, handler)
+            return False
+        handler = buffered_handler(self.RequestHandlerClass, self, peer, head.lstrip(b'\r\n'))
+        if not handler.parse_request():      # malformed: the error response is already in wfile
+            await self._respond(writer, handler)
+            return False
+
+        if handler.headers.get('Transfer-Encoding'):
+            handler.send_error(HTTPStatus.LENGTH_REQUIRED)
+            await self._respond(writer, handler)
+            return False
+        try:
+            length = int(handler.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if not 0 <= length <= MAX_BODY:
+            handler.send_error(HTTPStatus.BAD_REQUEST if length < 0 else HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+            await self._respond(writer, handler)
+            return False
+        if length:
+            if handler.headers.get('Expect', '').lower() == '100-continue':
+                writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+            handler.rfile = io.BytesIO(await asyncio.wait_for(reader.readexactly(length), self.timeout))
+        else:
+            handler.rfile = io.BytesIO()
+
+        # Every request, static files included, runs off the loop: Handler.timed may catch up with
+        # other workers' writes (reparse, reindex) or wait on CATCH_UP_LOCK before it answers
+        ok = await asyncio.get_running_loop().run_in_executor(executor, dispatch, handler)
+        if not ok:
+            return False
+        await self._respond(writer, handler)
+        return not handler.close_connection
+
+    async def _respond(self, writer, handler):
+        writer.write(handler.wfile.getvalue())
+        await asyncio.wait_for(writer.drain(), self.timeout)    # a client that stopped reading
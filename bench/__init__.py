@@ -0,0 +1,5 @@
+"""
+CHEN-KIT Benchmarks
+Repeatable timings of the parse, match, render, search and ingest hot paths.
+Run: python3 -m bench [-k pattern] [--compare previous.json]
+"""
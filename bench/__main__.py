@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Run the benchmarks and write bench/results/<timestamp>.json
+
+  python3 -m bench                      all cases
+  python3 -m bench -k render -k match   cases whose name contains a pattern (globs work)
+  python3 -m bench --compare bench/results/20260101-120000.json
+  python3 -m bench --data /tmp/kitchen-10k   against a kitchen from python3 -m bench.corpus
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from bench.harness import REPEAT, environment, load_baseline, report, run_case, select, write_results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m bench', description='CHEN-KIT benchmarks')
+    parser.add_argument('-k', dest='patterns', action='append', default=[], help='only cases matching this')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help=f'samples per case (default {REPEAT})')
+    parser.add_argument('--out', type=Path, help='result file (default bench/results/<timestamp>.json)')
+    parser.add_argument('--compare', type=Path, help='earlier result file to show ratios against')
+    parser.add_argument('--data', type=Path, help='kitchen tree to load instead of the shipped data (sets CHENKIT_DATA)')
+    parser.add_argument('--list', action='store_true', help='list cases and exit')
+    args = parser.parse_args(argv)
+
+    if args.data:
+        os.environ['CHENKIT_DATA'] = str(args.data.resolve())
+    from bench import cases   # imports dashboard, which loads the kitchen
+
+    selected = select(args.patterns)
+    if args.list:
+        for entry in selected:
+            print(f"{entry['group']:<8} {entry['name']}")
+        return 0
+    if not selected:
+        print(f"No cases match {args.patterns}")
+        return 1
+
+    baseline = load_baseline(args.compare) if args.compare else None
+    results = []
+    for entry in selected:
+        print(f"  running {entry['name']}...", end='\r', file=sys.stderr)
+        results.append(run_case(entry, args.repeat))
+    print(' ' * 60, end='\r', file=sys.stderr)
+
+    report(results, baseline)
+    path = write_results(results, environment(cases.corpus_sizes()), args.out)
+    print(f"\nResults: {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+CHEN-KIT Benchmark Cases
+Micro benchmarks call one function over the whole corpus; render cases run
+Handler.do_GET in-process, so socket and Nagle delays stay out of the numbers
+"""
+
+import http.client
+import io
+import tempfile
+from pathlib import Path
+
+import dashboard as D
+from bench.harness import case, Skip
+
+# Views rendered per request: (case suffix, path)
+VIEWS = [
+    ('home', '/?view=home'),
+    ('recipes', '/?view=recipes'),
+    ('recipe', '/?view=recipes&id={recipe}'),
+    ('search', '/?view=recipes&q=tofu'),
+    ('inventory', '/?view=inventory'),
+    ('knowledge', '/?view=knowledge'),
+    ('article', '/?view=knowledge&id={rule}'),
+    ('shoplist', '/?view=shoplist'),
+    ('mealplan', '/?view=mealplan'),
+    ('about', '/?view=about'),
+    ('api.recipes', '/api/recipes?limit=100'),
+    ('constellation', '/api/constellation.json'),
+]
+
+SEARCH_QUERIES = ['tofu', 'zupa pomidorowa', 'ciecierzyca curry', 'imbir', 'śniadanie owsianka']
+
+_STATE = {}
+
+
+def corpus_files():
+    return [f for folder in (D.RECIPES, D.RULES, D.INVENTORY) for f in sorted(folder.glob('*.md'))
+            if not f.name.startswith('_')]
+
+
+def corpus_sizes():
+    return {'data': str(D.DATA), 'recipes': len(D.ALL_RECIPES), 'rules': len(D.ALL_RULES),
+            'inventory': len(D.ALL_INVENTORY), 'transcripts': len(D.ALL_TRANSCRIPTS)}
+
+
+def handle_get(path, headers=None):
+    """Run Handler.do_GET for one request over in-memory streams; returns the status line"""
+    handler = D.Handler.__new__(D.Handler)
+    handler.client_address = ('127.0.0.1', 0)
+    handler.server = None
+    handler.command = 'GET'
+    handler.path = path
+    handler.request_version = 'HTTP/1.1'
+    handler.requestline = f'GET {path} HTTP/1.1'
+    handler.headers = http.client.parse_headers(io.BytesIO(
+        ''.join(f'{k}: {v}\r\n' for k, v in (headers or {}).items()).encode() + b'\r\n'))
+    handler.rfile = io.BytesIO()
+    handler.wfile = io.BytesIO()
+    handler.close_connection = True
+    handler.do_GET()
+    return handler.wfile.getvalue().split(b'\r\n', 1)[0]
+
+
+def getter(path, cold=False):
+    """Callable rendering one GET; cold drops the rendered fragments first"""
+    def get():
+        if cold:
+            with D.FRAGMENTS.lock:
+                D.FRAGMENTS.entries.clear()
+        status = handle_get(path, {'Accept-Encoding': 'gzip'})
+        if b' 200 ' not in status:
+            raise RuntimeError(f"GET {path}: {status.decode()}")
+    get()
+    return get
+
+
+# Parse
+
+@case('parse_md', group='parse')
+def bench_parse_md():
+    files = corpus_files()
+    return (lambda: [D.parse_md(f) for f in files]), len(files)
+
+
+@case('load_folder.recipes', group='parse')
+def bench_load_recipes():
+    return (lambda: D.load_folder(D.RECIPES)), len(D.ALL_RECIPES)
+
+
+@case('load_folder.rules', group='parse')
+def bench_load_rules():
+    return (lambda: D.load_folder(D.RULES)), len(D.ALL_RULES)
+
+
+# Match
+
+@case('ingredient_match', group='match')
+def bench_ingredient_match():
+    items = [item for r in D.ALL_RECIPES for item in r['items']]
+    inventory = D.ALL_INVENTORY
+    return (lambda: [D.ingredient_match(item, inventory) for item in items]), len(items)
+
+
+@case('score_recipe', group='match')
+def bench_score_recipe():
+    recipes = D.ALL_RECIPES
+    inventory = D.ALL_INVENTORY
+    return (lambda: [D.score_recipe(r, inventory) for r in recipes]), len(recipes)
+
+
+@case('cook_index.build', group='match')
+def bench_cook_index():
+    """Bitset engine from scratch: index, pantry match and scores"""
+    def build():
+        with D.DERIVED.lock:
+            for key in [k for k in D.DERIVED.entries if k[0] in ('cook_index', 'recipe_scores')]:
+                del D.DERIVED.entries[key]
+        D.recipe_scores('pl')
+    return build, len(D.ALL_RECIPES)
+
+
+@case('meal_plan.build', group='match')
+def bench_meal_plan():
+    def build():
+        with D.DERIVED.lock:
+            for key in [k for k in D.DERIVED.entries if k[0] == 'meal_plan']:
+                del D.DERIVED.entries[key]
+        D.meal_plan('pl', 7)
+    return build
+
+
+# Render
+
+def render_case(name, path, cold):
+    @case(f"render.{name}{'.cold' if cold else ''}", group='render')
+    def setup():
+        return getter(path.format(recipe=D.ALL_RECIPES[0]['name'], rule=D.ALL_RULES[0]['name']), cold)
+
+
+for _name, _path in VIEWS:
+    render_case(_name, _path, cold=False)
+for _name, _path in VIEWS:
+    render_case(_name, _path, cold=True)
+
+
+# Search
+
+@case('search.keyword', group='search')
+def bench_keyword_search():
+    d = D.get_data('pl')
+    return (lambda: [D.filter_recipes(d, q) for q in SEARCH_QUERIES]), len(SEARCH_QUERIES)
+
+
+@case('search.kitchen', group='search')
+def bench_kitchen_search():
+    from kitchen import SearchIndex
+    index = SearchIndex(Path(tempfile.mkdtemp()) / 'index.json')
+    index.refresh()
+    return (lambda: [index.search(q) for q in SEARCH_QUERIES]), len(SEARCH_QUERIES)
+
+
+def doc_store():
+    from store import DocStore, fts5_available
+    if not fts5_available():
+        raise Skip('sqlite3 without the FTS5 trigram tokenizer')
+    return DocStore(':memory:', D.recipe_tags, lambda r: [(i['text'], i['key']) for i in D.recipe_ingredients(r)])
+
+
+@case('sqlite.build', group='search', repeat=3)
+def bench_sqlite_build():
+    def build():
+        store = doc_store()
+        store.sync('recipe', 'pl', D.ALL_RECIPES)
+        store.sync('rule', 'pl', D.ALL_RULES)
+        store.close()
+    return build, len(D.ALL_RECIPES) + len(D.ALL_RULES)
+
+
+@case('search.sqlite', group='search')
+def bench_sqlite_search():
+    store = doc_store()
+    store.sync('recipe', 'pl', D.ALL_RECIPES)
+    return (lambda: [store.search('recipe', 'pl', q) for q in SEARCH_QUERIES]), len(SEARCH_QUERIES)
+
+
+def semantic_index():
+    import search
+    if not search.SEMANTIC_AVAILABLE:
+        raise Skip('sentence-transformers/chromadb not installed')
+    if 'semantic' not in _STATE:
+        _STATE['semantic'] = search.SemanticIndex()   # model load stays out of the timings
+    return _STATE['semantic']
+
+
+@case('semantic.index_all', group='search', repeat=3)
+def bench_semantic_index_all():
+    index = semantic_index()
+    docs = len(D.ALL_RECIPES) + len(D.ALL_RULES) + len(D.ALL_TRANSCRIPTS)
+
+    def build():
+        index.client.delete_collection('chenkit')
+        index.collection = index.client.create_collection(name='chenkit', metadata={'hnsw:space': 'cosine'})
+        index.index_all(D.ALL_RECIPES, D.ALL_RULES, D.ALL_TRANSCRIPTS)
+    build()
+    return build, docs
+
+
+@case('semantic.search', group='search')
+def bench_semantic_search():
+    index = semantic_index()
+    if not index.collection.count():
+        index.index_all(D.ALL_RECIPES, D.ALL_RULES, D.ALL_TRANSCRIPTS)
+    return (lambda: [index.search(q, top_k=10) for q in SEARCH_QUERIES]), len(SEARCH_QUERIES)
+
+
+# Ingest
+
+@case('ingest.process_text', group='ingest')
+def bench_process_text():
+    """Classify, format and validate; the LLM rewrite is skipped so runs are repeatable"""
+    from ingest_core import IngestProcessor
+    processor = IngestProcessor(D.BASE)
+    processor._transform = processor._simple_format
+    texts = [r['content'] for r in D.ALL_RECIPES[:5] + D.ALL_RULES[:5] + D.ALL_TRANSCRIPTS[:5]]
+    return (lambda: [processor.process_text(t, source_type='bench') for t in texts]), len(texts)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+CHEN-KIT Synthetic Corpus
+Writes a kitchen tree (recipes/, rules/, inventory/, transcripts/) in the
+blueprints/*.blueprint.md formats, sampled from the shipped data so
+ingredient names, tags and Polish spelling look like the real thing.
+
+  python3 -m bench.corpus /tmp/kitchen-10k --recipes 10000 --seed 1
+  CHENKIT_DATA=/tmp/kitchen-10k python3 -m bench
+"""
+
+import argparse
+import random
+import re
+import shutil
+import sys
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BASE = Path(__file__).resolve().parent.parent
+
+# Dish names for titles; ingredients follow after a colon
+DISHES = ['Zupa', 'Krem', 'Curry', 'Dhal', 'Owsianka', 'Jaglanka', 'Kasza', 'Sałatka', 'Gulasz', 'Leczo',
+          'Pasta', 'Placki', 'Kotlety', 'Risotto', 'Kitchari', 'Bowl', 'Smoothie', 'Ciasto', 'Muffinki',
+          'Pieczone warzywa', 'Tortilla', 'Stir-fry', 'Pasztet', 'Hummus', 'Napar']
+# Extra words on sampled ingredients so the vocabulary keeps growing with the corpus
+QUALIFIERS = ['świeży', 'mrożony', 'wędzony', 'prażony', 'ekologiczny', 'gotowany', 'pieczony',
+              'duszony', 'mielony', 'suszony', 'kiszony', 'młody', 'czerwony', 'żółty', 'długi']
+UNITS = ['g', 'ml', 'łyżki', 'łyżeczki', 'szklanki', 'szt']
+MEAL_TAGS = ['breakfast', 'lunch', 'dinner', 'snack', 'dessert', 'drink', 'soup']
+RULE_CATEGORIES = ['diet/core', 'diet/meals', 'diet/ayurveda', 'health/tcm', 'health/sleep',
+                   'wellness/mental', 'cooking/techniques', 'cooking/spices']
+
+FOLD = str.maketrans('ąćęłńóśźżĄĆĘŁŃÓŚŹŻ', 'acelnoszzACELNOSZZ')
+CHECKBOX_RE = re.compile(r'^-\s*\[[ x]\]\s*(.+)$', re.MULTILINE)
+HEADER_RE = re.compile(r'^(#|\w+:\s)')
+MARKUP_RE = re.compile(r'^\s*(-\s*\[[ x]\]|[-*]|\d+\.)\s*|\*\*?|\[[^\]]*\]\s*')
+QTY_RE = re.compile(r'^[\d.,/½¼¾]+\s*(g|kg|ml|l|szt|łyżki|łyżka|łyżeczki|szklanki|lyzki|lyzka)?\.?\s+', re.IGNORECASE)
+
+
+def slugify(text: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', text.translate(FOLD).lower()).strip('-')[:48]
+
+
+def read_md(folder: Path) -> List[str]:
+    return [f.read_text(encoding='utf-8') for f in sorted(folder.glob('*.md')) if not f.name.startswith('_')]
+
+
+def sections(content: str) -> Dict[str, List[str]]:
+    result, current = {}, None
+    for line in content.split('\n'):
+        if line.startswith('## '):
+            current = result.setdefault(line[3:].strip().lower(), [])
+        elif current is not None and line.strip():
+            current.append(line.strip())
+    return result
+
+
+class Vocabulary:
+    """Frequencies and sample lines from the shipped kitchen"""
+
+    def __init__(self, root: Path = BASE):
+        self.ingredients = Counter()
+        self.tags = Counter()
+        self.steps = []
+        self.do, self.dont = [], []
+        self.rule_titles = []
+        self.inventory = {}
+        self.sentences = []
+
+        for content in read_md(root / 'recipes'):
+            for item in CHECKBOX_RE.findall(content):
+                for part in item.split(','):
+                    name = QTY_RE.sub('', part.strip()).strip()
+                    if len(name) > 2:
+                        self.ingredients[name[:1].upper() + name[1:]] += 1
+            m = re.search(r'^tags:\s*(.+)$', content, re.MULTILINE)
+            if m:
+                self.tags.update(t.strip().lower() for t in re.split(r'[,\[\]]+', m.group(1)) if t.strip())
+            for line in sections(content).get('steps', []):
+                self.steps.append(re.sub(r'^\d+\.\s*', '', line))
+
+        for content in read_md(root / 'rules'):
+            m = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
+            if m:
+                self.rule_titles.append(m.group(1).strip())
+            for name, lines in sections(content).items():
+                items = [line[2:].replace('[ ] ', '').replace('[x] ', '') for line in lines if line.startswith('- ')]
+                if name in ('do', 'zasady', 'praktyki', 'knowledge base'):
+                    self.do.extend(items)
+                elif name in ('dont', "don't", 'unikaj', 'zakazy'):
+                    self.dont.extend(items)
+
+        for content in read_md(root / 'inventory'):
+            for name, lines in sections(content).items():
+                items = [line[2:].replace('[ ] ', '') for line in lines if line.startswith('- ')]
+                if items:
+                    self.inventory.setdefault(name.title(), []).extend(items)
+
+        for content in read_md(root / 'transcripts') + read_md(root / 'rules'):
+            prose = ' '.join(MARKUP_RE.sub('', line) for line in content.split('\n')
+                             if line.strip() and not HEADER_RE.match(line))
+            for sentence in re.split(r'(?<=[.!?])\s+', prose):
+                sentence = ' '.join(sentence.split())
+                if 30 <= len(sentence) <= 200:
+                    self.sentences.append(sentence)
+
+        self.core_rules = root / 'rules' / '00-glowne-zasady.md'
+        self.ingredient_names = sorted(self.ingredients)
+        self.ingredient_weights = [self.ingredients[n] for n in self.ingredient_names]
+        self.extra_tags = sorted(t for t in self.tags if t not in MEAL_TAGS)
+
+
+class CorpusWriter:
+    """Seedable generator; the same seed and sizes always write the same tree"""
+
+    def __init__(self, vocab: Vocabulary, seed: int = 0):
+        self.vocab = vocab
+        self.rng = random.Random(seed)
+        self.start = date(2024, 1, 1)
+
+    def day(self) -> str:
+        return (self.start + timedelta(days=self.rng.randrange(730))).isoformat()
+
+    def ingredient(self) -> str:
+        name = self.rng.choices(self.vocab.ingredient_names, self.vocab.ingredient_weights)[0]
+        if self.rng.random() < 0.25:
+            name += ' ' + self.rng.choice(QUALIFIERS)
+        return name
+
+    def quantity(self) -> str:
+        roll = self.rng.random()
+        if roll < 0.4:
+            return ''
+        if roll < 0.7:
+            return f"{self.rng.choice([1, 2, 3, 4])} {self.rng.choice(UNITS[2:])} "
+        return f"{self.rng.choice([50, 100, 150, 200, 250, 400, 500])}{self.rng.choice(UNITS[:2])} "
+
+    def recipe(self, i: int) -> Tuple[str, str]:
+        items = list(dict.fromkeys(self.ingredient() for _ in range(self.rng.randint(3, 12))))
+        title = f"{self.rng.choice(DISHES)}: {items[0].lower()}" + (f" i {items[1].lower()}" if len(items) > 1 else '')
+        tags = [self.rng.choices(MEAL_TAGS, [22, 41, 61, 17, 24, 12, 11])[0]]
+        tags += self.rng.sample(self.vocab.extra_tags, min(self.rng.randint(0, 2), len(self.vocab.extra_tags)))
+        steps = self.rng.sample(self.vocab.steps, min(self.rng.randint(2, 6), len(self.vocab.steps)))
+        lines = [f"# Recipe: {title}", f"tags: {', '.join(tags)}", f"time: {self.rng.choice([10, 15, 20, 30, 45, 60])} min",
+                 "source: synthetic", "", "## Ingredients"]
+        lines += [f"- [ ] {self.quantity()}{item}" for item in items]
+        lines += ["", "## Steps"] + [f"{n}. {step}" for n, step in enumerate(steps, 1)]
+        if self.rng.random() < 0.3:
+            lines += ["", "## Notes", self.rng.choice(self.vocab.sentences)]
+        return f"{i:06d}-{slugify(title)}.md", '\n'.join(lines) + '\n'
+
+    def rule(self, i: int) -> Tuple[str, str]:
+        title = f"{self.rng.choice(self.vocab.rule_titles)} {i}"
+        lines = [f"# {title}", f"category: {self.rng.choice(RULE_CATEGORIES)}",
+                 f"tags: {', '.join(self.rng.sample(self.vocab.extra_tags, min(3, len(self.vocab.extra_tags))))}",
+                 "", "## Zasady"]
+        lines += [f"- [ ] {line}" for line in self.rng.sample(self.vocab.do, min(self.rng.randint(2, 8), len(self.vocab.do)))]
+        if self.vocab.dont and self.rng.random() < 0.7:
+            lines += ["", "## Zakazy"]
+            lines += [f"- [ ] {line}" for line in self.rng.sample(self.vocab.dont, min(self.rng.randint(1, 4), len(self.vocab.dont)))]
+        lines += ["", "## Notes", ' '.join(self.rng.sample(self.vocab.sentences, min(3, len(self.vocab.sentences))))]
+        return f"{i:05d}-{slugify(title)}.md", '\n'.join(lines) + '\n'
+
+    def inventory(self, size: int) -> str:
+        """One kitchen file: the shipped inventory, topped up from the recipe vocabulary to size items"""
+        categories = {cat: list(items) for cat, items in self.vocab.inventory.items()}
+        have = {item for items in categories.values() for item in items}
+        names = list(categories) or ['Spiżarnia']
+        for _ in range(max(0, size - len(have)) * 3):
+            if len(have) >= size:
+                break
+            item = self.ingredient()
+            if item not in have:
+                have.add(item)
+                categories.setdefault(self.rng.choice(names), []).append(item)
+        lines = ["# Inventory: Kuchnia", f"updated: {self.day()}"]
+        for cat, items in categories.items():
+            lines += ["", f"## {cat}"] + [f"- [ ] {item}" for item in items]
+        return '\n'.join(lines) + '\n'
+
+    def transcript(self, i: int) -> Tuple[str, str]:
+        paragraphs = [' '.join(self.rng.sample(self.vocab.sentences, min(self.rng.randint(2, 6), len(self.vocab.sentences))))
+                      for _ in range(self.rng.randint(2, 8))]
+        lines = [f"# Notatka głosowa {i}", f"date: {self.day()}", "source: voice memo", ""]
+        return f"notatka-{i:05d}.md", '\n'.join(lines) + '\n\n'.join(paragraphs) + '\n'
+
+
+KITCHEN_FOLDERS = ('recipes', 'rules', 'inventory', 'transcripts')
+
+
+def check_target(out: Path, source: Path = BASE, force: bool = False):
+    """Raise ValueError unless out is safe to overwrite: never the real kitchen,
+    and non-empty kitchen folders only with force"""
+    out = Path(out).resolve()
+    if out in (BASE.resolve(), Path(source).resolve()):
+        raise ValueError(f"{out} is the real kitchen; generate into another directory")
+    if not force:
+        used = [name for name in KITCHEN_FOLDERS if (out / name).is_dir() and any((out / name).iterdir())]
+        if used:
+            raise ValueError(f"{out} already has {', '.join(used)}; pass --force to replace them")
+
+
+def generate(out: Path, recipes: int = 1000, rules: int = None, inventory: int = None,
+             transcripts: int = None, seed: int = 0, source: Path = BASE, force: bool = False) -> Dict[str, int]:
+    """
+    Write a kitchen of the given size under out. Existing recipes/, rules/,
+    inventory/ and transcripts/ there are replaced only with force, and never
+    in the repo itself (see check_target). Rules, inventory and transcripts
+    default to sizes proportional to the recipe count.
+    """
+    check_target(out, source, force)
+    rules = max(5, recipes // 6) if rules is None else rules
+    inventory = max(150, recipes // 4) if inventory is None else inventory
+    transcripts = max(2, recipes // 50) if transcripts is None else transcripts
+    vocab = Vocabulary(source)
+    writer = CorpusWriter(vocab, seed)
+
+    for name in KITCHEN_FOLDERS:
+        folder = out / name
+        if folder.exists():
+            shutil.rmtree(folder)
+        folder.mkdir(parents=True)
+
+    for i in range(recipes):
+        filename, text = writer.recipe(i)
+        (out / 'recipes' / filename).write_text(text, encoding='utf-8')
+    # The core rules drive meal guidance and forbidden combos, so the real file is kept
+    if vocab.core_rules.exists():
+        shutil.copy(vocab.core_rules, out / 'rules' / vocab.core_rules.name)
+    for i in range(1, rules):
+        filename, text = writer.rule(i)
+        (out / 'rules' / filename).write_text(text, encoding='utf-8')
+    (out / 'inventory' / 'kuchnia.md').write_text(writer.inventory(inventory), encoding='utf-8')
+    for i in range(transcripts):
+        filename, text = writer.transcript(i)
+        (out / 'transcripts' / filename).write_text(text, encoding='utf-8')
+
+    return {'recipes': recipes, 'rules': max(rules, 1), 'inventory': inventory, 'transcripts': transcripts}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m bench.corpus', description='Generate a synthetic kitchen')
+    parser.add_argument('out', type=Path, help='directory to write the kitchen into')
+    parser.add_argument('--recipes', type=int, default=1000)
+    parser.add_argument('--rules', type=int, help='default: recipes / 6')
+    parser.add_argument('--inventory', type=int, help='inventory items (default: recipes / 4, at least 150)')
+    parser.add_argument('--transcripts', type=int, help='default: recipes / 50')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--force', action='store_true', help='replace kitchen folders already in out')
+    args = parser.parse_args(argv)
+
+    try:
+        sizes = generate(args.out, args.recipes, args.rules, args.inventory, args.transcripts, args.seed,
+                         force=args.force)
+    except ValueError as e:
+        print(f"Refusing to write: {e}", file=sys.stderr)
+        return 1
+    print(f"Wrote {args.out}: " + ', '.join(f"{v} {k}" for k, v in sizes.items()))
+    print(f"Use it with: CHENKIT_DATA={args.out} python3 -m bench")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
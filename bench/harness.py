@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+CHEN-KIT Benchmark Harness
+Case registry, timing loop and the JSON result format
+"""
+
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+BASE = Path(__file__).resolve().parent.parent
+RESULTS = BASE / "bench" / "results"
+
+# A sample runs the case this many seconds at least (cheap cases are looped)
+MIN_SAMPLE_TIME = 0.05
+REPEAT = 7
+
+CASES = []
+
+
+class Skip(Exception):
+    """Raised by a case's setup when it cannot run here (missing optional dependency)"""
+
+
+def case(name: str, group: str, repeat: Optional[int] = None):
+    """
+    Register a benchmark. The decorated function does the setup and returns
+    the callable to time, or (callable, items) to also report time per item.
+    """
+    def register(setup: Callable):
+        CASES.append({'name': name, 'group': group, 'repeat': repeat, 'setup': setup})
+        return setup
+    return register
+
+
+def calibrate(fn: Callable) -> int:
+    """Calls per sample so one sample lasts at least MIN_SAMPLE_TIME"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SAMPLE_TIME or number >= 1 << 20:
+            return number
+        number = max(number * 2, int(number * MIN_SAMPLE_TIME / max(elapsed, 1e-9)))
+
+
+def measure(fn: Callable, repeat: int = REPEAT) -> Dict:
+    """Per-call timings in ms over repeat samples, with the GC off like timeit"""
+    number = calibrate(fn)
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter() - start) * 1000 / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        'number': number,
+        'repeat': repeat,
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.fmean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'max': max(samples),
+        'samples': samples,
+    }
+
+
+def run_case(entry: Dict, repeat: int = REPEAT) -> Dict:
+    result = {'name': entry['name'], 'group': entry['group']}
+    try:
+        prepared = entry['setup']()
+    except Skip as e:
+        result['skipped'] = str(e)
+        return result
+    fn, items = prepared if isinstance(prepared, tuple) else (prepared, None)
+    result.update(measure(fn, entry['repeat'] or repeat))
+    if items:
+        result['items'] = items
+        result['per_item_us'] = result['median'] * 1000 / items
+    return result
+
+
+def select(patterns: List[str]) -> List[Dict]:
+    """Cases whose name matches any glob pattern (all cases when none given)"""
+    if not patterns:
+        return list(CASES)
+    return [c for c in CASES if any(fnmatch(c['name'], p) or p in c['name'] for p in patterns)]
+
+
+def git_revision() -> str:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+
+def environment(corpus: Dict) -> Dict:
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'corpus': corpus,
+    }
+
+
+def write_results(results: List[Dict], env: Dict, path: Optional[Path] = None) -> Path:
+    if path is None:
+        RESULTS.mkdir(parents=True, exist_ok=True)
+        path = RESULTS / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    path.write_text(json.dumps({'env': env, 'results': results}, indent=2), encoding='utf-8')
+    return path
+
+
+def format_row(result: Dict, baseline: Optional[Dict] = None) -> str:
+    if 'skipped' in result:
+        return f"  {result['name']:<32} skipped: {result['skipped']}"
+    line = f"  {result['name']:<32} {result['median']:>10.3f} ms  ±{result['stdev']:.3f}"
+    if 'per_item_us' in result:
+        line += f"  ({result['per_item_us']:.1f} µs/item)"
+    if baseline and 'median' in baseline:
+        line += f"  {result['median'] / baseline['median']:.2f}x vs baseline"
+    return line
+
+
+def load_baseline(path: Path) -> Dict[str, Dict]:
+    data = json.loads(Path(path).read_text(encoding='utf-8'))
+    return {r['name']: r for r in data.get('results', [])}
+
+
+def report(results: List[Dict], baseline: Optional[Dict[str, Dict]] = None, out=sys.stdout):
+    group = None
+    for result in results:
+        if result['group'] != group:
+            group = result['group']
+            print(f"\n[{group}]", file=out)
+        print(format_row(result, (baseline or {}).get(result['name'])), file=out)
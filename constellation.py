@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+CHEN-KIT Constellation Layout
+Builds the constellation graph server-side and lays it out once per data version
+"""
+
+import base64
+import math
+import sys
+from array import array
+from typing import Dict, List
+
+# Node types in the order they are indexed (each type is one contiguous range).
+# Ingredients come last so they can be streamed after the rest of the graph.
+NODE_TYPES = ['recipe', 'tag', 'knowledge', 'category', 'ingredient']
+
+# Shell radius and x offset per node type
+SHELLS = {
+    'recipe': (350, 0),
+    'ingredient': (180, 0),
+    'tag': (60, 0),
+    'knowledge': (280, 150),
+    'category': (100, 150),
+}
+
+# Ingredients shared by more recipes than this carry no clustering signal (oil, onion, salt...)
+MAX_SHARED = 30
+
+# Ingredient nodes per streamed chunk
+INGREDIENT_CHUNK = 500
+
+# Spring strength relative to plain Fruchterman-Reingold; lower keeps the recipe shell evenly covered
+ATTRACTION = 0.25
+
+
+def sphere_point(i: int, count: int, radius: float, offset_x: float = 0.0) -> List[float]:
+    """Point i of a Fibonacci distribution of count points on a sphere."""
+    phi = math.acos(-1 + (2 * i) / count)
+    theta = math.sqrt(count * math.pi) * phi
+    return [
+        radius * math.cos(theta) * math.sin(phi) + offset_x,
+        radius * math.sin(theta) * math.sin(phi),
+        radius * math.cos(phi),
+    ]
+
+
+def build_graph(data: Dict) -> Dict:
+    """
+    Nodes and edges from build_constellation_data() output.
+    Ingredients and tags are merged case-insensitively; knowledge articles
+    link to existing tags and to their category. Ingredients are indexed
+    last, most connected first, with their edges grouped per ingredient.
+    """
+    ids, labels, types = [], [], []
+    index = {}
+    edges = []
+
+    def add(node_id, label, node_type):
+        index[node_id] = len(ids)
+        ids.append(node_id)
+        labels.append(label)
+        types.append(node_type)
+
+    def merge(field):
+        merged = {}
+        for ri, r in enumerate(recipes):
+            for value in r.get(field, []):
+                merged.setdefault(value.lower(), (value, []))[1].append(ri)
+        return merged
+
+    recipes = data.get('recipes', [])
+    rules = data.get('rules', [])
+
+    for i, r in enumerate(recipes):
+        add(f'r_{i}', r['title'], 'recipe')
+
+    for key, (label, recipe_idx) in merge('tags').items():
+        add('t_' + key, label, 'tag')
+        edges.extend((ri, index['t_' + key]) for ri in recipe_idx)
+
+    categories = {}
+    for i, r in enumerate(rules):
+        add(f'k_{i}', r['title'], 'knowledge')
+        categories.setdefault(r.get('category') or 'general', []).append(i)
+        for tag in r.get('tags', []):
+            tag_idx = index.get('t_' + tag.lower())
+            if tag_idx is not None:
+                edges.append((index[f'k_{i}'], tag_idx))
+
+    for cat, articles in categories.items():
+        add('c_' + cat, cat, 'category')
+        edges.extend((index[f'k_{ki}'], index['c_' + cat]) for ki in articles)
+
+    ingredients = sorted(merge('ingredients').items(), key=lambda kv: -len(kv[1][1]))
+    for key, (label, recipe_idx) in ingredients:
+        add('i_' + key, label, 'ingredient')
+        edges.extend((ri, index['i_' + key]) for ri in recipe_idx)
+
+    return {'ids': ids, 'labels': labels, 'types': types, 'edges': edges}
+
+
+def _normalize(v: List[float], length: float) -> List[float]:
+    norm = math.sqrt(v[0] * v[0] + v[1] * v[1] + v[2] * v[2]) or 1.0
+    return [v[0] * length / norm, v[1] * length / norm, v[2] * length / norm]
+
+
+def refine_recipes(points: List[List[float]], recipe_ingredients: List[List[str]],
+                   radius: float, iterations: int = 50) -> List[List[float]]:
+    """
+    Fruchterman-Reingold pass over recipe positions, constrained to their shell.
+    Recipes sharing ingredients attract (weighted by how many they share);
+    repulsion only looks at neighbours in a uniform grid, so a pass is ~O(n).
+    """
+    n = len(points)
+    if n < 3:
+        return points
+
+    # Shared-ingredient weights, skipping ubiquitous ingredients
+    by_ingredient = {}
+    for ri, items in enumerate(recipe_ingredients):
+        for key in {item.lower() for item in items}:
+            by_ingredient.setdefault(key, []).append(ri)
+    weights = {}
+    for members in by_ingredient.values():
+        if 2 <= len(members) <= MAX_SHARED:
+            for a in range(len(members)):
+                for b in range(a + 1, len(members)):
+                    pair = (members[a], members[b])
+                    weights[pair] = weights.get(pair, 0) + 1
+
+    k = math.sqrt(4 * math.pi * radius * radius / n)   # ideal spacing on the shell
+    cutoff = 2 * k
+    cutoff_sq = cutoff * cutoff
+    pos = [p[:] for p in points]
+
+    for step in range(iterations):
+        temperature = k * (1 - step / iterations)
+        disp = [[0.0, 0.0, 0.0] for _ in range(n)]
+
+        grid = {}
+        for i, p in enumerate(pos):
+            grid.setdefault((int(p[0] // cutoff), int(p[1] // cutoff), int(p[2] // cutoff)), []).append(i)
+
+        for (cx, cy, cz), members in grid.items():
+            neighbours = []
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for dz in (-1, 0, 1):
+                        neighbours.extend(grid.get((cx + dx, cy + dy, cz + dz), ()))
+            for i in members:
+                pi, di = pos[i], disp[i]
+                for j in neighbours:
+                    if j == i:
+                        continue
+                    dx_ = pi[0] - pos[j][0]
+                    dy_ = pi[1] - pos[j][1]
+                    dz_ = pi[2] - pos[j][2]
+                    d2 = dx_ * dx_ + dy_ * dy_ + dz_ * dz_
+                    if d2 >= cutoff_sq:
+                        continue
+                    d2 = d2 or 0.01
+                    f = k * k / d2   # k²/d, divided by d again to normalise the direction
+                    di[0] += dx_ * f
+                    di[1] += dy_ * f
+                    di[2] += dz_ * f
+
+        for (a, b), w in weights.items():
+            pa, pb = pos[a], pos[b]
+            dx_ = pa[0] - pb[0]
+            dy_ = pa[1] - pb[1]
+            dz_ = pa[2] - pb[2]
+            d = math.sqrt(dx_ * dx_ + dy_ * dy_ + dz_ * dz_) or 0.01
+            f = ATTRACTION * w * d / k   # d²/k, divided by d
+            disp[a][0] -= dx_ * f
+            disp[a][1] -= dy_ * f
+            disp[a][2] -= dz_ * f
+            disp[b][0] += dx_ * f
+            disp[b][1] += dy_ * f
+            disp[b][2] += dz_ * f
+
+        for i, d in enumerate(disp):
+            length = math.sqrt(d[0] * d[0] + d[1] * d[1] + d[2] * d[2])
+            if length > 0:
+                scale = min(length, temperature) / length
+                p = pos[i]
+                pos[i] = _normalize([p[0] + d[0] * scale, p[1] + d[1] * scale, p[2] + d[2] * scale], radius)
+
+    return pos
+
+
+def layout_graph(graph: Dict, data: Dict, iterations: int = 50) -> List[List[float]]:
+    """
+    Positions for every node: Fibonacci shells per type, recipes refined by
+    shared ingredients, and each ingredient pulled under the recipes using it.
+    """
+    types = graph['types']
+    counts = {t: types.count(t) for t in NODE_TYPES}
+    ordinal = {t: 0 for t in NODE_TYPES}
+    positions = []
+    for node_type in types:
+        radius, offset_x = SHELLS[node_type]
+        positions.append(sphere_point(ordinal[node_type], max(counts[node_type], 1), radius, offset_x))
+        ordinal[node_type] += 1
+
+    n_recipes = counts['recipe']
+    recipe_ingredients = [r.get('ingredients', []) for r in data.get('recipes', [])]
+    positions[:n_recipes] = refine_recipes(positions[:n_recipes], recipe_ingredients,
+                                           SHELLS['recipe'][0], iterations)
+
+    # Ingredients sit on their shell in the direction of their recipes' centroid
+    radius = SHELLS['ingredient'][0]
+    centroids = {}
+    for a, b in graph['edges']:
+        if types[a] == 'recipe' and types[b] == 'ingredient':
+            c = centroids.setdefault(b, [0.0, 0.0, 0.0])
+            c[0] += positions[a][0]
+            c[1] += positions[a][1]
+            c[2] += positions[a][2]
+    for i, c in centroids.items():
+        if c[0] or c[1] or c[2]:
+            # Blend in the Fibonacci point so ingredients of one recipe do not stack up
+            toward = _normalize(c, 0.75)
+            spread = _normalize(positions[i], 0.25)
+            positions[i] = _normalize([toward[j] + spread[j] for j in range(3)], radius)
+
+    return positions
+
+
+def pack(values, typecode: str = 'f') -> str:
+    """base64 of a little-endian packed array (read as Float32Array/Uint32Array in the browser)."""
+    packed = array(typecode, values)
+    assert packed.itemsize == 4, f"array('{typecode}') is not 32-bit on this platform"
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return base64.b64encode(packed.tobytes()).decode('ascii')
+
+
+def _part(graph: Dict, positions: List[List[float]], start: int, end: int, edges: List) -> Dict:
+    """Nodes [start, end) with their edges, as packed buffers"""
+    return {
+        'start': start,
+        'ids': graph['ids'][start:end],
+        'labels': graph['labels'][start:end],
+        'positions': pack([v for p in positions[start:end] for v in p]),
+        'edges': pack([i for edge in edges for i in edge], 'I'),
+        'edge_positions': pack([v for a, b in edges for v in positions[a] + positions[b]]),
+    }
+
+
+def build_layout(data: Dict, iterations: int = 50, chunk_size: int = INGREDIENT_CHUNK) -> Dict:
+    """
+    Constellation payload split for progressive loading. 'base' carries
+    recipes, tags, knowledge and categories plus the type ranges and totals
+    the client preallocates from; 'chunks' carry ingredient nodes (most
+    connected first) with their recipe edges. Positions are packed buffers
+    the client hands straight to the GPU.
+    """
+    graph = build_graph(data)
+    positions = layout_graph(graph, data, iterations)
+    types = graph['types']
+
+    ranges = []
+    start = 0
+    for node_type in NODE_TYPES:
+        count = types.count(node_type)
+        ranges.append([node_type, start, count])
+        start += count
+    first_ingredient = ranges[-1][1]
+
+    base_edges = [e for e in graph['edges'] if types[e[1]] != 'ingredient']
+    ingredient_edges = [e for e in graph['edges'] if types[e[1]] == 'ingredient']
+
+    chunks = []
+    cursor = 0
+    for chunk_start in range(first_ingredient, len(types), chunk_size):
+        chunk_end = min(chunk_start + chunk_size, len(types))
+        chunk_edges = []
+        while cursor < len(ingredient_edges) and ingredient_edges[cursor][1] < chunk_end:
+            chunk_edges.append(ingredient_edges[cursor])
+            cursor += 1
+        chunks.append(_part(graph, positions, chunk_start, chunk_end, chunk_edges))
+
+    degree = [0] * len(types)
+    for a, b in graph['edges']:
+        degree[a] += 1
+        degree[b] += 1
+
+    base = _part(graph, positions, 0, first_ingredient, base_edges)
+    base.update({
+        'ranges': ranges,
+        'chunks': len(chunks),
+        'edge_total': len(graph['edges']),
+        'max_degree': max(degree, default=0),
+    })
+    return {'base': base, 'chunks': chunks}
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+CHEN-KIT Cookable Engine
+Recipe needs and the pantry as integer bitsets over one ingredient vocabulary,
+so "what can I cook" questions are popcounts instead of string matching
+"""
+
+from typing import Callable, Iterable, List, Tuple
+
+
+def popcount(bits: int) -> int:
+    return bits.bit_count()
+
+
+class CookIndex:
+    """
+    Each distinct ingredient item text gets one bit; each recipe's needs are
+    the OR of its items' bits. String matching against the inventory happens
+    once per text in pantry(), after which every query is integer arithmetic
+    over all recipes. Texts are not merged by stem: two items sharing a bit
+    would make a recipe ready that ingredient_match() says is not.
+    """
+
+    def __init__(self, recipes: Iterable[Iterable[str]]):
+        """recipes: per recipe, its ingredient item texts"""
+        self.bits = {}      # (text, nth time in the recipe) → bit index
+        self.texts = []     # bit index → item text
+        self.needs = []     # recipe index → bitset
+        self.sizes = []     # recipe index → popcount(needs), the number of items
+        for items in recipes:
+            need = 0
+            seen = {}
+            for text in items:
+                # A text listed twice in one recipe is two items, like in score_recipe()
+                key = (text, seen.get(text, 0))
+                seen[text] = key[1] + 1
+                bit = self.bits.get(key)
+                if bit is None:
+                    bit = self.bits[key] = len(self.texts)
+                    self.texts.append(text)
+                need |= 1 << bit
+            self.needs.append(need)
+            self.sizes.append(popcount(need))
+
+    def pantry(self, have: Callable[[str], bool]) -> int:
+        """Bitset of items the inventory covers; have() is called once per distinct text"""
+        found = {}
+        bits = 0
+        for bit, text in enumerate(self.texts):
+            if text not in found:
+                found[text] = have(text)
+            if found[text]:
+                bits |= 1 << bit
+        return bits
+
+    def available(self, pantry: int) -> List[int]:
+        """Per recipe, how many of its ingredients are in the pantry"""
+        return [popcount(need & pantry) for need in self.needs]
+
+    def missing(self, pantry: int) -> List[int]:
+        """Per recipe, how many of its ingredients are not"""
+        return [popcount(need & ~pantry) for need in self.needs]
+
+    def scores(self, pantry: int) -> List[int]:
+        """Per recipe, percent of ingredients available (0 for recipes without any)"""
+        return [popcount(need & pantry) * 100 // size if size else 0
+                for need, size in zip(self.needs, self.sizes)]
+
+    def ready(self, pantry: int, min_score: int = 100) -> List[int]:
+        """Indices of recipes scoring at least min_score"""
+        return [i for i, score in enumerate(self.scores(pantry)) if score >= min_score and self.sizes[i]]
+
+    def one_away(self, pantry: int) -> List[Tuple[int, str]]:
+        """(recipe index, the one missing ingredient) for recipes short of exactly one"""
+        result = []
+        for i, need in enumerate(self.needs):
+            gap = need & ~pantry
+            if gap and not gap & (gap - 1):
+                result.append((i, self.texts[gap.bit_length() - 1]))
+        return result
+
+    def missing_texts(self, i: int, pantry: int) -> List[str]:
+        """Item texts recipe i still needs"""
+        gap = self.needs[i] & ~pantry
+        texts = []
+        while gap:
+            low = gap & -gap
+            texts.append(self.texts[low.bit_length() - 1])
+            gap ^= low
+        return texts
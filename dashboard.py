@@ -5,15 +5,32 @@ Run: python3 dashboard.py
 Open: http://localhost:5555
 """
 
+import io
 import os
 import re
 import json
 import socket
+import base64
+import hashlib
+import zlib
+import sqlite3
+import threading
+import time
+from html import escape
 from pathlib import Path
-from http.server import HTTPServer, SimpleHTTPRequestHandler
-from urllib.parse import parse_qs, urlparse, quote
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse, urlencode, quote, unquote
 from collections import Counter
 
+from constellation import build_layout
+from cookable import CookIndex
+from metrics import METRICS
+from watcher import FolderWatcher
+from store import DocStore, fts5_available
+from asyncserver import AsyncHTTPServer
+from profiling import PROFILES, wants_profile, folded_text, summary, render_profiles, render_profile
+from mealplan import MEALS, GUIDANCE_BONUS, text_stems, parse_forbidden, violates, guidance_stems, plan_meals
+
 # Optional semantic search
 try:
     from search import SemanticIndex, is_available as semantic_available
@@ -23,11 +40,15 @@ except ImportError:
     SemanticIndex = None
 
 BASE = Path(__file__).parent
-INVENTORY = BASE / "inventory"
-RECIPES = BASE / "recipes"
-RULES = BASE / "rules"
-TRANSCRIPTS = BASE / "transcripts"
-SHOPLIST_FILE = BASE / ".shoplist.json"
+# Kitchen data lives next to the code unless CHENKIT_DATA points at another tree (e.g. a generated corpus)
+DATA = Path(os.environ.get('CHENKIT_DATA') or BASE)
+INVENTORY = DATA / "inventory"
+RECIPES = DATA / "recipes"
+RULES = DATA / "rules"
+TRANSCRIPTS = DATA / "transcripts"
+SHOPLIST_FILE = DATA / ".shoplist.json"
+SHOPLIST_LOG = DATA / ".shoplist.log"
+STATIC = BASE / "static"
 CORE_RULES_FILE = RULES / "00-glowne-zasady.md"
 
 # PL→EN translation maps (complete phrases only, no word-by-word)
@@ -131,20 +152,26 @@ def parse_md(path):
 
     return result
 
+class Docs(list):
+    """Parsed documents in file order, with a name → document map built once at load"""
+    def __init__(self, docs=()):
+        super().__init__(docs)
+        self.by_name = {doc['name']: doc for doc in self}
+
 def load_folder(folder):
     if not folder.exists():
-        return []
-    return [parse_md(f) for f in sorted(folder.glob("*.md")) if not f.name.startswith('_')]
+        return Docs()
+    return Docs(parse_md(f) for f in sorted(folder.glob("*.md")) if not f.name.startswith('_'))
 
-def get_inventory():
+def get_inventory(docs=None):
     items = set()
-    for inv in load_folder(INVENTORY):
+    for inv in load_folder(INVENTORY) if docs is None else docs:
         items.update(inv['items'])
     return items
 
-def get_inventory_by_category():
+def get_inventory_by_category(docs=None):
     categories = {}
-    for inv in load_folder(INVENTORY):
+    for inv in load_folder(INVENTORY) if docs is None else docs:
         for section, lines in inv.get('sections', {}).items():
             if section not in categories:
                 categories[section] = []
@@ -165,32 +192,163 @@ def extract_key_words(text):
                 words.append(w)
     return words
 
-def ingredient_match(item, inventory):
+# id(inventory) → (inventory, rows); holding the inventory keeps its id from being reused.
+# PL and EN inventories each keep their entry; replaced inventories age out.
+_INVENTORY_ROWS = {}
+_INVENTORY_ROWS_MAX = 8
+_INVENTORY_ROWS_LOCK = threading.Lock()
+
+def inventory_rows(inventory):
+    """Lower-cased inventory lines with their long key words, cached per inventory object"""
+    entry = _INVENTORY_ROWS.get(id(inventory))
+    if entry is not None and entry[0] is inventory:
+        return entry[1]
+    rows = [(inv.lower(), [w for w in extract_key_words(inv) if len(w) > 4]) for inv in inventory]
+    with _INVENTORY_ROWS_LOCK:
+        _INVENTORY_ROWS[id(inventory)] = (inventory, rows)
+        while len(_INVENTORY_ROWS) > _INVENTORY_ROWS_MAX:
+            del _INVENTORY_ROWS[next(iter(_INVENTORY_ROWS))]
+    return rows
+
+def ingredient_match(item, inventory, item_words=None):
     """Smart ingredient matching - matches on key nouns, not adjectives"""
-    item_words = extract_key_words(item)
+    if item_words is None:
+        item_words = extract_key_words(item)
     if not item_words:
         return False
 
-    for inv in inventory:
-        inv_lower = inv.lower()
-        inv_words = extract_key_words(inv)
-
+    item_lower = item.lower()
+    for inv_lower, inv_words in inventory_rows(inventory):
         # Check if main ingredient word matches
         for word in item_words:
             # Direct substring match on the key word
             if word in inv_lower:
                 return True
-            # Check reverse - inv word in item
-            for inv_word in inv_words:
-                if inv_word in item.lower() and len(inv_word) > 4:
-                    return True
+        # Check reverse - inv word in item
+        for inv_word in inv_words:
+            if inv_word in item_lower:
+                return True
     return False
 
 def score_recipe(recipe, inventory):
     if not recipe['items']:
         return 0
-    found = sum(1 for item in recipe['items'] if ingredient_match(item, inventory))
-    return int(found / len(recipe['items']) * 100)
+    found = sum(1 for ing in recipe_ingredients(recipe) if ingredient_match(ing['text'], inventory, ing['words']))
+    return found * 100 // len(recipe['items'])
+
+# Quantity parsing for shopping list aggregation: unit alias → (canonical unit, factor)
+UNIT_ALIASES = {
+    'g': ('g', 1), 'gr': ('g', 1), 'gram': ('g', 1), 'gramy': ('g', 1), 'gramow': ('g', 1), 'gramów': ('g', 1),
+    'grams': ('g', 1), 'dag': ('g', 10), 'kg': ('g', 1000),
+    'ml': ('ml', 1), 'l': ('ml', 1000), 'litr': ('ml', 1000), 'litra': ('ml', 1000), 'litry': ('ml', 1000),
+    'lyzka': ('tbsp', 1), 'lyzki': ('tbsp', 1), 'lyzek': ('tbsp', 1),
+    'łyżka': ('tbsp', 1), 'łyżki': ('tbsp', 1), 'łyżek': ('tbsp', 1),
+    'tablespoon': ('tbsp', 1), 'tablespoons': ('tbsp', 1), 'tbsp': ('tbsp', 1),
+    'lyzeczka': ('tsp', 1), 'lyzeczki': ('tsp', 1), 'lyzeczek': ('tsp', 1),
+    'łyżeczka': ('tsp', 1), 'łyżeczki': ('tsp', 1), 'łyżeczek': ('tsp', 1),
+    'teaspoon': ('tsp', 1), 'teaspoons': ('tsp', 1), 'tsp': ('tsp', 1),
+    'szklanka': ('cup', 1), 'szklanki': ('cup', 1), 'szklanek': ('cup', 1), 'cup': ('cup', 1), 'cups': ('cup', 1),
+    'szt': ('pcs', 1), 'sztuka': ('pcs', 1), 'sztuki': ('pcs', 1), 'sztuk': ('pcs', 1),
+    'piece': ('pcs', 1), 'pieces': ('pcs', 1),
+    'zabek': ('clove', 1), 'zabki': ('clove', 1), 'zabkow': ('clove', 1), 'zabka': ('clove', 1),
+    'ząbek': ('clove', 1), 'ząbki': ('clove', 1), 'ząbków': ('clove', 1), 'ząbka': ('clove', 1),
+    'clove': ('clove', 1), 'cloves': ('clove', 1),
+    'puszka': ('can', 1), 'puszki': ('can', 1), 'puszek': ('can', 1), 'can': ('can', 1), 'cans': ('can', 1),
+    'cm': ('cm', 1),
+}
+UNIT_LABELS = {
+    'pl': {'g': 'g', 'ml': 'ml', 'tbsp': 'łyżki', 'tsp': 'łyżeczki', 'cup': 'szklanki', 'pcs': 'szt.',
+           'clove': 'ząbki', 'can': 'puszki', 'cm': 'cm'},
+    'en': {'g': 'g', 'ml': 'ml', 'tbsp': 'tbsp', 'tsp': 'tsp', 'cup': 'cups', 'pcs': 'pcs',
+           'clove': 'cloves', 'can': 'cans', 'cm': 'cm'},
+}
+NUMBER_WORDS = {'pol': 0.5, 'pół': 0.5, 'half': 0.5, '½': 0.5, '¼': 0.25, '¾': 0.75}
+QTY_LEAD_RE = re.compile(r'^[~≈]?\s*(\d+(?:[.,]\d+)?(?:\s*/\s*\d+)?|pol\b|pół\b|half\b|[½¼¾])\s*', re.IGNORECASE)
+QTY_TRAIL_RE = re.compile(r'\s*[~≈]?\s*(\d+(?:[.,]\d+)?)\s*(g|kg|dag|ml|l)\.?$', re.IGNORECASE)
+
+def _parse_number(text):
+    text = text.lower().replace(',', '.').replace(' ', '')
+    if text in NUMBER_WORDS:
+        return NUMBER_WORDS[text]
+    if '/' in text:
+        num, den = text.split('/', 1)
+        return float(num) / float(den) if float(den) else 0.0
+    return float(text)
+
+def parse_quantity(item):
+    """Split '2 lyzki syropu klonowego' into (2.0, 'tbsp', 'syropu klonowego'). No quantity → (None, None, item)"""
+    m = QTY_LEAD_RE.match(item)
+    if m:
+        amount = _parse_number(m.group(1))
+        rest = item[m.end():]
+        unit_m = re.match(r'([^\W\d]+)\.?(?:\s+|$)', rest)
+        if unit_m and unit_m.group(1).lower() in UNIT_ALIASES:
+            unit, factor = UNIT_ALIASES[unit_m.group(1).lower()]
+            return amount * factor, unit, rest[unit_m.end():].strip() or item
+        return amount, '', rest.strip() or item
+    m = QTY_TRAIL_RE.search(item)
+    if m:
+        unit, factor = UNIT_ALIASES[m.group(2).lower()]
+        return _parse_number(m.group(1)) * factor, unit, item[:m.start()].strip() or item
+    return None, None, item
+
+def ingredient_key(name):
+    """Merge key: 4-letter stems of the key words, so 'mleko kokosowe' and 'mleka kokosowego' collapse"""
+    words = extract_key_words(re.sub(r'\(.*?\)', ' ', name))
+    if not words:
+        return name.strip().lower()
+    return ' '.join(sorted({w[:4] for w in words}))
+
+def recipe_ingredients(recipe):
+    """Per-recipe ingredient keys, tokenized once and cached on the parsed recipe"""
+    cached = recipe.get('_ingredients')
+    if cached is None:
+        cached = []
+        for item in recipe['items']:
+            qty, unit, name = parse_quantity(item)
+            cached.append({'text': item, 'words': extract_key_words(item), 'name': name,
+                           'qty': qty, 'unit': unit, 'key': ingredient_key(name)})
+        recipe['_ingredients'] = cached
+    return cached
+
+def _format_amount(amount):
+    return str(int(amount)) if float(amount).is_integer() else f'{amount:.2f}'.rstrip('0').rstrip('.')
+
+def missing_ingredients(recipes, inventory, lang='pl'):
+    """
+    Ingredients of the given recipes not covered by the inventory, merged
+    across recipes by ingredient_key with quantities summed per unit.
+    A recipe listed twice counts twice (two planned meals).
+    """
+    merged = {}
+    for r in recipes:
+        title = r.get('title', r['name']).replace('Recipe: ', '')
+        for ing in recipe_ingredients(r):
+            if ingredient_match(ing['text'], inventory, ing['words']):
+                continue
+            entry = merged.get(ing['key'])
+            if entry is None:
+                name = ing['name'][:1].upper() + ing['name'][1:]
+                entry = merged[ing['key']] = {'name': name, 'amounts': {}, 'recipes': []}
+            if ing['qty'] is not None:
+                entry['amounts'][ing['unit']] = entry['amounts'].get(ing['unit'], 0) + ing['qty']
+            if title not in entry['recipes']:
+                entry['recipes'].append(title)
+
+    labels = UNIT_LABELS.get(lang, UNIT_LABELS['pl'])
+    result = []
+    for key, entry in merged.items():
+        parts = [f"{_format_amount(v)} {labels[u]}" if u else f"{_format_amount(v)}x"
+                 for u, v in entry['amounts'].items()]
+        text = entry['name'] + (f" ({' + '.join(parts)})" if parts else '')
+        result.append({'key': key, 'text': text, 'amounts': entry['amounts'], 'recipes': entry['recipes']})
+    result.sort(key=lambda e: e['text'].lower())
+    return result
+
+def find_recipes(d, names):
+    """Resolve recipe names to parsed recipes, keeping order and repeats"""
+    by_name = d['recipes'].by_name
+    return [by_name[n] for n in names if n in by_name]
 
 def get_recipe_tags_stats(recipes):
     tags = Counter()
@@ -219,13 +377,14 @@ def get_rules_summary(rules):
     return do_items, dont_items
 
 # Load data — Polish (default)
-ALL_RECIPES = load_folder(RECIPES)
-ALL_INVENTORY = get_inventory()
-ALL_RULES = load_folder(RULES)
-ALL_INV_DATA = load_folder(INVENTORY)
-ALL_TRANSCRIPTS = load_folder(TRANSCRIPTS)
-INV_BY_CAT = get_inventory_by_category()
-TAGS_STATS = get_recipe_tags_stats(ALL_RECIPES)
+with METRICS.timer('load', 'startup'):
+    ALL_RECIPES = load_folder(RECIPES)
+    ALL_INVENTORY = get_inventory()
+    ALL_RULES = load_folder(RULES)
+    ALL_INV_DATA = load_folder(INVENTORY)
+    ALL_TRANSCRIPTS = load_folder(TRANSCRIPTS)
+    INV_BY_CAT = get_inventory_by_category()
+    TAGS_STATS = get_recipe_tags_stats(ALL_RECIPES)
 RULES_DO, RULES_DONT = get_rules_summary(ALL_RULES)
 
 # Load English translations if available
@@ -235,22 +394,15 @@ INVENTORY_EN = INVENTORY / "en"
 
 def load_en_data():
     """Load English translated data if en/ folders exist"""
-    data = {'recipes': [], 'rules': [], 'inv_data': [], 'inventory': set(), 'inv_by_cat': {}}
+    data = {'recipes': Docs(), 'rules': Docs(), 'inv_data': Docs(), 'inventory': set(), 'inv_by_cat': {}}
     if RECIPES_EN.exists() and any(RECIPES_EN.glob("*.md")):
         data['recipes'] = load_folder(RECIPES_EN)
     if RULES_EN.exists() and any(RULES_EN.glob("*.md")):
         data['rules'] = load_folder(RULES_EN)
     if INVENTORY_EN.exists() and any(INVENTORY_EN.glob("*.md")):
-        data['inv_data'] = [parse_md(f) for f in sorted(INVENTORY_EN.glob("*.md")) if not f.name.startswith('_')]
-        for inv in data['inv_data']:
-            data['inventory'].update(inv['items'])
-        for inv in data['inv_data']:
-            for section, lines in inv.get('sections', {}).items():
-                if section not in data['inv_by_cat']:
-                    data['inv_by_cat'][section] = []
-                for line in lines:
-                    if line.startswith('- '):
-                        data['inv_by_cat'][section].append(line[2:].strip().replace('[ ] ', ''))
+        data['inv_data'] = load_folder(INVENTORY_EN)
+        data['inventory'] = get_inventory(data['inv_data'])
+        data['inv_by_cat'] = get_inventory_by_category(data['inv_data'])
     return data
 
 EN_DATA = load_en_data()
@@ -258,18 +410,27 @@ EN_DATA = load_en_data()
 def get_data(lang='pl'):
     """Return the right dataset based on language"""
     if lang == 'en':
+        rules_do, rules_dont = (DERIVED.get(('rules_summary', 'en'), lambda: get_rules_summary(EN_DATA['rules']))
+                                if EN_DATA['rules'] else (RULES_DO, RULES_DONT))
         return {
+            'lang': 'en',
             'recipes': EN_DATA['recipes'] or ALL_RECIPES,
             'rules': EN_DATA['rules'] or ALL_RULES,
+            'transcripts': ALL_TRANSCRIPTS,
+            'inv_data': EN_DATA['inv_data'] or ALL_INV_DATA,
             'inventory': EN_DATA['inventory'] or ALL_INVENTORY,
             'inv_by_cat': EN_DATA['inv_by_cat'] or INV_BY_CAT,
-            'tags_stats': get_recipe_tags_stats(EN_DATA['recipes']) if EN_DATA['recipes'] else TAGS_STATS,
-            'rules_do': get_rules_summary(EN_DATA['rules'])[0] if EN_DATA['rules'] else RULES_DO,
-            'rules_dont': get_rules_summary(EN_DATA['rules'])[1] if EN_DATA['rules'] else RULES_DONT,
+            'tags_stats': (DERIVED.get(('tags_stats', 'en'), lambda: get_recipe_tags_stats(EN_DATA['recipes']))
+                           if EN_DATA['recipes'] else TAGS_STATS),
+            'rules_do': rules_do,
+            'rules_dont': rules_dont,
         }
     return {
+        'lang': 'pl',
         'recipes': ALL_RECIPES,
         'rules': ALL_RULES,
+        'transcripts': ALL_TRANSCRIPTS,
+        'inv_data': ALL_INV_DATA,
         'inventory': ALL_INVENTORY,
         'inv_by_cat': INV_BY_CAT,
         'tags_stats': TAGS_STATS,
@@ -282,25 +443,544 @@ SEARCH_INDEX = None
 if SEMANTIC_ENABLED:
     try:
         print("[CHEN-KIT] Loading semantic search model...")
-        SEARCH_INDEX = SemanticIndex()
-        count = SEARCH_INDEX.index_all(ALL_RECIPES, ALL_RULES, ALL_TRANSCRIPTS)
+        with METRICS.timer('reindex', 'startup'):
+            SEARCH_INDEX = SemanticIndex()
+            count = SEARCH_INDEX.index_all(ALL_RECIPES, ALL_RULES, ALL_TRANSCRIPTS)
         print(f"[CHEN-KIT] Indexed {count} documents for semantic search")
     except Exception as e:
         print(f"[CHEN-KIT] Semantic search disabled: {e}")
         SEARCH_INDEX = None
 
-def load_shoplist():
-    """Load shopping lists or return default"""
-    if SHOPLIST_FILE.exists():
+def reindex_search(changes=None):
+    """Re-embed changed documents after a reload, or everything without changes (no-op when semantic search is off)"""
+    global SEARCH_INDEX
+    if not (SEMANTIC_ENABLED and SEARCH_INDEX):
+        return
+    with METRICS.timer('reindex', 'semantic'):
+        if changes is None:
+            SEARCH_INDEX = SemanticIndex()
+            SEARCH_INDEX.index_all(ALL_RECIPES, ALL_RULES, ALL_TRANSCRIPTS)
+            return
+        updates = {}
+        for key, doc_type, docs in (('recipes', 'recipe', ALL_RECIPES), ('rules', 'rule', ALL_RULES),
+                                    ('transcripts', 'transcript', ALL_TRANSCRIPTS)):
+            if key in changes:
+                names = changes[key].changed | changes[key].removed
+                updates[doc_type] = (names, [docs.by_name[n] for n in sorted(changes[key].changed) if n in docs.by_name])
+        if updates:
+            SEARCH_INDEX.update(updates, ALL_RECIPES, ALL_RULES)
+
+# Bumped by every reload (apply_changes); rendered fragments are only valid for one version
+DATA_VERSION = 0
+
+def bump_data_version():
+    """Mark loaded data as changed so cached fragments get rebuilt"""
+    global DATA_VERSION
+    DATA_VERSION += 1
+
+class FragmentCache:
+    """Rendered HTML fragments for the current data version, dropped wholesale when it changes"""
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.version = DATA_VERSION
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, build):
+        with self.lock:
+            if self.version != DATA_VERSION:
+                self.entries.clear()
+                self.version = DATA_VERSION
+            html = self.entries.get(key)
+            if html is not None:
+                self.hits += 1
+                return html
+            self.misses += 1
+            version = self.version
+        # Built outside the lock; two threads racing on one key both render, last one wins
+        html = build()
+        with self.lock:
+            # A reload during build() may have fed it old data; serve that once, never cache it for the new version
+            if self.version != version or version != DATA_VERSION:
+                return html
+            if len(self.entries) >= self.max_entries:
+                self.entries.pop(next(iter(self.entries)))
+            self.entries[key] = html
+        return html
+
+FRAGMENTS = FragmentCache()
+# Summaries and stats derived from loaded data, per language
+DERIVED = FragmentCache(max_entries=64)
+
+# Folders the dashboard reads; scandir is not recursive, so en/ is watched on its own
+WATCHED = {'recipes': RECIPES, 'rules': RULES, 'inventory': INVENTORY, 'transcripts': TRANSCRIPTS,
+           'recipes_en': RECIPES_EN, 'rules_en': RULES_EN, 'inventory_en': INVENTORY_EN}
+WATCHER = FolderWatcher(WATCHED, interval=float(os.environ.get('CHENKIT_WATCH_INTERVAL', 1.0)))
+RELOAD_LOCK = threading.Lock()
+
+def reload_docs(docs, folder, changes):
+    """Docs with only the changed files parsed again; every other document is reused as is"""
+    by_name = dict(docs.by_name)
+    for name in changes.removed:
+        by_name.pop(name, None)
+    for name in changes.changed:
+        try:
+            by_name[name] = parse_md(folder / f"{name}.md")
+        except FileNotFoundError:       # deleted again since the scan
+            by_name.pop(name, None)
+        except (OSError, ValueError) as e:
+            print(f"[CHEN-KIT] Keeping the old {folder.name}/{name}.md: {e}")
+    # Same order as load_folder's sorted glob
+    return Docs(by_name[name] for name in sorted(by_name, key=lambda name: name + '.md'))
+
+def changed_docs(docs, changes):
+    return [docs.by_name[n] for n in changes.changed | changes.removed if n in docs.by_name]
+
+def apply_changes(changes):
+    """Reload the changed files of each folder and what is derived from them, then reindex those files"""
+    global ALL_RECIPES, ALL_INVENTORY, ALL_RULES, ALL_INV_DATA, ALL_TRANSCRIPTS, INV_BY_CAT, TAGS_STATS, RULES_DO, RULES_DONT, EN_DATA
+    if not changes:
+        return
+    with RELOAD_LOCK:
+        if 'recipes' in changes:
+            with METRICS.timer('reload', 'recipes'):
+                old = ALL_RECIPES
+                ALL_RECIPES = reload_docs(old, RECIPES, changes['recipes'])
+                tags = TAGS_STATS.copy()
+                tags.subtract(get_recipe_tags_stats(changed_docs(old, changes['recipes'])))
+                tags.update(get_recipe_tags_stats(changed_docs(ALL_RECIPES, changes['recipes'])))
+                TAGS_STATS = +tags
+        if 'rules' in changes:
+            with METRICS.timer('reload', 'rules'):
+                ALL_RULES = reload_docs(ALL_RULES, RULES, changes['rules'])
+                RULES_DO, RULES_DONT = get_rules_summary(ALL_RULES)
+        if 'inventory' in changes:
+            with METRICS.timer('reload', 'inventory'):
+                ALL_INV_DATA = reload_docs(ALL_INV_DATA, INVENTORY, changes['inventory'])
+                ALL_INVENTORY = get_inventory(ALL_INV_DATA)
+                INV_BY_CAT = get_inventory_by_category(ALL_INV_DATA)
+        if 'transcripts' in changes:
+            with METRICS.timer('reload', 'transcripts'):
+                ALL_TRANSCRIPTS = reload_docs(ALL_TRANSCRIPTS, TRANSCRIPTS, changes['transcripts'])
+        if any(key.endswith('_en') for key in changes):
+            with METRICS.timer('reload', 'en'):
+                en = dict(EN_DATA)
+                if 'recipes_en' in changes:
+                    en['recipes'] = reload_docs(en['recipes'], RECIPES_EN, changes['recipes_en'])
+                if 'rules_en' in changes:
+                    en['rules'] = reload_docs(en['rules'], RULES_EN, changes['rules_en'])
+                if 'inventory_en' in changes:
+                    en['inv_data'] = reload_docs(en['inv_data'], INVENTORY_EN, changes['inventory_en'])
+                    en['inventory'] = get_inventory(en['inv_data'])
+                    en['inv_by_cat'] = get_inventory_by_category(en['inv_data'])
+                EN_DATA = en
+        sync_store(changes)
+        bump_data_version()
+    reindex_search(changes)
+
+def sync_data(*touched):
+    """Pick up file changes since the last scan; call after writing files (touched) to apply them now"""
+    changes = WATCHER.poll(touched)
+    apply_changes(changes)
+    return changes
+
+def cook_index(lang='pl'):
+    """(CookIndex over the recipes, pantry bitset of the inventory), built once per data version"""
+    def build():
+        d = get_data(lang)
+        index = CookIndex([[ing['text'] for ing in recipe_ingredients(r)] for r in d['recipes']])
+        # Same matching as score_recipe() and missing_ingredients(), so every view agrees on what is in stock
+        return index, index.pantry(lambda text: ingredient_match(text, d['inventory']))
+    return DERIVED.get(('cook_index', lang), build)
+
+def recipe_scores(lang='pl'):
+    """Recipe name → percent of its ingredients in stock, from the bitset engine"""
+    def build():
+        index, pantry = cook_index(lang)
+        return dict(zip((r['name'] for r in get_data(lang)['recipes']), index.scores(pantry)))
+    return DERIVED.get(('recipe_scores', lang), build)
+
+def count_ready(lang='pl', min_score=100):
+    """How many recipes have at least min_score percent of their ingredients in stock"""
+    index, pantry = cook_index(lang)
+    return len(index.ready(pantry, min_score))
+
+# Recipe tags that place a recipe at a meal (soups go to lunch or dinner)
+MEAL_TAGS = {'breakfast': ['breakfast'], 'lunch': ['lunch'], 'dinner': ['dinner'], 'soup': ['lunch', 'dinner']}
+OTHER_CATEGORIES = ['dessert', 'snack', 'drink']
+MEALPLAN_MAX_DAYS = 28
+
+def recipe_tags(recipe):
+    return [t for t in re.split(r'[,\s\[\]]+', recipe['meta'].get('tags', '').lower()) if t]
+
+def recipe_meals(recipe):
+    """Meals a recipe can be planned for, from its tags"""
+    meals = []
+    for tag in recipe_tags(recipe):
+        for meal in MEAL_TAGS.get(tag, []):
+            if meal not in meals:
+                meals.append(meal)
+    return meals
+
+def categorize_recipe(recipe):
+    """First meal the recipe fits, else dessert/snack/drink, else 'other'"""
+    meals = recipe_meals(recipe)
+    if meals:
+        return meals[0]
+    tags = recipe_tags(recipe)
+    return next((c for c in OTHER_CATEGORIES if c in tags), 'other')
+
+def forbidden_bans():
+    """Core rule Zakazy lines parsed into ingredient bans (see mealplan.parse_forbidden)"""
+    forbidden = tuple(get_core_rules()['forbidden'])
+    return DERIVED.get(('forbidden_bans', forbidden), lambda: parse_forbidden(forbidden))
+
+def has_forbidden_combo(recipe):
+    """True if the recipe's ingredients break one of the core rule bans"""
+    return violates(text_stems(recipe['items']), forbidden_bans())
+
+def meal_plan(lang='pl', days=7):
+    """
+    Days of {meal: recipe or None} from mealplan.plan_meals: recipes tagged for
+    the meal and free of forbidden combos, with a bonus for matching the core
+    rules' meal guidance. Built once per data version.
+    """
+    def build():
+        d = get_data(lang)
+        index, pantry = cook_index(lang)
+        bans = forbidden_bans()
+        meal_rules = get_core_rules()['meals']
+        guidance = {meal: guidance_stems(meal_rules.get(meal, '')) for meal in MEALS}
+        candidates = {meal: [] for meal in MEALS}
+        for i, r in enumerate(d['recipes']):
+            if not index.sizes[i]:
+                continue
+            stems = text_stems(r['items'])
+            if violates(stems, bans):
+                continue
+            for meal in recipe_meals(r):
+                candidates[meal].append((i, GUIDANCE_BONUS if stems & guidance[meal] else 0))
+        plan = plan_meals(index.needs, pantry, candidates, days)
+        return [{meal: d['recipes'][i] if i is not None else None for meal, i in day.items()} for day in plan]
+    return DERIVED.get(('meal_plan', lang, days), build)
+
+# SQLite mirror of recipes and rules for indexed search and tag lookups (CHENKIT_SQLITE=1)
+STORE_FILE = DATA / ".chenkit.sqlite"
+STORE_COLLECTIONS = {'recipes': ('recipe', 'pl'), 'rules': ('rule', 'pl'),
+                     'recipes_en': ('recipe', 'en'), 'rules_en': ('rule', 'en')}
+
+def store_docs(kind, lang):
+    if lang == 'en':
+        return EN_DATA[kind + 's']
+    return ALL_RECIPES if kind == 'recipe' else ALL_RULES
+
+def sync_store(changes=None):
+    """Mirror changed documents (all of them, compared by digest, without changes) into STORE"""
+    if STORE is None:
+        return
+    with METRICS.timer('reindex', 'sqlite'):
+        for key, (kind, lang) in STORE_COLLECTIONS.items():
+            if changes is None:
+                STORE.sync(kind, lang, store_docs(kind, lang))
+            elif key in changes:
+                STORE.sync(kind, lang, store_docs(kind, lang), changes[key].changed | changes[key].removed)
+
+def store_lang(d, kind):
+    """Store collection behind get_data(lang): English falls back to Polish like get_data does"""
+    return 'en' if d['lang'] == 'en' and EN_DATA[kind + 's'] else 'pl'
+
+def store_search(d, kind, query):
+    """Documents containing query via the FTS index, or None to fall back to a scan"""
+    if STORE is None:
+        return None
+    names = STORE.search(kind, store_lang(d, kind), query)
+    if names is None:
+        return None
+    docs = d[kind + 's']
+    return [docs.by_name[name] for name in names if name in docs.by_name]
+
+def store_snippets(d, kind, query, names=None):
+    """name → highlighted snippet html for keyword hits; empty without the store"""
+    if STORE is None:
+        return {}
+    return STORE.snippets(kind, store_lang(d, kind), query, names)
+
+def add_snippets(d, query, items):
+    """Fill the snippet field of one page of keyword search hits"""
+    for kind in ('recipe', 'rule'):
+        rows = [item for item in items if item.get('type') == kind and 'snippet' in item and 'name' in item]
+        if rows:
+            found = store_snippets(d, kind, query, [item['name'] for item in rows])
+            for item in rows:
+                item['snippet'] = found.get(item['name'])
+
+def filter_listing(d, kind, tag='', category=''):
+    """Recipes or rules with a tag and/or category, via the store's indexes when it is on"""
+    docs = d[kind + 's']
+    if not (tag or category):
+        return docs
+    if STORE is not None:
+        lang = store_lang(d, kind)
+        names = None
+        if tag:
+            names = set(STORE.with_tag(kind, lang, tag))
+        if category:
+            found = set(STORE.with_meta(kind, lang, 'category', category))
+            names = found if names is None else names & found
+        return [doc for doc in docs if doc['name'] in names]
+    return [doc for doc in docs
+            if (not tag or tag.lower() in recipe_tags(doc)) and (not category or doc['meta'].get('category') == category)]
+
+STORE = None
+if os.environ.get('CHENKIT_SQLITE', '') not in ('', '0'):
+    if fts5_available():
+        try:
+            STORE = DocStore(STORE_FILE, recipe_tags, lambda r: [(i['text'], i['key']) for i in recipe_ingredients(r)])
+            sync_store()
+            print(f"[CHEN-KIT] SQLite store: {STORE_FILE.name}")
+        except sqlite3.Error as e:
+            print(f"[CHEN-KIT] SQLite store disabled: {e}")
+            STORE = None
+    else:
+        print("[CHEN-KIT] SQLite store disabled: this sqlite3 has no FTS5 trigram tokenizer (3.34+)")
+
+def fsync_dir(folder):
+    """Make a rename in folder durable (POSIX; directories cannot be opened on Windows)"""
+    try:
+        fd = os.open(folder, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+class ShoplistStore:
+    """
+    Shopping lists kept in memory. Every action is appended to a write-ahead
+    log before it is applied, so a tap costs one small append instead of a
+    full rewrite. The log is folded into the JSON snapshot (written to a temp
+    file and renamed into place) once it grows past `compact_every` records.
+    Items carry a stable id (from `next_id`), so a tap from a phone showing an
+    older list still hits the item it shows, or nothing if that item is gone.
+    Pre-fork workers share both files and call refresh() to catch up.
+    """
+
+    def __init__(self, path, log_path, compact_every=500):
+        self.path = path
+        self.log_path = log_path
+        self.compact_every = compact_every
+        self.lock = threading.Lock()
+        self._load()
+
+    def _snapshot_id(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_ino, st.st_mtime_ns)
+        except OSError:
+            return None
+
+    def _load(self):
+        self.data = {'lists': [{'name': 'Shopping List', 'items': []}]}
+        self.snapshot_id = self._snapshot_id()
+        if self.path.exists():
+            try:
+                self.data = json.loads(self.path.read_text(encoding='utf-8'))
+            except (ValueError, OSError):
+                pass
+        self.seq = self.data.pop('seq', 0)
+        # Snapshots from before item ids: number their items in order (the same in every process)
+        self.data.setdefault('next_id', 1)
+        for l in self.data['lists']:
+            for item in l['items']:
+                if 'id' not in item:
+                    item['id'] = self._next_id()
+        self.log_records = 0
+        self._replay()
+
+    def _replay(self):
+        """Apply log records newer than seq"""
+        try:
+            lines = self.log_path.read_text(encoding='utf-8').splitlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # torn final write
+            # Records already folded into the snapshot by an interrupted compaction
+            if record.get('seq', 0) <= self.seq:
+                continue
+            self._apply(record)
+            self.seq = record['seq']
+            self.log_records += 1
+
+    def refresh(self):
+        """Pick up records another process wrote; start over if it compacted the log"""
+        with self.lock:
+            if self._snapshot_id() != self.snapshot_id:
+                self._load()
+            else:
+                self._replay()
+
+    def snapshot(self):
+        """Copy of the lists safe to render while other requests mutate the store"""
+        with self.lock:
+            return {'lists': [{'name': l['name'], 'items': [dict(i) for i in l['items']]}
+                              for l in self.data['lists']]}
+
+    def _next_id(self):
+        item_id = self.data['next_id']
+        self.data['next_id'] = item_id + 1
+        return item_id
+
+    @staticmethod
+    def _item_index(items, item_id):
+        return next((i for i, item in enumerate(items) if item['id'] == item_id), None)
+
+    def action(self, body):
+        """Validate and apply one client action. Returns the delta, or None if it was a no-op"""
+        with self.lock:
+            record = self._resolve(body)
+            if record is None:
+                return None
+            self.seq += 1
+            record['seq'] = self.seq
+            self._append(record)
+            self._apply(record)
+            if self.log_records >= self.compact_every:
+                self._compact()
+            return record
+
+    def _resolve(self, body):
+        """Turn a request body into a deterministic log record (indices checked, toggles made explicit)"""
+        lists = self.data['lists']
+        action = body.get('action', '')
+        li = body.get('list_idx', 0)
+        has_list = isinstance(li, int) and 0 <= li < len(lists)
+        # Items are addressed by id; an id that is not (or no longer) on the list is rejected
+        item_id = body.get('item_id')
+        ii = self._item_index(lists[li]['items'], item_id) if has_list and isinstance(item_id, int) else None
+        has_item = ii is not None
+
+        if action == 'create_list':
+            return {'action': action, 'name': str(body.get('name', 'New List')).strip()}
+        if action == 'rename_list' and has_list:
+            name = str(body.get('name', lists[li]['name'])).strip()
+            return {'action': action, 'list_idx': li, 'name': name}
+        if action == 'delete_list' and has_list:
+            return {'action': action, 'list_idx': li}
+        if action == 'add_item' and has_list:
+            text = str(body.get('text', '')).strip()
+            if text:
+                return {'action': action, 'list_idx': li, 'text': text, 'id': self.data['next_id']}
+        if action == 'add_items' and has_list:
+            # Bulk append (e.g. missing recipe ingredients) as one record; skip items already open on the list
+            open_items = {i['text'].lower() for i in lists[li]['items'] if not i['checked']}
+            texts = []
+            for text in body.get('texts', []):
+                text = str(text).strip()
+                if text and text.lower() not in open_items:
+                    open_items.add(text.lower())
+                    texts.append(text)
+            if texts:
+                first = self.data['next_id']
+                return {'action': action, 'list_idx': li, 'texts': texts, 'ids': list(range(first, first + len(texts)))}
+        if action == 'toggle_item' and has_item:
+            # An explicit target state keeps two phones tapping the same item idempotent
+            checked = body.get('checked')
+            if checked is None:
+                checked = not lists[li]['items'][ii]['checked']
+            return {'action': action, 'list_idx': li, 'item_id': item_id, 'checked': bool(checked)}
+        if action == 'delete_item' and has_item:
+            return {'action': action, 'list_idx': li, 'item_id': item_id}
+        return None
+
+    def _apply(self, record):
+        lists = self.data['lists']
+        action = record['action']
+        if action == 'create_list':
+            lists.append({'name': record['name'], 'items': []})
+        elif action == 'rename_list':
+            lists[record['list_idx']]['name'] = record['name']
+        elif action == 'delete_list':
+            lists.pop(record['list_idx'])
+        elif action == 'add_item':
+            lists[record['list_idx']]['items'].append(self._new_item(record['text'], record.get('id')))
+        elif action == 'add_items':
+            ids = record.get('ids') or [None] * len(record['texts'])
+            lists[record['list_idx']]['items'].extend(self._new_item(t, i) for t, i in zip(record['texts'], ids))
+        elif action in ('toggle_item', 'delete_item'):
+            items = lists[record['list_idx']]['items']
+            # Logs written before item ids address the item by position
+            ii = self._item_index(items, record['item_id']) if 'item_id' in record else record['item_idx']
+            if action == 'toggle_item':
+                items[ii]['checked'] = record['checked']
+            else:
+                items.pop(ii)
+
+    def _new_item(self, text, item_id=None):
+        if item_id is None:
+            item_id = self._next_id()
+        else:
+            self.data['next_id'] = max(self.data['next_id'], item_id + 1)
+        return {'id': item_id, 'text': text, 'checked': False}
+
+    def _append(self, record):
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        fd = os.open(self.log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
         try:
-            return json.loads(SHOPLIST_FILE.read_text(encoding='utf-8'))
-        except:
-            pass
-    return {'lists': [{'name': 'Shopping List', 'items': []}]}
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        self.log_records += 1
+
+    def _compact(self):
+        """Write snapshot + seq to a temp file, rename it over the old one, then drop the log"""
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(dict(self.data, seq=self.seq), ensure_ascii=False))
+            f.flush()
+            # On disk before the rename: a crash must never leave a short snapshot and no log
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        fsync_dir(self.path.parent)
+        self.log_path.unlink(missing_ok=True)
+        self.log_records = 0
+        self.snapshot_id = self._snapshot_id()
+
+    def compact(self):
+        with self.lock:
+            self._compact()
+
+SHOPLIST = ShoplistStore(SHOPLIST_FILE, SHOPLIST_LOG)
+
+# Pre-fork mode (CHENKIT_WORKERS > 1): the shared version and write lock, set in __main__
+PREFORK = None
+SEEN_VERSION = 0
+CATCH_UP_LOCK = threading.Lock()
+PREFORK_LOCK_FILE = DATA / ".chenkit.lock"
+
+def catch_up():
+    """Pre-fork worker: apply what other processes wrote since this one last looked"""
+    global SEEN_VERSION
+    if PREFORK is None or PREFORK.version.value == SEEN_VERSION:
+        return
+    with CATCH_UP_LOCK:
+        version = PREFORK.version.value
+        if version != SEEN_VERSION:
+            sync_data()
+            SHOPLIST.refresh()
+            SEEN_VERSION = version
 
-def save_shoplist(data):
-    """Save shopping lists to file"""
-    SHOPLIST_FILE.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+def load_shoplist():
+    """Current shopping lists (snapshot of the in-memory store)"""
+    return SHOPLIST.snapshot()
 
 def md_to_html(text):
     """Convert basic markdown to HTML (bold only)"""
@@ -310,6 +990,14 @@ def md_to_html(text):
     return text
 
 def get_core_rules():
+    """Core diet rules, re-parsed only after a reload or when the file changes on disk"""
+    try:
+        mtime = CORE_RULES_FILE.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+    return DERIVED.get(('core_rules', mtime), parse_core_rules)
+
+def parse_core_rules():
     """Parse core diet rules from 00-glowne-zasady.md"""
     if not CORE_RULES_FILE.exists():
         return {'meals': {}, 'forbidden': [], 'notes': []}
@@ -339,6 +1027,35 @@ def get_core_rules():
 
     return rules
 
+def get_knowledge_stats(rules):
+    """Rules grouped by full category path (e.g. diet/core) with their do/dont items, and tag counts"""
+    subcategories = {}
+    all_tags = Counter()
+    for r in rules:
+        cat = r['meta'].get('category', 'general')
+        if cat not in subcategories:
+            subcategories[cat] = {'rules': [], 'do': [], 'dont': []}
+        subcategories[cat]['rules'].append(r)
+
+        # Collect tags
+        tags_str = r['meta'].get('tags', '')
+        for tag in re.split(r'[,\s]+', tags_str):
+            tag = tag.strip().lower()
+            if tag and len(tag) > 2:
+                all_tags[tag] += 1
+
+        # Collect do/dont from this rule
+        for section, lines in r.get('sections', {}).items():
+            sec_lower = section.lower()
+            for line in lines:
+                if line.startswith('- '):
+                    item = line[2:].strip().replace('[ ] ', '')
+                    if sec_lower in ['zakazy', 'dont', "don't", 'unikaj']:
+                        subcategories[cat]['dont'].append(item)
+                    elif sec_lower in ['zasady', 'do', 'praktyki', 'knowledge base']:
+                        subcategories[cat]['do'].append(item)
+    return subcategories, all_tags
+
 HTML = '''<!DOCTYPE html>
 <html>
 <head>
@@ -346,340 +1063,7 @@ HTML = '''<!DOCTYPE html>
 <meta name="viewport" content="width=device-width, initial-scale=1.0">
 <title>CHEN-KIT</title>
 <link href="https://fonts.googleapis.com/css2?family=VT323&display=swap" rel="stylesheet">
-<style>
-* { box-sizing: border-box; margin: 0; padding: 0; }
-body {
-    font-family: 'SF Mono', 'Fira Code', monospace;
-    background: #0d1117;
-    color: #c9d1d9;
-    min-height: 100vh;
-}
-a { color: #58a6ff; text-decoration: none; }
-a:hover { text-decoration: underline; }
-
-.header {
-    background: #161b22;
-    padding: 15px 20px;
-    border-bottom: 1px solid #30363d;
-    display: flex;
-    align-items: center;
-    justify-content: space-between;
-}
-.logo { font-size: 14px; color: #8b949e; letter-spacing: 2px; }
-.stats-row { display: flex; gap: 25px; }
-.stat { text-align: center; }
-.stat-value { font-size: 20px; font-weight: bold; color: #58a6ff; }
-.stat-label { font-size: 9px; color: #8b949e; text-transform: uppercase; }
-
-.nav {
-    display: flex;
-    background: #161b22;
-    border-bottom: 1px solid #30363d;
-    padding: 0 20px;
-}
-.nav a {
-    color: #8b949e;
-    padding: 10px 18px;
-    font-size: 11px;
-    text-transform: uppercase;
-    letter-spacing: 1px;
-    border-bottom: 2px solid transparent;
-}
-.nav a:hover { color: #c9d1d9; text-decoration: none; }
-.nav a.active { color: #58a6ff; border-bottom: 2px solid #f85149; }
-
-.search-box {
-    padding: 12px 20px;
-    background: #161b22;
-    border-bottom: 1px solid #30363d;
-}
-.search-box input {
-    width: 100%;
-    padding: 10px 15px;
-    background: #0d1117;
-    border: 1px solid #30363d;
-    border-radius: 6px;
-    color: #c9d1d9;
-    font-family: inherit;
-    font-size: 14px;
-}
-.search-box input:focus { outline: none; border-color: #58a6ff; }
-.search-box input::placeholder { color: #484f58; }
-
-.main-layout {
-    display: grid;
-    grid-template-columns: 340px 1fr 300px;
-    height: calc(100vh - 130px);
-}
-.sidebar {
-    border-right: 1px solid #30363d;
-    overflow-y: auto;
-    background: #0d1117;
-}
-.content {
-    padding: 20px;
-    overflow-y: auto;
-    background: #0d1117;
-}
-.right-panel {
-    border-left: 1px solid #30363d;
-    overflow-y: auto;
-    background: #161b22;
-    padding: 15px;
-}
-
-/* Mobile responsive */
-@media (max-width: 900px) {
-    .main-layout { grid-template-columns: 1fr; height: auto; }
-    .sidebar { display: none; }
-    .right-panel { display: none; }
-    .header { flex-direction: column; gap: 10px; text-align: center; }
-    .nav { flex-wrap: wrap; justify-content: center; padding: 10px; }
-    .nav a { padding: 8px 12px; font-size: 10px; }
-    .content { padding: 15px; }
-    .stats-row { flex-wrap: wrap; justify-content: center; }
-}
-
-/* Retro pager style */
-body.retro {
-    background: #0a0a0a;
-    font-family: 'VT323', 'Courier New', monospace;
-}
-body.retro::before {
-    content: '';
-    position: fixed;
-    top: 0; left: 0; right: 0; bottom: 0;
-    background: linear-gradient(rgba(0,255,136,0.03) 50%, transparent 50%);
-    background-size: 100% 4px;
-    pointer-events: none;
-    z-index: 9999;
-}
-body.retro .header { background: #0a0a0a; border-color: #00ff88; }
-body.retro .nav { background: #0a0a0a; border-color: #00ff88; }
-body.retro .nav a { color: #8b949e; }
-body.retro .nav a.active { color: #00ff88; border-color: #00ff88; text-shadow: 0 0 10px rgba(0,255,136,0.5); }
-body.retro .stat-value { color: #00ff88; text-shadow: 0 0 10px rgba(0,255,136,0.3); }
-body.retro a { color: #00ff88; }
-body.retro .panel { border-color: #00ff88; background: #0a0a0a; }
-body.retro .list-item:hover { background: rgba(0,255,136,0.1); }
-body.retro .list-item.selected { border-color: #00ff88; background: rgba(0,255,136,0.1); }
-body.retro .category { background: #111; color: #00ff88; }
-body.retro h2, body.retro h3 { color: #00ff88; }
-body.retro .rule-item.do { border-color: #00ff88; }
-body.retro .rule-item.dont { border-color: #ff4444; }
-body.retro .search-box input { background: #0a0a0a; border-color: #00ff88; color: #00ff88; }
-body.retro .btn-save { background: #00ff88; color: #0a0a0a; }
-
-.list-item {
-    padding: 12px 15px;
-    border-bottom: 1px solid #21262d;
-    cursor: pointer;
-}
-.list-item:hover { background: #161b22; }
-.list-item.selected { background: #1f6feb22; border-left: 3px solid #58a6ff; }
-.list-item .title { color: #c9d1d9; font-size: 13px; line-height: 1.3; }
-.list-item .meta { font-size: 11px; color: #8b949e; margin-top: 4px; }
-
-.category {
-    background: #21262d;
-    padding: 10px 15px;
-    font-size: 11px;
-    text-transform: uppercase;
-    letter-spacing: 1px;
-    color: #8b949e;
-    position: sticky;
-    top: 0;
-}
-.inv-item {
-    padding: 8px 15px 8px 25px;
-    border-bottom: 1px solid #21262d;
-    color: #8b949e;
-    font-size: 12px;
-}
-
-.panel {
-    background: #161b22;
-    border: 1px solid #30363d;
-    border-radius: 8px;
-    padding: 20px;
-    margin-bottom: 15px;
-}
-.panel h2 {
-    font-size: 18px;
-    color: #c9d1d9;
-    margin-bottom: 15px;
-    padding-bottom: 10px;
-    border-bottom: 1px solid #30363d;
-}
-.panel h3 {
-    font-size: 12px;
-    color: #f85149;
-    text-transform: uppercase;
-    letter-spacing: 1px;
-    margin: 15px 0 10px;
-}
-
-.stats-grid {
-    display: grid;
-    grid-template-columns: repeat(3, 1fr);
-    gap: 15px;
-    margin-bottom: 20px;
-}
-.stat-card {
-    background: #21262d;
-    padding: 15px;
-    border-radius: 6px;
-    text-align: center;
-}
-.stat-card .num { font-size: 28px; font-weight: bold; color: #58a6ff; }
-.stat-card .label { font-size: 10px; color: #8b949e; text-transform: uppercase; margin-top: 5px; }
-
-.tags-cloud { display: flex; flex-wrap: wrap; gap: 8px; }
-.tag {
-    background: #21262d;
-    padding: 4px 10px;
-    border-radius: 12px;
-    font-size: 11px;
-    color: #8b949e;
-}
-.tag .count { color: #58a6ff; margin-left: 5px; }
-
-.ingredient { padding: 6px 0; font-size: 13px; display: flex; align-items: center; }
-.ingredient .check { margin-right: 10px; font-size: 14px; }
-.has { color: #3fb950; }
-.missing { color: #8b949e; }
-.missing .check { color: #f85149; }
-
-.step { padding: 8px 0; color: #8b949e; font-size: 13px; line-height: 1.5; }
-
-.rule-item {
-    padding: 8px 0;
-    font-size: 11px;
-    color: #8b949e;
-    border-bottom: 1px solid #21262d;
-}
-.rule-item.do { border-left: 3px solid #3fb950; padding-left: 10px; }
-.rule-item.dont { border-left: 3px solid #f85149; padding-left: 10px; }
-
-.cat-stat {
-    display: flex;
-    justify-content: space-between;
-    padding: 6px 0;
-    font-size: 12px;
-    border-bottom: 1px solid #21262d;
-}
-.cat-stat .name { color: #8b949e; }
-.cat-stat .count { color: #58a6ff; }
-
-.rp-section { margin-bottom: 20px; }
-.rp-section h4 {
-    font-size: 10px;
-    color: #8b949e;
-    text-transform: uppercase;
-    letter-spacing: 1px;
-    margin-bottom: 8px;
-    padding-bottom: 5px;
-    border-bottom: 1px solid #30363d;
-}
-
-.search-info {
-    background: #1f6feb22;
-    border: 1px solid #1f6feb;
-    border-radius: 6px;
-    padding: 10px 15px;
-    margin-bottom: 15px;
-    font-size: 13px;
-    color: #58a6ff;
-}
-
-.cat-link {
-    cursor: pointer;
-    transition: color 0.2s;
-}
-.cat-link:hover {
-    color: #58a6ff !important;
-}
-
-.suggestions {
-    display: flex;
-    flex-wrap: wrap;
-    gap: 8px;
-    margin-top: 10px;
-}
-.sugg {
-    background: #21262d;
-    padding: 5px 12px;
-    border-radius: 15px;
-    font-size: 11px;
-    color: #8b949e;
-    cursor: pointer;
-    transition: all 0.2s;
-}
-.sugg:hover { background: #30363d; color: #c9d1d9; }
-.sugg.hot { border: 1px solid #f85149; color: #f85149; }
-.sugg.tag { border: 1px solid #58a6ff; color: #58a6ff; }
-
-.edit-btn {
-    display: inline-block;
-    padding: 6px 14px;
-    background: #21262d;
-    border: 1px solid #30363d;
-    border-radius: 6px;
-    color: #8b949e;
-    font-size: 12px;
-    cursor: pointer;
-    text-decoration: none;
-    margin-right: 8px;
-    transition: all 0.2s;
-}
-.edit-btn:hover { background: #30363d; color: #c9d1d9; border-color: #58a6ff; }
-
-.edit-form {
-    background: #161b22;
-    border: 1px solid #30363d;
-    border-radius: 8px;
-    padding: 20px;
-    margin-bottom: 15px;
-}
-.edit-form textarea {
-    width: 100%;
-    min-height: 300px;
-    background: #0d1117;
-    border: 1px solid #30363d;
-    border-radius: 6px;
-    color: #c9d1d9;
-    font-family: 'SF Mono', monospace;
-    font-size: 13px;
-    padding: 15px;
-    resize: vertical;
-}
-.edit-form textarea:focus { outline: none; border-color: #58a6ff; }
-.edit-form .actions { margin-top: 15px; display: flex; gap: 10px; }
-.btn-save {
-    background: #238636;
-    border: none;
-    padding: 8px 20px;
-    border-radius: 6px;
-    color: white;
-    font-size: 13px;
-    cursor: pointer;
-}
-.btn-save:hover { background: #2ea043; }
-.btn-cancel {
-    background: transparent;
-    border: 1px solid #30363d;
-    padding: 8px 20px;
-    border-radius: 6px;
-    color: #8b949e;
-    font-size: 13px;
-    cursor: pointer;
-    text-decoration: none;
-}
-.btn-cancel:hover { border-color: #8b949e; color: #c9d1d9; }
-
-.shop-item:hover { background: #161b22; }
-.shop-checked { opacity: 0.7; }
-</style>
+<link rel="stylesheet" href="{{CSS_URL}}">
 </head>
 <body>
 
@@ -703,6 +1087,7 @@ body.retro .btn-save { background: #00ff88; color: #0a0a0a; }
     <a href="/?view=inventory&lang={{LANG}}" class="{{NAV_INVENTORY}}">Inventory</a>
     <a href="/?view=knowledge&lang={{LANG}}" class="{{NAV_KNOWLEDGE}}">Knowledge</a>
     <a href="/?view=shoplist&lang={{LANG}}" class="{{NAV_SHOPLIST}}">🛒 Shop List</a>
+    <a href="/?view=mealplan&lang={{LANG}}" class="{{NAV_MEALPLAN}}">📅 Meal Plan</a>
     <a href="/constellation" style="color:#f0883e">✦ Constellation</a>
     <a href="/?view=about&lang={{LANG}}" class="{{NAV_ABOUT}}" style="margin-left:auto">About</a>
 </div>
@@ -717,7 +1102,7 @@ body.retro .btn-save { background: #00ff88; color: #0a0a0a; }
 </div>
 
 <div class="main-layout">
-    <div class="sidebar">
+    <div class="sidebar" data-selected="{{SELECTED}}">
         {{SIDEBAR}}
     </div>
     <div class="content">
@@ -728,100 +1113,407 @@ body.retro .btn-save { background: #00ff88; color: #0a0a0a; }
     </div>
 </div>
 
-<script>
-// Style toggle
-function toggleRetro() {
-    document.body.classList.toggle('retro');
-    const btn = document.getElementById('style-toggle');
-    if (document.body.classList.contains('retro')) {
-        btn.textContent = '◉ RETRO';
-        btn.style.background = '#00ff88';
-        btn.style.color = '#0a0a0a';
-        localStorage.setItem('chen-kit-retro', '1');
-    } else {
-        btn.textContent = '◐ RETRO';
-        btn.style.background = '#21262d';
-        btn.style.color = '#8b949e';
-        localStorage.removeItem('chen-kit-retro');
+<script src="{{JS_URL}}"></script>
+</body>
+</html>'''
+
+# Template split once at import: even indices are static text, odd indices are {{SLOT}} names
+HTML_PARTS = re.split(r'\{\{(\w+)\}\}', HTML)
+
+def render_template(parts, values):
+    """Fill a pre-split template with a single join; slots without a value render empty"""
+    out = parts[:]
+    out[1::2] = [values.get(name, '') for name in parts[1::2]]
+    return ''.join(out)
+
+# Responses smaller than this are sent as-is; gzip framing would eat the saving
+GZIP_MIN_SIZE = 1024
+
+def gzip_bytes(body, level=6):
+    """gzip-encode with stdlib zlib (wbits=31 selects the gzip container)"""
+    z = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return z.compress(body) + z.flush()
+
+def accepts_gzip(accept_encoding):
+    """True when an Accept-Encoding header allows gzip (an explicit q=0, or an unparsable q, refuses it)"""
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if coding.strip().lower() in ('gzip', '*'):
+            q = params.strip().replace(' ', '')
+            if not q.startswith('q='):
+                return True
+            try:
+                return float(q[2:] or 0) > 0
+            except ValueError:
+                return False
+    return False
+
+# CSS/JS shared by every page, served from /static/ instead of being inlined
+STATIC_TYPES = {'.css': 'text/css; charset=utf-8', '.js': 'application/javascript; charset=utf-8',
+                '.html': 'text/html; charset=utf-8', '.json': 'application/json'}
+
+def make_asset(body, content_type):
+    """Cacheable response body with its gzip variant and a content-hash ETag"""
+    return {'body': body, 'gzip': gzip_bytes(body), 'type': content_type,
+            'etag': hashlib.sha1(body).hexdigest()[:16]}
+
+def load_static_assets():
+    """Read static/ and the constellation shell once"""
+    assets = {}
+    if STATIC.exists():
+        for f in sorted(STATIC.iterdir()):
+            if f.suffix in STATIC_TYPES:
+                assets[f.name] = make_asset(f.read_bytes(), STATIC_TYPES[f.suffix])
+    shell = BASE / 'constellation.html'
+    if shell.exists():
+        assets[shell.name] = make_asset(shell.read_bytes(), STATIC_TYPES['.html'])
+    return assets
+
+STATIC_ASSETS = load_static_assets()
+
+def static_url(name):
+    """Versioned asset URL: the content hash changes whenever the file does"""
+    asset = STATIC_ASSETS.get(name)
+    return f"/static/{name}?v={asset['etag']}" if asset else f"/static/{name}"
+
+def etag_matches(if_none_match, etag):
+    """True when an If-None-Match header covers the given quoted ETag"""
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(',')]
+    return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+def build_constellation_data(d):
+    """Recipes and rules reduced to what the constellation view draws"""
+    data = {
+        'recipes': [],
+        'rules': []
     }
-}
-// Restore retro mode from localStorage
-if (localStorage.getItem('chen-kit-retro')) {
-    document.body.classList.add('retro');
-    document.getElementById('style-toggle').textContent = '◉ RETRO';
-    document.getElementById('style-toggle').style.background = '#00ff88';
-    document.getElementById('style-toggle').style.color = '#0a0a0a';
+
+    for r in d['recipes']:
+        title = r.get('title', r['name']).replace('Recipe: ', '')
+        tags = r['meta'].get('tags', '').replace('[', '').replace(']', '')
+        tag_list = [t.strip() for t in re.split(r'[,\s]+', tags) if t.strip()]
+        ingredients = []
+        if 'Ingredients' in r.get('sections', {}):
+            for line in r['sections']['Ingredients']:
+                ing = line.lstrip('- [ ] ').strip()
+                # Extract key word
+                words = extract_key_words(ing)
+                if words:
+                    ingredients.append(words[0].capitalize())
+                elif ing:
+                    ingredients.append(ing[:20])
+
+        data['recipes'].append({
+            'title': title,
+            'tags': tag_list,
+            'ingredients': ingredients[:10]  # Limit to 10
+        })
+
+    for r in d['rules']:
+        title = r.get('title', r['name']).replace('# ', '').strip()
+        cat = r['meta'].get('category', 'general')
+        tags_str = r['meta'].get('tags', '')
+        rule_tags = [t.strip() for t in re.split(r'[,\s]+', tags_str) if t.strip()]
+        priority = r['meta'].get('priority', '3')
+        data['rules'].append({
+            'title': title,
+            'category': cat,
+            'tags': rule_tags,
+            'priority': priority
+        })
+
+    return data
+
+def constellation_parts():
+    """Constellation layout as [base, ingredient chunk 0, 1, ...] assets, built and compressed once per data version"""
+    def build():
+        layout = build_layout(build_constellation_data(get_data('pl')))
+        parts = [layout['base']] + layout['chunks']
+        # Every part names the build it belongs to, so a client streaming chunks can tell when data reloaded under it
+        version = hashlib.sha1(json.dumps(parts, ensure_ascii=False).encode()).hexdigest()[:16]
+        for part in parts:
+            part['version'] = version
+        return [make_asset(json.dumps(part, ensure_ascii=False).encode(), STATIC_TYPES['.json']) for part in parts]
+    return FRAGMENTS.get(('constellation.json',), build)
+
+def constellation_payload(chunk=None):
+    """/api/constellation.json body: the base graph, or ingredient chunk n streamed after it"""
+    parts = constellation_parts()
+    if chunk is None:
+        return parts[0]
+    if not chunk.isdigit() or int(chunk) + 1 >= len(parts):
+        return None
+    return parts[int(chunk) + 1]
+
+# Read-only JSON API: /api/recipes[/<name>], /api/rules[/<name>], /api/inventory, /api/search
+API_PAGE_SIZE = 50
+API_MAX_PAGE = 500
+# List endpoints return these unless ?fields= asks for more
+API_LIST_FIELDS = {
+    'recipes': ['name', 'title', 'meta'],
+    'rules': ['name', 'title', 'meta'],
+    'inventory': ['category', 'item'],
+    'search': ['type', 'name', 'title', 'score', 'snippet'],
 }
 
-// PL/EN language toggle — server-side translation via lang= param
-function toggleLang() {
-    const url = new URL(window.location.href);
-    const current = url.searchParams.get('lang') || 'pl';
-    const next = current === 'en' ? 'pl' : 'en';
-    url.searchParams.set('lang', next);
-    window.location.href = url.toString();
+# Metric route labels; unknown paths count as 'other' so label cardinality stays bounded
+METRIC_VIEWS = {'home', 'recipes', 'inventory', 'knowledge', 'shoplist', 'mealplan', 'about'}
+METRIC_ROUTES = {
+    '/constellation', '/api/constellation.json', '/api/metrics',
+    '/api/recipes', '/api/rules', '/api/inventory', '/api/sidebar', '/api/search', '/api/shoplist/missing',
+    '/api/clear_inventory', '/api/create_recipe', '/api/delete_recipe', '/api/create_knowledge',
+    '/api/delete_knowledge', '/api/shoplist', '/admin/profiles',
 }
-// Update button state from URL
-(function() {
-    const url = new URL(window.location.href);
-    const lang = url.searchParams.get('lang') || 'pl';
-    const btn = document.getElementById('lang-toggle');
-    if (btn) {
-        btn.textContent = lang.toUpperCase();
-        btn.style.color = lang === 'en' ? '#3fb950' : '#f0883e';
-    }
-})();
-
-// Keyboard navigation
-(function() {
-    const sidebar = document.querySelector('.sidebar');
-    const items = Array.from(sidebar.querySelectorAll('a[href]'));
-    let currentIdx = items.findIndex(a => a.querySelector('.selected'));
-    if (currentIdx < 0) currentIdx = 0;
-
-    function highlight(idx) {
-        items.forEach((item, i) => {
-            const div = item.querySelector('.list-item');
-            if (div) {
-                if (i === idx) {
-                    div.classList.add('selected');
-                    item.scrollIntoView({ block: 'nearest', behavior: 'smooth' });
-                } else {
-                    div.classList.remove('selected');
-                }
-            }
-        });
+
+QUERY_KEY_RE = re.compile(r'(?:^|&)(view|edit|add_inv|del_inv)=([^&]*)')
+
+def route_label(method, path):
+    """'view=recipes', '/api/recipes/:name', '/?edit'... for a request path (runs on every request, so no parse_qs)"""
+    path, _, query = path.partition('?')
+    if path.startswith('/static/'):
+        return '/static'
+    if path == '/':
+        keys = dict(QUERY_KEY_RE.findall(query))
+        if method == 'POST':
+            return next((f'/?{a}' for a in ('add_inv', 'del_inv', 'edit') if a in keys), '/')
+        if 'edit' in keys:
+            return 'view=edit'
+        view = keys.get('view') or 'recipes'
+        view = 'knowledge' if view == 'rules' else view
+        return f"view={view if view in METRIC_VIEWS else 'other'}"
+    for prefix in ('/api/recipes/', '/api/rules/', '/admin/profiles/'):
+        if path.startswith(prefix):
+            return prefix + ':name'
+    return path if path in METRIC_ROUTES else 'other'
+
+class ApiError(Exception):
+    """Client error in an API request, reported as {"error": ...} with the given status"""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def public_doc(doc, fields=None):
+    """Parsed document without its private _cache keys, optionally narrowed to fields"""
+    if fields:
+        return {f: doc[f] for f in fields if f in doc and not f.startswith('_')}
+    return {k: v for k, v in doc.items() if not k.startswith('_')}
+
+def encode_cursor(offset):
+    return base64.urlsafe_b64encode(str(offset).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        offset = int(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode())
+    except ValueError:
+        offset = -1
+    if offset < 0:
+        raise ApiError(400, 'invalid cursor')
+    return offset
+
+def api_page(items, params, default_fields):
+    """One page of items: ?limit= (max API_MAX_PAGE), opaque ?cursor= from the previous page's next_cursor"""
+    try:
+        limit = min(max(int(params.get('limit', [API_PAGE_SIZE])[0]), 1), API_MAX_PAGE)
+    except ValueError:
+        raise ApiError(400, 'invalid limit')
+    cursor = params.get('cursor', [''])[0]
+    start = decode_cursor(cursor) if cursor else 0
+    fields = [f for f in params.get('fields', [''])[0].split(',') if f] or default_fields
+    end = start + limit
+    return {
+        'items': [public_doc(item, fields) for item in items[start:end]],
+        'total': len(items),
+        'next_cursor': encode_cursor(end) if end < len(items) else None,
     }
 
-    document.addEventListener('keydown', e => {
-        // Ignore if typing in input
-        if (e.target.tagName === 'INPUT' || e.target.tagName === 'TEXTAREA') return;
-
-        if (e.key === 'ArrowDown' || e.key === 'j') {
-            e.preventDefault();
-            currentIdx = Math.min(currentIdx + 1, items.length - 1);
-            highlight(currentIdx);
-        } else if (e.key === 'ArrowUp' || e.key === 'k') {
-            e.preventDefault();
-            currentIdx = Math.max(currentIdx - 1, 0);
-            highlight(currentIdx);
-        } else if (e.key === 'Enter') {
-            e.preventDefault();
-            if (items[currentIdx]) items[currentIdx].click();
-        } else if (e.key === '/') {
-            e.preventDefault();
-            document.querySelector('.search-box input')?.focus();
-        }
-    });
-
-    // Click to update currentIdx
-    items.forEach((item, i) => {
-        item.addEventListener('click', () => { currentIdx = i; });
-    });
-})();
-</script>
-</body>
-</html>'''
+def api_search(d, params):
+    """Keyword (or ?sem=1 semantic) hits over recipes and rules, ?type=recipe|rule to narrow"""
+    query = params.get('q', [''])[0].strip()
+    if not query:
+        raise ApiError(400, 'missing q')
+    doc_type = params.get('type', [''])[0] or None
+    if doc_type not in (None, 'recipe', 'rule'):
+        raise ApiError(400, 'type must be recipe or rule')
+    collections = [(t, d[t + 's']) for t in ('recipe', 'rule') if doc_type in (None, t)]
+
+    if params.get('sem', [''])[0] == '1' and SEARCH_INDEX is not None:
+        by_name = {(t, doc['name']): doc for t, docs in collections for doc in docs}
+        hits = []
+        # The index holds one entry per section; keep each document's best-ranked one
+        for hit in SEARCH_INDEX.search(query, top_k=API_MAX_PAGE, doc_type=doc_type):
+            doc = by_name.pop((hit['type'], hit['name']), None)
+            if doc is not None:
+                hits.append(dict(doc, type=hit['type'], score=hit['score']))
+        return hits
+
+    q_lower = query.lower()
+    hits = []
+    for t, docs in collections:
+        found = store_search(d, t, query)
+        if found is None:
+            found = [doc for doc in docs if q_lower in doc['content'].lower()]
+        # snippet is filled per page by add_snippets()
+        hits.extend(dict(doc, type=t, score=None, snippet=None) for doc in found)
+    return hits
+
+def api_payload(path, params):
+    """(status, JSON-able body) for an /api/ read route, or None if the path is not one"""
+    d = get_data(params.get('lang', ['pl'])[0])
+    parts = path.strip('/').split('/')
+    try:
+        if len(parts) == 2 and parts[1] in ('recipes', 'rules'):
+            docs = filter_listing(d, parts[1][:-1], params.get('tag', [''])[0], params.get('category', [''])[0])
+            return 200, api_page(docs, params, API_LIST_FIELDS[parts[1]])
+        if len(parts) == 3 and parts[1] in ('recipes', 'rules'):
+            name = unquote(parts[2])
+            doc = d[parts[1]].by_name.get(name)
+            if doc is None:
+                raise ApiError(404, f'no such {parts[1][:-1]}: {name}')
+            fields = [f for f in params.get('fields', [''])[0].split(',') if f]
+            return 200, public_doc(doc, fields)
+        if parts == ['api', 'inventory']:
+            cat = params.get('cat', [''])[0]
+            rows = [{'category': section, 'item': item} for section, items in d['inv_by_cat'].items()
+                    if not cat or section == cat for item in items]
+            return 200, api_page(rows, params, API_LIST_FIELDS['inventory'])
+        if parts == ['api', 'sidebar']:
+            view = params.get('view', [''])[0]
+            if view not in ('home', 'recipes', 'inventory', 'knowledge'):
+                raise ApiError(400, 'view must be home, recipes, inventory or knowledge')
+            rows = sidebar_rows(view, params.get('lang', ['pl'])[0], params.get('q', [''])[0],
+                                params.get('sem', [''])[0] == '1' and SEARCH_INDEX is not None,
+                                params.get('cat', [''])[0])
+            return 200, api_page(rows, params, ['name', 'html'])
+        if parts == ['api', 'search']:
+            page = api_page(api_search(d, params), params, API_LIST_FIELDS['search'])
+            add_snippets(d, params.get('q', [''])[0].strip(), page['items'])
+            return 200, page
+    except ApiError as e:
+        return e.status, {'error': str(e)}
+    return None
+
+def filter_recipes(d, query, semantic_mode=False):
+    """Recipes matching a sidebar search, plus a note for the results header"""
+    if not query:
+        return d['recipes'], ''
+    if semantic_mode and SEARCH_INDEX:
+        results = SEARCH_INDEX.search(query, top_k=30, doc_type='recipe')
+        matched_names = {r['name'] for r in results}
+        recipes = [r for r in d['recipes'] if r['name'] in matched_names]
+        # Sort by semantic score
+        score_map = {r['name']: r['score'] for r in results}
+        recipes = sorted(recipes, key=lambda r: score_map.get(r['name'], 0), reverse=True)
+        return recipes, f" (semantic, {len(recipes)} hits)"
+    found = store_search(d, 'recipe', query)
+    if found is not None:
+        return found, ''
+    q_lower = query.lower()
+    return [r for r in d['recipes'] if q_lower in r['content'].lower()], ''
+
+def filter_rules(d, query, semantic_mode=False):
+    """Knowledge articles matching a sidebar search, plus a note for the results header"""
+    if not query:
+        return d['rules'], ''
+    if semantic_mode and SEARCH_INDEX:
+        results = SEARCH_INDEX.search(query, top_k=20, doc_type='rule')
+        matched_names = {r['name'] for r in results}
+        rules = [r for r in d['rules'] if r['name'] in matched_names]
+        score_map = {r['name']: r['score'] for r in results}
+        return sorted(rules, key=lambda r: score_map.get(r['name'], 0), reverse=True), " (semantic)"
+    # Tags and category are meta lines of the content, so a content match covers them
+    found = store_search(d, 'rule', query)
+    if found is not None:
+        return found, ''
+    q_lower = query.lower()
+    return [r for r in d['rules'] if
+            q_lower in r['content'].lower() or
+            q_lower in r['meta'].get('tags', '').lower() or
+            q_lower in r['meta'].get('category', '').lower()], ''
+
+# Sidebar rows sent with the page; the rest load from /api/sidebar as the list scrolls
+SIDEBAR_WINDOW = 60
+
+def build_sidebar_rows(view, lang, query='', semantic_mode=False, cat_filter=''):
+    """
+    Sidebar as [{'name', 'html'}] rows. Rows carry no selection state (the
+    page marks data-name == selected client-side), so one list serves every
+    selection; name is '' for headers.
+    """
+    d = get_data(lang)
+    rows = []
+
+    def link(name, href, inner):
+        rows.append({'name': name, 'html': f'''<a href="{href}" data-name="{name}" style="text-decoration:none;color:inherit">
+                    <div class="list-item">{inner}</div></a>'''})
+
+    if view == 'home':
+        for r in d['rules']:
+            title = tr_title(r.get('title', r['name']).replace('# ', '').strip(), lang)[:35]
+            link(r['name'], f"/?view=home&id={r['name']}&lang={lang}", f'<div class="title">{title}</div>')
+
+    elif view == 'recipes':
+        link_query = f"&q={quote(query)}" if query else ""
+        # With the SQLite store, keyword hits show where the query matched instead of their tags
+        snippets = store_snippets(d, 'recipe', query) if query and not semantic_mode else {}
+        for r in filter_recipes(d, query, semantic_mode)[0]:
+            title = r.get('title', r['name']).replace('Recipe: ', '')
+            tags = r['meta'].get('tags', '')
+            time_str = r['meta'].get('time', '')
+            meta_str = snippets.get(r['name']) or f"{tags}" + (f" · {time_str}" if time_str else "")
+            link(r['name'], f"/?id={r['name']}{link_query}",
+                 f'<div class="title">{title}</div><div class="meta">{meta_str}</div>')
+
+    elif view == 'inventory':
+        for section, items in d['inv_by_cat'].items():
+            is_active = section == cat_filter
+            style = 'background:#1f6feb22;color:#58a6ff' if is_active else ''
+            rows.append({'name': '', 'html': f'<a href="/?view=inventory&cat={quote(section)}&lang={lang}" style="text-decoration:none"><div class="category" style="{style}">{section} ({len(items)})</div></a>'})
+            if is_active or not cat_filter:
+                shown = items if is_active else items[:10]
+                rows.extend({'name': '', 'html': f'<div class="inv-item">{item}</div>'} for item in shown)
+                if not is_active and len(items) > 10:
+                    rows.append({'name': '', 'html': f'<div class="inv-item" style="color:#58a6ff">+{len(items)-10} more...</div>'})
+
+    elif view == 'knowledge':
+        rules_to_show, search_info = filter_rules(d, query, semantic_mode)
+        if query:
+            rows.append({'name': '', 'html': f'<div style="padding:10px 15px;background:#1f6feb22;color:#58a6ff;font-size:12px">🔍 "{escape(query)}" ({len(rules_to_show)}){search_info}</div>'})
+            rows.append({'name': '', 'html': '<a href="/?view=knowledge" style="padding:8px 15px;display:block;color:#8b949e;font-size:11px">✕ clear</a>'})
+        # Group rules by domain
+        domains = {}
+        for r in rules_to_show:
+            cat = r['meta'].get('category', 'general')
+            domains.setdefault(cat.split('/')[0] if '/' in cat else cat, []).append(r)
+        for domain, rules in sorted(domains.items()):
+            rows.append({'name': '', 'html': f'<div class="category">{domain.upper()}</div>'})
+            for r in rules:
+                title = r.get('title', r['name']).replace('Diet Rule Template', '').replace('# ', '').strip()
+                if not title:
+                    title = r['name']
+                title = tr_title(title, lang)
+                link(r['name'], f"/?view=knowledge&id={r['name']}&lang={lang}", f'<div class="title">{title[:40]}</div>')
+
+    return rows
+
+def sidebar_rows(view, lang, query='', semantic_mode=False, cat_filter=''):
+    """build_sidebar_rows(), cached per data version"""
+    return FRAGMENTS.get(('sidebar_rows', view, lang, query, semantic_mode, cat_filter),
+                         lambda: build_sidebar_rows(view, lang, query, semantic_mode, cat_filter))
+
+def render_sidebar(view, lang, selected='', query='', semantic_mode=False, cat_filter=''):
+    """First window of the sidebar (stretched to include the selection) and a loader for the rest"""
+    rows = sidebar_rows(view, lang, query, semantic_mode, cat_filter)
+    end = SIDEBAR_WINDOW
+    if selected:
+        end = max(end, next((i + 1 for i, row in enumerate(rows) if row['name'] == selected), 0))
+    html = ''.join(row['html'] for row in rows[:end])
+    if end < len(rows):
+        more = urlencode({'view': view, 'lang': lang, 'q': query, 'sem': '1' if semantic_mode else '',
+                          'cat': cat_filter, 'cursor': encode_cursor(end), 'limit': SIDEBAR_WINDOW})
+        html += f'<div class="sidebar-more" data-src="/api/sidebar?{more}" data-shown="{end}">{len(rows) - end} more…</div>'
+    return html
 
 def build_suggestions(query=''):
     """Build search suggestions based on popular tags and ingredients"""
@@ -830,7 +1522,8 @@ def build_suggestions(query=''):
     for tag, count in TAGS_STATS.most_common(5):
         suggestions.append(('tag', tag))
     # High-availability recipes
-    scored = sorted([(score_recipe(r, ALL_INVENTORY), r) for r in ALL_RECIPES], reverse=True, key=lambda x: x[0])
+    scores = recipe_scores()
+    scored = sorted([(scores[r['name']], r) for r in ALL_RECIPES], reverse=True, key=lambda x: x[0])
     for pct, r in scored[:3]:
         if pct >= 80:
             title = r.get('title', r['name']).replace('Recipe: ', '')[:20]
@@ -838,18 +1531,93 @@ def build_suggestions(query=''):
     return suggestions
 
 class Handler(SimpleHTTPRequestHandler):
+    # Keep-alive: every response below carries a Content-Length
+    protocol_version = 'HTTP/1.1'
+    # Idle keep-alive connections are dropped after this many seconds
+    timeout = 30
+
     def log_message(self, format, *args):
         pass
 
+    def send_response(self, code, message=None):
+        self.status = code
+        super().send_response(code, message)
+
+    def timed(self, method, handle):
+        """Run a request and record its latency and status under its route label"""
+        self.status = None
+        route = route_label(method, self.path)
+        start = time.perf_counter()
+        try:
+            catch_up()
+            if wants_profile(self.path):
+                PROFILES.run(method, self.path, route, handle)
+            else:
+                handle()
+        finally:
+            METRICS.observe_request(method, route, self.status or 500, time.perf_counter() - start)
+
     def do_POST(self):
-        """Handle edit form submissions and meal plan saves"""
-        global ALL_RECIPES, ALL_INVENTORY, ALL_RULES, ALL_INV_DATA, ALL_TRANSCRIPTS, INV_BY_CAT, TAGS_STATS, RULES_DO, RULES_DONT, SEARCH_INDEX, EN_DATA
+        self.timed('POST', self.handle_post if PREFORK is None else self.handle_post_prefork)
+
+    def do_GET(self):
+        self.timed('GET', self.handle_get)
+
+    def send_body(self, body, content_type, status=200, gzipped=None, headers=()):
+        """Send a complete response, gzip-encoded when the client accepts it"""
+        if len(body) >= GZIP_MIN_SIZE and accepts_gzip(self.headers.get('Accept-Encoding')):
+            body = gzipped if gzipped is not None else gzip_bytes(body)
+            headers = list(headers) + [('Content-Encoding', 'gzip')]
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept-Encoding')
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, data):
+        self.send_body(json.dumps(data, ensure_ascii=False).encode(), 'application/json')
 
+    def send_redirect(self, location):
+        self.send_response(302)
+        self.send_header('Location', location)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def handle_post_prefork(self):
+        """One writer across all workers; a write that changed anything bumps the shared version.
+        The response is held back until then, so the client's next request sees the write on any worker."""
+        global SEEN_VERSION
+        wfile, self.wfile = self.wfile, io.BytesIO()
+        try:
+            with PREFORK.write_lock:
+                catch_up()
+                before = (DATA_VERSION, SHOPLIST.seq)
+                try:
+                    self.handle_post()
+                finally:
+                    if (DATA_VERSION, SHOPLIST.seq) != before:
+                        SEEN_VERSION = PREFORK.bump()
+        finally:
+            response, self.wfile = self.wfile.getvalue(), wfile
+            wfile.write(response)
+
+    def handle_post(self):
+        """Handle edit form submissions and meal plan saves"""
         parsed = urlparse(self.path)
         params = parse_qs(parsed.query)
 
+        # Empty the profile ring buffer
+        if parsed.path == '/admin/profiles' and 'clear' in params:
+            PROFILES.clear()
+            self.send_redirect('/admin/profiles')
+            return
+
         # Handle clear all inventory
         if parsed.path == '/api/clear_inventory':
+            written = []
             for inv_file in INVENTORY.glob("*.md"):
                 content = inv_file.read_text(encoding='utf-8')
                 # Keep headers and structure, remove all checklist items
@@ -859,13 +1627,9 @@ class Handler(SimpleHTTPRequestHandler):
                         continue
                     new_lines.append(line)
                 inv_file.write_text('\n'.join(new_lines), encoding='utf-8')
-            ALL_INVENTORY = get_inventory()
-            ALL_INV_DATA = load_folder(INVENTORY)
-            INV_BY_CAT = get_inventory_by_category()
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({'ok': True}).encode())
+                written.append(inv_file)
+            sync_data(*written)
+            self.send_json({'ok': True})
             return
 
         # Handle create new recipe
@@ -891,15 +1655,8 @@ time: 30min
 2. Step two
 """
                     file_path.write_text(template, encoding='utf-8')
-                    ALL_RECIPES = load_folder(RECIPES)
-                    TAGS_STATS = get_recipe_tags_stats(ALL_RECIPES)
-                    if SEMANTIC_ENABLED and SEARCH_INDEX:
-                        SEARCH_INDEX = SemanticIndex()
-                        SEARCH_INDEX.index_all(ALL_RECIPES, ALL_RULES, ALL_TRANSCRIPTS)
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({'ok': True, 'id': slug if name else ''}).encode())
+                    sync_data(file_path)
+            self.send_json({'ok': True, 'id': slug if name else ''})
             return
 
         # Handle delete recipe
@@ -910,15 +1667,8 @@ time: 30min
             file_path = RECIPES / f"{file_id}.md"
             if file_path.exists():
                 file_path.unlink()
-                ALL_RECIPES = load_folder(RECIPES)
-                TAGS_STATS = get_recipe_tags_stats(ALL_RECIPES)
-                if SEMANTIC_ENABLED and SEARCH_INDEX:
-                    SEARCH_INDEX = SemanticIndex()
-                    SEARCH_INDEX.index_all(ALL_RECIPES, ALL_RULES, ALL_TRANSCRIPTS)
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({'ok': True}).encode())
+                sync_data(file_path)
+            self.send_json({'ok': True})
             return
 
         # Handle create new knowledge article
@@ -947,15 +1697,8 @@ priority: 3
 Additional notes go here.
 """
                     file_path.write_text(template, encoding='utf-8')
-                    ALL_RULES = load_folder(RULES)
-                    RULES_DO, RULES_DONT = get_rules_summary(ALL_RULES)
-                    if SEMANTIC_ENABLED and SEARCH_INDEX:
-                        SEARCH_INDEX = SemanticIndex()
-                        SEARCH_INDEX.index_all(ALL_RECIPES, ALL_RULES, ALL_TRANSCRIPTS)
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({'ok': True, 'id': slug if name else ''}).encode())
+                    sync_data(file_path)
+            self.send_json({'ok': True, 'id': slug if name else ''})
             return
 
         # Handle delete knowledge article
@@ -966,58 +1709,22 @@ Additional notes go here.
             file_path = RULES / f"{file_id}.md"
             if file_path.exists():
                 file_path.unlink()
-                ALL_RULES = load_folder(RULES)
-                RULES_DO, RULES_DONT = get_rules_summary(ALL_RULES)
-                if SEMANTIC_ENABLED and SEARCH_INDEX:
-                    SEARCH_INDEX = SemanticIndex()
-                    SEARCH_INDEX.index_all(ALL_RECIPES, ALL_RULES, ALL_TRANSCRIPTS)
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({'ok': True}).encode())
+                sync_data(file_path)
+            self.send_json({'ok': True})
             return
 
         # Handle shopping list API
         if parsed.path == '/api/shoplist':
             content_length = int(self.headers['Content-Length'])
             body = json.loads(self.rfile.read(content_length).decode('utf-8'))
-            action = body.get('action', '')
-            shoplist = load_shoplist()
-            lists = shoplist.get('lists', [])
-
-            if action == 'create_list':
-                name = body.get('name', 'New List').strip()
-                lists.append({'name': name, 'items': []})
-            elif action == 'rename_list':
-                idx = body.get('list_idx', 0)
-                if 0 <= idx < len(lists):
-                    lists[idx]['name'] = body.get('name', lists[idx]['name']).strip()
-            elif action == 'delete_list':
-                idx = body.get('list_idx', 0)
-                if 0 <= idx < len(lists):
-                    lists.pop(idx)
-            elif action == 'add_item':
-                idx = body.get('list_idx', 0)
-                text = body.get('text', '').strip()
-                if 0 <= idx < len(lists) and text:
-                    lists[idx]['items'].append({'text': text, 'checked': False})
-            elif action == 'toggle_item':
-                li = body.get('list_idx', 0)
-                ii = body.get('item_idx', 0)
-                if 0 <= li < len(lists) and 0 <= ii < len(lists[li]['items']):
-                    lists[li]['items'][ii]['checked'] = not lists[li]['items'][ii]['checked']
-            elif action == 'delete_item':
-                li = body.get('list_idx', 0)
-                ii = body.get('item_idx', 0)
-                if 0 <= li < len(lists) and 0 <= ii < len(lists[li]['items']):
-                    lists[li]['items'].pop(ii)
-
-            shoplist['lists'] = lists
-            save_shoplist(shoplist)
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({'ok': True, 'shoplist': shoplist}).encode())
+            if body.get('action') == 'add_recipes':
+                # Missing ingredients of the selected recipes, appended in one operation
+                d = get_data(body.get('lang', 'pl'))
+                missing = missing_ingredients(find_recipes(d, body.get('recipes', [])), d['inventory'], body.get('lang', 'pl'))
+                body = {'action': 'add_items', 'list_idx': body.get('list_idx', 0),
+                        'texts': [m['text'] for m in missing]}
+            delta = SHOPLIST.action(body)
+            self.send_json({'ok': delta is not None, 'delta': delta})
             return
 
         content_length = int(self.headers['Content-Length'])
@@ -1029,6 +1736,7 @@ Additional notes go here.
             cat = post_params.get('category', [''])[0]
             item = post_params.get('item', [''])[0].strip()
             if cat and item:
+                written = []
                 # Find the inventory file that has this category
                 for inv_file in INVENTORY.glob("*.md"):
                     content = inv_file.read_text(encoding='utf-8')
@@ -1050,13 +1758,10 @@ Additional notes go here.
                         if not added:
                             new_lines.append(f'- [ ] {item}')
                         inv_file.write_text('\n'.join(new_lines), encoding='utf-8')
+                        written.append(inv_file)
                         break
-                # Reload
-                ALL_INVENTORY = get_inventory()
-                INV_BY_CAT = get_inventory_by_category()
-            self.send_response(302)
-            self.send_header('Location', f'/?view=inventory&cat={quote(cat)}')
-            self.end_headers()
+                sync_data(*written)
+            self.send_redirect(f'/?view=inventory&cat={quote(cat)}')
             return
 
         # Handle inventory delete
@@ -1064,18 +1769,17 @@ Additional notes go here.
             cat = params.get('cat', [''])[0]
             item = params.get('del_inv', [''])[0]
             if cat and item:
+                written = []
                 for inv_file in INVENTORY.glob("*.md"):
                     content = inv_file.read_text(encoding='utf-8')
                     # Remove the item line
                     new_content = content.replace(f'- [ ] {item}\n', '').replace(f'- [x] {item}\n', '')
                     if new_content != content:
                         inv_file.write_text(new_content, encoding='utf-8')
+                        written.append(inv_file)
                         break
-                ALL_INVENTORY = get_inventory()
-                INV_BY_CAT = get_inventory_by_category()
-            self.send_response(302)
-            self.send_header('Location', f'/?view=inventory&cat={quote(cat)}')
-            self.end_headers()
+                sync_data(*written)
+            self.send_redirect(f'/?view=inventory&cat={quote(cat)}')
             return
 
         if 'edit' in params and 'content' in post_params:
@@ -1094,40 +1798,81 @@ Additional notes go here.
             # Save file
             if file_path.exists():
                 file_path.write_text(new_content, encoding='utf-8')
-                # Reload data
-                ALL_RECIPES = load_folder(RECIPES)
-                ALL_INVENTORY = get_inventory()
-                ALL_RULES = load_folder(RULES)
-                ALL_INV_DATA = load_folder(INVENTORY)
-                ALL_TRANSCRIPTS = load_folder(TRANSCRIPTS)
-                INV_BY_CAT = get_inventory_by_category()
-                TAGS_STATS = get_recipe_tags_stats(ALL_RECIPES)
-                RULES_DO, RULES_DONT = get_rules_summary(ALL_RULES)
-                EN_DATA = load_en_data()
-                # Reindex for semantic search
-                if SEMANTIC_ENABLED and SEARCH_INDEX:
-                    SEARCH_INDEX = SemanticIndex()
-                    SEARCH_INDEX.index_all(ALL_RECIPES, ALL_RULES, ALL_TRANSCRIPTS)
+                # Reload that file (and anything edited outside the dashboard meanwhile)
+                sync_data(file_path)
 
             # Redirect back
-            self.send_response(302)
-            self.send_header('Location', f'/?id={file_id}')
-            self.end_headers()
+            self.send_redirect(f'/?id={file_id}')
             return
 
         self.send_response(400)
+        self.send_header('Content-Length', '0')
         self.end_headers()
 
-    def do_GET(self):
+    def handle_get(self):
         parsed = urlparse(self.path)
 
+        if parsed.path.startswith('/static/'):
+            self.send_asset(STATIC_ASSETS.get(parsed.path[len('/static/'):]), parse_qs(parsed.query).get('v', [''])[0])
+            return
+
         # Serve constellation view
         if parsed.path == '/constellation':
-            self.serve_constellation()
+            self.send_asset(STATIC_ASSETS.get('constellation.html'))
+            return
+
+        # Constellation graph data (?chunk=n for streamed ingredients); the shell revalidates it with If-None-Match
+        if parsed.path == '/api/constellation.json':
+            query = parse_qs(parsed.query)
+            self.send_asset(constellation_payload(query.get('chunk', [None])[0]), query.get('v', [''])[0])
             return
 
         params = parse_qs(parsed.query)
 
+        # Request metrics: Prometheus text, or JSON with ?format=json / Accept: application/json
+        if parsed.path == '/api/metrics':
+            gauges = {'data_version': DATA_VERSION, 'recipes': len(ALL_RECIPES), 'rules': len(ALL_RULES),
+                      'inventory_items': len(ALL_INVENTORY), 'worker': PREFORK.worker if PREFORK else 0}
+            if hasattr(self.server, 'open_connections'):
+                gauges['open_connections'] = self.server.open_connections
+            caches = {'fragments': FRAGMENTS, 'derived': DERIVED}
+            if params.get('format', [''])[0] == 'json' or 'application/json' in self.headers.get('Accept', ''):
+                self.send_json(METRICS.snapshot(caches, gauges))
+            else:
+                self.send_body(METRICS.prometheus(caches, gauges).encode(), 'text/plain; version=0.0.4; charset=utf-8',
+                               headers=[('Cache-Control', 'no-store')])
+            return
+
+        # Profiled requests (?profile=1 or CHENKIT_PROFILE=1): list, one profile, or its flame data
+        if parsed.path.startswith('/admin/profiles'):
+            self.serve_profiles(parsed.path, params)
+            return
+
+        # Read-only JSON API; bodies are cached per data version and revalidated by ETag
+        if parsed.path.startswith('/api/') and parsed.path != '/api/shoplist/missing':
+            def build():
+                result = api_payload(parsed.path, params)
+                if result is None:
+                    return None
+                status, data = result
+                return status, make_asset(json.dumps(data, ensure_ascii=False).encode(), STATIC_TYPES['.json'])
+            result = FRAGMENTS.get(('api', parsed.path, parsed.query), build)
+            if result is None:
+                self.send_error(404)
+            elif result[0] == 200:
+                self.send_asset(result[1])
+            else:
+                self.send_body(result[1]['body'], result[1]['type'], status=result[0])
+            return
+
+        # Missing ingredients preview for a recipe selection (?recipe=a&recipe=b)
+        if parsed.path == '/api/shoplist/missing':
+            lang = params.get('lang', ['pl'])[0]
+            d = get_data(lang)
+            missing = missing_ingredients(find_recipes(d, params.get('recipe', [])), d['inventory'], lang)
+            self.send_json({'items': missing})
+            return
+
         view = params.get('view', ['recipes'])[0]
         query = params.get('q', [''])[0]
         selected = params.get('id', [''])[0]
@@ -1141,9 +1886,9 @@ Additional notes go here.
         content_html = ""
         right_panel_html = ""  # Built later with selection context
 
-        nav = {'NAV_HOME': '', 'NAV_RECIPES': '', 'NAV_INVENTORY': '', 'NAV_KNOWLEDGE': '', 'NAV_SHOPLIST': '', 'NAV_ABOUT': ''}
+        nav = {'NAV_HOME': '', 'NAV_RECIPES': '', 'NAV_INVENTORY': '', 'NAV_KNOWLEDGE': '', 'NAV_SHOPLIST': '', 'NAV_MEALPLAN': '', 'NAV_ABOUT': ''}
 
-        can_make = sum(1 for r in d['recipes'] if score_recipe(r, d['inventory']) >= 70)
+        can_make = str(count_ready(lang, 70))
 
         # Handle edit mode
         if edit_id:
@@ -1163,16 +1908,10 @@ Additional notes go here.
         elif view == 'home':
             nav['NAV_HOME'] = 'active'
             # Show core rules in sidebar
-            for r in d['rules']:
-                title = tr_title(r.get('title', r['name']).replace('# ', '').strip(), lang)[:35]
-                sel = 'selected' if r['name'] == selected else ''
-                sidebar_html += f'''<a href="/?view=home&id={r['name']}&lang={lang}" style="text-decoration:none;color:inherit">
-                    <div class="list-item {sel}">
-                        <div class="title">{title}</div>
-                    </div></a>'''
+            sidebar_html = render_sidebar('home', lang, selected)
 
             if selected:
-                rule = next((r for r in d['rules'] if r['name'] == selected), None)
+                rule = d['rules'].by_name.get(selected)
                 if rule:
                     content_html = self.render_knowledge_article(rule, lang=lang)
             else:
@@ -1180,48 +1919,19 @@ Additional notes go here.
 
         elif view == 'recipes' or query:
             nav['NAV_RECIPES'] = 'active'
-            recipes = d['recipes']
-            search_info = ""
-            if query:
-                if semantic_mode and SEARCH_INDEX:
-                    # Semantic search
-                    results = SEARCH_INDEX.search(query, top_k=30, doc_type='recipe')
-                    matched_names = {r['name'] for r in results}
-                    recipes = [r for r in d['recipes'] if r['name'] in matched_names]
-                    # Sort by semantic score
-                    score_map = {r['name']: r['score'] for r in results}
-                    recipes = sorted(recipes, key=lambda r: score_map.get(r['name'], 0), reverse=True)
-                    search_info = f" (semantic, {len(recipes)} hits)"
-                else:
-                    # Keyword search
-                    q_lower = query.lower()
-                    recipes = [r for r in recipes if q_lower in r['content'].lower()]
-
-            # Build sidebar with search query preserved in links
-            for r in recipes:
-                title = r.get('title', r['name']).replace('Recipe: ', '')
-                tags = r['meta'].get('tags', '')
-                time_str = r['meta'].get('time', '')
-                meta_str = f"{tags}" + (f" · {time_str}" if time_str else "")
-                sel = 'selected' if r['name'] == selected else ''
-                # Preserve query in link
-                link_query = f"&q={quote(query)}" if query else ""
-                sidebar_html += f'''<a href="/?id={r['name']}{link_query}" style="text-decoration:none;color:inherit">
-                    <div class="list-item {sel}">
-                        <div class="title">{title}</div>
-                        <div class="meta">{meta_str}</div>
-                    </div></a>'''
+            recipes, search_info = filter_recipes(d, query, semantic_mode)
+            sidebar_html = render_sidebar('recipes', lang, selected, query, semantic_mode)
 
             if selected:
-                recipe = next((r for r in d['recipes'] if r['name'] == selected), None)
+                recipe = d['recipes'].by_name.get(selected)
                 if recipe:
                     content_html = self.render_recipe(recipe, d=d)
             elif query and recipes:
                 # Show first matching recipe when searching
-                content_html = f'<div class="search-info">Found {len(recipes)} recipes for "{query}"{search_info}</div>'
+                content_html = f'<div class="search-info">Found {len(recipes)} recipes for "{escape(query)}"{search_info}</div>'
                 content_html += self.render_recipe(recipes[0], d=d)
             elif query and not recipes:
-                content_html = f'<div class="panel"><h2>No results</h2><p>No recipes found for "{query}"</p></div>'
+                content_html = f'<div class="panel"><h2>No results</h2><p>No recipes found for "{escape(query)}"</p></div>'
             else:
                 content_html = self.render_recipes_overview(d)
 
@@ -1229,16 +1939,7 @@ Additional notes go here.
             nav['NAV_INVENTORY'] = 'active'
             cat_filter = params.get('cat', [''])[0]
 
-            for section, items in d['inv_by_cat'].items():
-                is_active = section == cat_filter
-                style = 'background:#1f6feb22;color:#58a6ff' if is_active else ''
-                sidebar_html += f'<a href="/?view=inventory&cat={quote(section)}&lang={lang}" style="text-decoration:none"><div class="category" style="{style}">{section} ({len(items)})</div></a>'
-                if is_active or not cat_filter:
-                    shown = items if is_active else items[:10]
-                    for item in shown:
-                        sidebar_html += f'<div class="inv-item">{item}</div>'
-                    if not is_active and len(items) > 10:
-                        sidebar_html += f'<div class="inv-item" style="color:#58a6ff">+{len(items)-10} more...</div>'
+            sidebar_html = render_sidebar('inventory', lang, cat_filter=cat_filter)
 
             if cat_filter:
                 content_html = self.render_category_detail(cat_filter, d['inv_by_cat'].get(cat_filter, []))
@@ -1251,17 +1952,30 @@ Additional notes go here.
             lists = shoplist.get('lists', [])
             selected_list = int(params.get('list', ['0'])[0])
 
-            for i, lst in enumerate(lists):
-                checked = sum(1 for item in lst.get('items', []) if item.get('checked'))
-                total = len(lst.get('items', []))
-                sel = 'selected' if i == selected_list else ''
-                sidebar_html += f'''<a href="/?view=shoplist&list={i}" style="text-decoration:none;color:inherit">
+            def build_sidebar():
+                html = ''
+                for i, lst in enumerate(lists):
+                    checked = sum(1 for item in lst.get('items', []) if item.get('checked'))
+                    total = len(lst.get('items', []))
+                    sel = 'selected' if i == selected_list else ''
+                    html += f'''<a href="/?view=shoplist&list={i}" style="text-decoration:none;color:inherit">
                     <div class="list-item {sel}">
                         <div class="title">{lst["name"]}</div>
                         <div class="meta">{checked}/{total} items</div>
                     </div></a>'''
+                return html
+            # Lists change without a data reload, so the store's sequence number is part of the key
+            sidebar_html = FRAGMENTS.get(('sidebar', 'shoplist', SHOPLIST.seq, selected_list), build_sidebar)
+
+            content_html = self.render_shoplist(shoplist, selected_list, d['recipes'], lang)
 
-            content_html = self.render_shoplist(shoplist, selected_list)
+        elif view == 'mealplan':
+            nav['NAV_MEALPLAN'] = 'active'
+            try:
+                days = max(1, min(int(params.get('days', ['7'])[0]), MEALPLAN_MAX_DAYS))
+            except ValueError:
+                days = 7
+            content_html = FRAGMENTS.get(('mealplan', lang, days), lambda: self.render_mealplan(d, days, lang))
 
         elif view == 'about':
             nav['NAV_ABOUT'] = 'active'
@@ -1271,87 +1985,35 @@ Additional notes go here.
             nav['NAV_KNOWLEDGE'] = 'active'
 
             # Filter rules by query if provided
-            rules_to_show = d['rules']
-            kb_search_info = ""
-            if query:
-                if semantic_mode and SEARCH_INDEX:
-                    # Semantic search
-                    results = SEARCH_INDEX.search(query, top_k=20, doc_type='rule')
-                    matched_names = {r['name'] for r in results}
-                    rules_to_show = [r for r in d['rules'] if r['name'] in matched_names]
-                    score_map = {r['name']: r['score'] for r in results}
-                    rules_to_show = sorted(rules_to_show, key=lambda r: score_map.get(r['name'], 0), reverse=True)
-                    kb_search_info = " (semantic)"
-                else:
-                    q_lower = query.lower()
-                    rules_to_show = [r for r in d['rules'] if
-                        q_lower in r['content'].lower() or
-                        q_lower in r['meta'].get('tags', '').lower() or
-                        q_lower in r['meta'].get('category', '').lower()]
-
-            # Group rules by domain for sidebar
-            domains = {}
-            for r in rules_to_show:
-                cat = r['meta'].get('category', 'general')
-                domain = cat.split('/')[0] if '/' in cat else cat
-                if domain not in domains:
-                    domains[domain] = []
-                domains[domain].append(r)
-
-            # Show search info if filtering
-            if query:
-                sidebar_html += f'<div style="padding:10px 15px;background:#1f6feb22;color:#58a6ff;font-size:12px">🔍 "{query}" ({len(rules_to_show)}){kb_search_info}</div>'
-                sidebar_html += f'<a href="/?view=knowledge" style="padding:8px 15px;display:block;color:#8b949e;font-size:11px">✕ clear</a>'
-
-            for domain, rules in sorted(domains.items()):
-                sidebar_html += f'<div class="category">{domain.upper()}</div>'
-                for r in rules:
-                    title = r.get('title', r['name']).replace('Diet Rule Template', '').replace('# ', '').strip()
-                    if not title:
-                        title = r['name']
-                    title = tr_title(title, lang)
-                    sel = 'selected' if r['name'] == selected else ''
-                    sidebar_html += f'''<a href="/?view=knowledge&id={r['name']}&lang={lang}" style="text-decoration:none;color:inherit">
-                        <div class="list-item {sel}">
-                            <div class="title">{title[:40]}</div>
-                        </div></a>'''
+            rules_to_show = filter_rules(d, query, semantic_mode)[0]
+            sidebar_html = render_sidebar('knowledge', lang, selected, query, semantic_mode)
 
             if selected:
-                rule = next((r for r in d['rules'] if r['name'] == selected), None)
+                rule = d['rules'].by_name.get(selected)
                 if rule:
                     content_html = self.render_knowledge_article(rule, lang=lang)
             elif query and rules_to_show:
-                content_html = f'<div class="search-info">Found {len(rules_to_show)} articles for "{query}"</div>'
+                content_html = f'<div class="search-info">Found {len(rules_to_show)} articles for "{escape(query)}"</div>'
                 content_html += self.render_knowledge_article(rules_to_show[0], lang=lang)
             elif query and not rules_to_show:
-                content_html = f'<div class="panel"><h2>No results</h2><p>No articles found for "{query}"</p></div>'
+                content_html = f'<div class="panel"><h2>No results</h2><p>No articles found for "{escape(query)}"</p></div>'
             else:
                 content_html = self.render_knowledge_overview(d, lang=lang)
 
         # Build suggestions HTML
-        sugg_html = ''
-        if not query:
+        def build_sugg():
+            html = ''
             for sugg_type, sugg_text in build_suggestions():
                 cls = 'hot' if sugg_type == 'hot' else 'tag'
-                sugg_html += f'<a href="/?q={quote(sugg_text)}" class="sugg {cls}">{sugg_text}</a>'
+                html += f'<a href="/?q={quote(sugg_text)}" class="sugg {cls}">{sugg_text}</a>'
+            return html
+        sugg_html = FRAGMENTS.get(('suggestions',), build_sugg) if not query else ''
 
         # Build right panel with selection context
         if not right_panel_html:  # Not overridden by view
             selected_type = 'rule' if view in ('knowledge', 'rules') else 'recipe'
-            right_panel_html = self.build_right_panel(selected, selected_type, d)
-
-        # Build HTML
-        html = HTML.replace('{{RECIPES}}', str(len(d['recipes'])))
-        html = html.replace('{{INVENTORY}}', str(len(d['inventory'])))
-        html = html.replace('{{KNOWLEDGE}}', str(len(d['rules'])))
-        html = html.replace('{{CANMAKE}}', str(can_make))
-        html = html.replace('{{SIDEBAR}}', sidebar_html)
-        html = html.replace('{{CONTENT}}', content_html)
-        html = html.replace('{{RIGHT_PANEL}}', right_panel_html)
-        html = html.replace('{{QUERY}}', query)
-        html = html.replace('{{VIEW}}', view)
-        html = html.replace('{{LANG}}', lang)
-        html = html.replace('{{SUGGESTIONS}}', sugg_html)
+            right_panel_html = FRAGMENTS.get(('right_panel', lang, selected, selected_type),
+                                             lambda: self.build_right_panel(selected, selected_type, d))
 
         # Semantic search toggle
         if SEARCH_INDEX:
@@ -1362,15 +2024,71 @@ Additional notes go here.
             </label>'''
         else:
             toggle_html = ''
-        html = html.replace('{{SEMANTIC_TOGGLE}}', toggle_html)
 
-        for k, v in nav.items():
-            html = html.replace('{{' + k + '}}', v)
+        # Build HTML
+        html = render_template(HTML_PARTS, dict(
+            nav,
+            RECIPES=str(len(d['recipes'])),
+            INVENTORY=str(len(d['inventory'])),
+            KNOWLEDGE=str(len(d['rules'])),
+            CANMAKE=can_make,
+            SIDEBAR=sidebar_html,
+            # Raw query params land in attributes: escape them, quotes included
+            SELECTED=escape(selected or edit_id, quote=True),
+            CONTENT=content_html,
+            RIGHT_PANEL=right_panel_html,
+            QUERY=escape(query, quote=True),
+            VIEW=escape(view, quote=True),
+            LANG=escape(lang, quote=True),
+            SUGGESTIONS=sugg_html,
+            SEMANTIC_TOGGLE=toggle_html,
+            CSS_URL=static_url('dashboard.css'),
+            JS_URL=static_url('dashboard.js'),
+        ))
+
+        self.send_body(html.encode(), 'text/html; charset=utf-8')
+
+    def serve_profiles(self, path, params):
+        """/admin/profiles pages; ?format=json|folded|pstats downloads the data instead"""
+        fmt = params.get('format', [''])[0]
+        no_store = [('Cache-Control', 'no-store')]
+        css = static_url('dashboard.css')
+        if path.rstrip('/') == '/admin/profiles':
+            entries = PROFILES.recent()
+            if fmt == 'json':
+                self.send_json([summary(e) for e in entries])
+            else:
+                self.send_body(render_profiles(entries, css).encode(), 'text/html; charset=utf-8', headers=no_store)
+            return
+        entry = PROFILES.get(path.rsplit('/', 1)[-1])
+        if entry is None:
+            self.send_error(404)
+        elif fmt == 'json':
+            self.send_json({**summary(entry), 'folded': entry['folded']})
+        elif fmt == 'folded':
+            self.send_body(folded_text(entry).encode(), 'text/plain; charset=utf-8', headers=no_store + [
+                ('Content-Disposition', f'attachment; filename="chenkit-profile-{entry["id"]}.folded"')])
+        elif fmt == 'pstats':
+            self.send_body(entry['pstats'], 'application/octet-stream', headers=no_store + [
+                ('Content-Disposition', f'attachment; filename="chenkit-profile-{entry["id"]}.prof"')])
+        else:
+            self.send_body(render_profile(entry, css).encode(), 'text/html; charset=utf-8', headers=no_store)
 
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.end_headers()
-        self.wfile.write(html.encode())
+    def send_asset(self, asset, version=''):
+        """Serve a make_asset() dict with ETag revalidation"""
+        if asset is None:
+            self.send_error(404)
+            return
+        etag = f'"{asset["etag"]}"'
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        # A versioned URL never changes content; a bare one has to revalidate
+        cache = 'public, max-age=31536000, immutable' if version == asset['etag'] else 'no-cache'
+        self.send_body(asset['body'], asset['type'], gzipped=asset['gzip'],
+                       headers=[('ETag', etag), ('Cache-Control', cache)])
 
     def build_right_panel(self, selected_name=None, selected_type=None, d=None):
         html = ""
@@ -1386,10 +2104,10 @@ Additional notes go here.
                         rel_type, rel_name = parts
                         # Find display title
                         if rel_type == 'recipe':
-                            doc = next((r for r in (d or get_data())['recipes'] if r['name'] == rel_name), None)
+                            doc = (d or get_data())['recipes'].by_name.get(rel_name)
                             view = ''
                         else:
-                            doc = next((r for r in (d or get_data())['rules'] if r['name'] == rel_name), None)
+                            doc = (d or get_data())['rules'].by_name.get(rel_name)
                             view = 'view=knowledge&'
                         if doc:
                             title = doc.get('title', rel_name).replace('Recipe: ', '').replace('# ', '')[:35]
@@ -1415,59 +2133,6 @@ Additional notes go here.
 
         return html
 
-    def serve_constellation(self):
-        import json
-        # Build data for constellation
-        data = {
-            'recipes': [],
-            'rules': []
-        }
-
-        pl_data = get_data('pl')
-        for r in pl_data['recipes']:
-            title = r.get('title', r['name']).replace('Recipe: ', '')
-            tags = r['meta'].get('tags', '').replace('[', '').replace(']', '')
-            tag_list = [t.strip() for t in re.split(r'[,\s]+', tags) if t.strip()]
-            ingredients = []
-            if 'Ingredients' in r.get('sections', {}):
-                for line in r['sections']['Ingredients']:
-                    ing = line.lstrip('- [ ] ').strip()
-                    # Extract key word
-                    words = extract_key_words(ing)
-                    if words:
-                        ingredients.append(words[0].capitalize())
-                    elif ing:
-                        ingredients.append(ing[:20])
-
-            data['recipes'].append({
-                'title': title,
-                'tags': tag_list,
-                'ingredients': ingredients[:10]  # Limit to 10
-            })
-
-        for r in pl_data['rules']:
-            title = r.get('title', r['name']).replace('# ', '').strip()
-            cat = r['meta'].get('category', 'general')
-            tags_str = r['meta'].get('tags', '')
-            rule_tags = [t.strip() for t in re.split(r'[,\s]+', tags_str) if t.strip()]
-            priority = r['meta'].get('priority', '3')
-            data['rules'].append({
-                'title': title,
-                'category': cat,
-                'tags': rule_tags,
-                'priority': priority
-            })
-
-        # Load and inject data
-        html_path = BASE / 'constellation.html'
-        html = html_path.read_text(encoding='utf-8')
-        html = html.replace('{{DATA}}', json.dumps(data, ensure_ascii=False))
-
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.end_headers()
-        self.wfile.write(html.encode())
-
     def render_home(self, d=None, lang='pl'):
         """Main home page with diet rules and quick stats"""
         if d is None:
@@ -1487,137 +2152,6 @@ Additional notes go here.
                 white-space:pre;
                 display:inline-block;
             "></div>
-            <script>
-            (function(){
-                const canvas = document.getElementById('pot-canvas');
-                let width = 45, height = 28, grid = [], time = 0, bubbles = [];
-
-                function initGrid() {
-                    grid = [];
-                    for (let y = 0; y < height; y++) {
-                        let row = [];
-                        for (let x = 0; x < width; x++) row.push(' ');
-                        grid.push(row);
-                    }
-                }
-
-                function render() {
-                    let html = '';
-                    for (let y = 0; y < height; y++) {
-                        for (let x = 0; x < width; x++) html += grid[y][x];
-                        html += '\\n';
-                    }
-                    canvas.textContent = html;
-                }
-
-                function update() {
-                    initGrid();
-                    const t = time * 0.1;
-                    const potLeft = 8, potRight = 36, potTop = 6, potBottom = 20, waterTop = 10;
-
-                    // Handles
-                    grid[potTop + 2][potLeft - 2] = '●';
-                    grid[potTop + 2][potLeft - 1] = '═';
-                    grid[potTop + 2][potRight + 1] = '═';
-                    grid[potTop + 2][potRight + 2] = '●';
-
-                    // Pot body
-                    for (let x = potLeft; x <= potRight; x++) {
-                        grid[potTop][x] = '─';
-                        grid[potBottom][x] = '═';
-                    }
-                    for (let y = potTop; y <= potBottom; y++) {
-                        grid[y][potLeft] = '│';
-                        grid[y][potRight] = '│';
-                    }
-                    grid[potTop][potLeft] = '┌';
-                    grid[potTop][potRight] = '┐';
-                    grid[potBottom][potLeft] = '╘';
-                    grid[potBottom][potRight] = '╛';
-
-                    // Lid wobble
-                    const lidWobble = Math.sin(t * 2) * 0.5;
-                    const lidY = Math.floor(potTop - 1 + lidWobble);
-                    for (let x = potLeft + 2; x <= potRight - 2; x++) {
-                        grid[lidY][x] = '▀';
-                    }
-                    grid[lidY - 1][Math.floor((potLeft + potRight) / 2)] = '○';
-
-                    // Boiling water
-                    for (let x = potLeft + 1; x < potRight; x++) {
-                        const wave = Math.sin(x * 0.4 + t * 3) * 0.5;
-                        const surfaceY = Math.floor(waterTop + wave);
-                        grid[surfaceY][x] = '~';
-                    }
-
-                    // Fill water
-                    for (let y = waterTop + 1; y < potBottom; y++) {
-                        for (let x = potLeft + 1; x < potRight; x++) {
-                            if (grid[y][x] === ' ') grid[y][x] = '░';
-                        }
-                    }
-
-                    // Bubbles
-                    if (time % 4 === 0) {
-                        const chars = ['o', 'O', '°', '○'];
-                        bubbles.push({
-                            x: potLeft + 3 + Math.random() * (potRight - potLeft - 6),
-                            y: potBottom - 2,
-                            speed: 0.15 + Math.random() * 0.2,
-                            char: chars[Math.floor(Math.random() * chars.length)]
-                        });
-                    }
-                    bubbles = bubbles.filter(b => {
-                        b.y -= b.speed;
-                        b.x += Math.sin(time * 0.2 + b.x) * 0.1;
-                        const bx = Math.floor(b.x), by = Math.floor(b.y);
-                        if (by > waterTop && by < potBottom && bx > potLeft && bx < potRight) {
-                            grid[by][bx] = b.char;
-                            return true;
-                        }
-                        return by > waterTop - 1;
-                    });
-
-                    // Steam
-                    const steamChars = ['░', '▒', '·', '∙'];
-                    for (let i = 0; i < 8; i++) {
-                        const side = i < 4 ? potLeft + 4 : potRight - 4;
-                        const phase = i * 1.5;
-                        const steamY = lidY - 1 - ((t * 0.3 + phase) % 5);
-                        const wobble = Math.sin(t * 0.4 + phase) * 1.2;
-                        const steamX = Math.floor(side + wobble);
-                        if (steamY >= 0 && steamY < lidY - 1 && steamX > 0 && steamX < width) {
-                            const idx = Math.floor((lidY - 1 - steamY) / 5 * (steamChars.length - 1));
-                            grid[Math.floor(steamY)][steamX] = steamChars[idx];
-                        }
-                    }
-
-                    // Stove
-                    for (let x = potLeft - 1; x <= potRight + 1; x++) grid[potBottom + 2][x] = '▬';
-
-                    // Flames
-                    const flames = ['▲', '△', '^'];
-                    for (let i = 0; i < 6; i++) {
-                        const fx = potLeft + 3 + i * 4 + Math.sin(t * 3 + i) * 0.3;
-                        const flicker = Math.floor(Math.abs(Math.sin(t * 4 + i * 2)) * flames.length);
-                        if (fx > potLeft && fx < potRight) {
-                            grid[potBottom + 1][Math.floor(fx)] = flames[flicker];
-                        }
-                    }
-
-                    time++;
-                }
-
-                function animate() {
-                    update();
-                    render();
-                    requestAnimationFrame(animate);
-                }
-
-                initGrid();
-                requestAnimationFrame(animate);
-            })();
-            </script>
         </div>'''
 
         html += '<div class="panel" style="border-left:3px solid #58a6ff">'
@@ -1667,7 +2201,7 @@ Additional notes go here.
             html += '</div>'
 
         # Quick stats
-        ready_100 = sum(1 for r in d['recipes'] if score_recipe(r, d['inventory']) == 100)
+        ready_100 = count_ready(d['lang'])
         html += '<div class="panel"><h2>📊 Quick Overview</h2>'
         html += '<div style="display:grid;grid-template-columns:repeat(4,1fr);gap:15px">'
         html += f'''<div style="background:#21262d;padding:15px;border-radius:6px;text-align:center">
@@ -1708,8 +2242,8 @@ Additional notes go here.
         if d is None:
             d = get_data()
         # Calculate stats
-        ready_100 = sum(1 for r in d['recipes'] if score_recipe(r, d['inventory']) == 100)
-        ready_70 = sum(1 for r in d['recipes'] if score_recipe(r, d['inventory']) >= 70)
+        ready_100 = count_ready(d['lang'])
+        ready_70 = count_ready(d['lang'], 70)
         avg_ingredients = sum(len(r['items']) for r in d['recipes']) // max(len(d['recipes']), 1)
 
         # Count by category
@@ -1773,26 +2307,12 @@ Additional notes go here.
         sample = random.sample(d['recipes'], min(5, len(d['recipes'])))
         for r in sample:
             title = r.get('title', r['name']).replace('Recipe: ', '')
-            pct = score_recipe(r, d['inventory'])
+            pct = recipe_scores(d['lang'])[r['name']]
             indicator = '✓' if pct >= 70 else '◐' if pct >= 50 else '✗'
             color = '#3fb950' if pct >= 70 else '#f0883e' if pct >= 50 else '#8b949e'
             html += f'<div style="padding:8px 0;border-bottom:1px solid #21262d"><span style="color:{color}">{indicator}</span> <a href="/?id={r["name"]}" style="color:#c9d1d9">{title}</a></div>'
         html += '</div>'
 
-        html += '''<script>
-async function createNewRecipe() {
-    const name = prompt('Recipe name:');
-    if (!name) return;
-    const res = await fetch('/api/create_recipe', {
-        method: 'POST',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({name: name})
-    });
-    const data = await res.json();
-    if (data.id) window.location.href = '/?edit=' + data.id + '&type=recipe';
-}
-</script>'''
-
         return html
 
     def render_inventory_overview(self, d=None):
@@ -1812,13 +2332,6 @@ async function createNewRecipe() {
             html += f'<a href="/?view=inventory&cat={quote(cat)}" style="text-decoration:none"><div class="cat-stat cat-link"><span class="name">{cat}</span><span class="count">{len(items)}</span></div></a>'
         html += '</div>'
 
-        html += '''<script>
-async function clearAllInventory() {
-    if (!confirm('Delete ALL inventory items? This gives you a fresh start. Categories will remain but all items will be removed.')) return;
-    await fetch('/api/clear_inventory', {method: 'POST', headers: {'Content-Type': 'application/json'}, body: '{}'});
-    location.reload();
-}
-</script>'''
         return html
 
     def render_category_detail(self, cat, items):
@@ -1843,32 +2356,7 @@ async function clearAllInventory() {
     def render_knowledge_overview(self, d=None, lang='pl'):
         if d is None:
             d = get_data(lang)
-        # Group by FULL subcategory path (e.g. diet/core, health/tcm)
-        subcategories = {}
-        all_tags = Counter()
-        for r in d['rules']:
-            cat = r['meta'].get('category', 'general')
-            if cat not in subcategories:
-                subcategories[cat] = {'rules': [], 'do': [], 'dont': []}
-            subcategories[cat]['rules'].append(r)
-
-            # Collect tags
-            tags_str = r['meta'].get('tags', '')
-            for tag in re.split(r'[,\s]+', tags_str):
-                tag = tag.strip().lower()
-                if tag and len(tag) > 2:
-                    all_tags[tag] += 1
-
-            # Collect do/dont from this rule
-            for section, lines in r.get('sections', {}).items():
-                sec_lower = section.lower()
-                for line in lines:
-                    if line.startswith('- '):
-                        item = line[2:].strip().replace('[ ] ', '')
-                        if sec_lower in ['zakazy', 'dont', "don't", 'unikaj']:
-                            subcategories[cat]['dont'].append(item)
-                        elif sec_lower in ['zasady', 'do', 'praktyki', 'knowledge base']:
-                            subcategories[cat]['do'].append(item)
+        subcategories, all_tags = DERIVED.get(('knowledge_stats', lang), lambda: get_knowledge_stats(d['rules']))
 
         html = '<div class="panel"><div style="display:flex;justify-content:space-between;align-items:center"><h2>┌─ Knowledge Base ─┐</h2>'
         html += '<button onclick="createNewArticle()" style="background:#238636;border:none;border-radius:6px;color:white;padding:8px 16px;cursor:pointer;font-size:12px;font-family:inherit">+ New Article</button></div>'
@@ -1959,22 +2447,6 @@ async function clearAllInventory() {
                 html += f'<div style="color:#8b949e;font-size:11px;margin-top:10px">+{len(d["rules_do"])-15} more</div>'
             html += '</div>'
 
-        html += '''<script>
-async function createNewArticle() {
-    const name = prompt('Article title:');
-    if (!name) return;
-    const category = prompt('Category path (e.g. diet/core, health/tcm, wellness/mental):', 'general');
-    if (category === null) return;
-    const res = await fetch('/api/create_knowledge', {
-        method: 'POST',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({name: name, category: category || 'general'})
-    });
-    const data = await res.json();
-    if (data.id) window.location.href = '/?edit=' + data.id + '&type=rules';
-}
-</script>'''
-
         return html
 
     def render_knowledge_article(self, r, lang='pl'):
@@ -2028,17 +2500,6 @@ async function createNewArticle() {
             <a href="/?edit={r['name']}&type=rules" class="edit-btn">✎ Edit</a>
             <button onclick="deleteKnowledge('{r['name']}')" style="background:none;border:1px solid #f85149;border-radius:6px;color:#f85149;padding:6px 14px;cursor:pointer;font-size:12px;font-family:inherit">🗑 Delete</button>
         </div>'''
-        html += '''<script>
-async function deleteKnowledge(id) {
-    if (!confirm('Delete this article permanently?')) return;
-    await fetch('/api/delete_knowledge', {
-        method: 'POST',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({id: id})
-    });
-    window.location.href = '/?view=knowledge';
-}
-</script>'''
         html += '</div>'
         return html
 
@@ -2080,24 +2541,14 @@ async function deleteKnowledge(id) {
         # Edit & Delete buttons
         html += f'''<div style="margin-top:20px;padding-top:15px;border-top:1px solid #30363d;display:flex;gap:8px;align-items:center">
             <a href="/?edit={r['name']}&type=recipe" class="edit-btn">✎ Edit Recipe</a>
+            <button onclick="addMissingToList('{r['name']}')" class="edit-btn">🛒 Missing → Shop List</button>
             <button onclick="deleteRecipe('{r['name']}')" style="background:none;border:1px solid #f85149;border-radius:6px;color:#f85149;padding:6px 14px;cursor:pointer;font-size:12px;font-family:inherit">🗑 Delete</button>
         </div>'''
-        html += '''<script>
-async function deleteRecipe(id) {
-    if (!confirm('Delete this recipe permanently?')) return;
-    await fetch('/api/delete_recipe', {
-        method: 'POST',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({id: id})
-    });
-    window.location.href = '/';
-}
-</script>'''
 
         html += '</div>'
         return html
 
-    def render_shoplist(self, shoplist, selected_idx=0):
+    def render_shoplist(self, shoplist, selected_idx=0, recipes=None, lang='pl'):
         """Render shopping list management view"""
         lists = shoplist.get('lists', [])
         if selected_idx >= len(lists):
@@ -2135,7 +2586,7 @@ async function deleteRecipe(id) {
             if len(lists) > 1:
                 html += '<button onclick="deleteList()" style="background:none;border:none;color:#f85149;cursor:pointer;font-size:12px">✕ Delete</button>'
             html += '</div>'
-            html += f'<div style="color:#8b949e;font-size:12px"><span style="color:#3fb950">{checked_count}</span> / {total_count}</div>'
+            html += f'<div style="color:#8b949e;font-size:12px"><span style="color:#3fb950" id="checked-count">{checked_count}</span> / <span id="total-count">{total_count}</span></div>'
             html += '</div>'
 
             # Add item input
@@ -2148,17 +2599,18 @@ async function deleteRecipe(id) {
 
             # Items list
             html += '<div id="items-list">'
-            for idx, item in enumerate(items):
+            for item in items:
+                idx = item['id']
                 is_checked = item.get('checked', False)
-                text = item.get('text', '')
+                text = escape(item.get('text', ''))
                 check_bg = '#3fb950' if is_checked else 'transparent'
                 check_border = '#3fb950' if is_checked else '#30363d'
                 check_mark = '<span style="color:white;font-size:13px">✓</span>' if is_checked else ''
                 text_color = '#8b949e' if is_checked else '#c9d1d9'
                 text_deco = 'text-decoration:line-through;' if is_checked else ''
-                html += f'''<div class="shop-item" style="display:flex;align-items:center;gap:12px;padding:10px 0;border-bottom:1px solid #21262d">
-                    <div onclick="toggleItem({idx})" style="width:22px;height:22px;border:2px solid {check_border};border-radius:4px;cursor:pointer;display:flex;align-items:center;justify-content:center;background:{check_bg};flex-shrink:0">{check_mark}</div>
-                    <span style="flex:1;color:{text_color};font-size:14px;{text_deco}">{text}</span>
+                html += f'''<div class="shop-item" id="shop-item-{idx}" data-checked="{1 if is_checked else 0}" style="display:flex;align-items:center;gap:12px;padding:10px 0;border-bottom:1px solid #21262d">
+                    <div onclick="toggleItem({idx})" class="shop-check" style="width:22px;height:22px;border:2px solid {check_border};border-radius:4px;cursor:pointer;display:flex;align-items:center;justify-content:center;background:{check_bg};flex-shrink:0">{check_mark}</div>
+                    <span class="shop-text" style="flex:1;color:{text_color};font-size:14px;{text_deco}">{text}</span>
                     <button onclick="deleteItem({idx})" style="background:none;border:none;color:#f85149;cursor:pointer;font-size:14px;padding:4px 8px;opacity:0.5" onmouseover="this.style.opacity=1" onmouseout="this.style.opacity=0.5">✕</button>
                 </div>'''
             html += '</div>'
@@ -2172,74 +2624,84 @@ async function deleteRecipe(id) {
                 html += f'''<div style="margin-top:20px;padding-top:15px;border-top:1px solid #30363d">
                     <div style="display:flex;justify-content:space-between;margin-bottom:6px">
                         <span style="color:#8b949e;font-size:11px">Progress</span>
-                        <span style="color:#3fb950;font-size:11px">{pct}%</span>
+                        <span style="color:#3fb950;font-size:11px" id="progress-pct">{pct}%</span>
                     </div>
                     <div style="background:#21262d;border-radius:4px;height:6px;overflow:hidden">
-                        <div style="background:#3fb950;height:100%;width:{pct}%;border-radius:4px;transition:width 0.3s"></div>
+                        <div id="progress-bar" style="background:#3fb950;height:100%;width:{pct}%;border-radius:4px;transition:width 0.3s"></div>
                     </div>
                 </div>'''
         else:
             html += '<div style="text-align:center;padding:40px;color:#8b949e">No lists — create your first one</div>'
 
-        html += '</div></div>'
-
-        # JavaScript for CRUD operations
-        html += '<script>\n'
-        html += 'const currentListIdx = ' + str(selected_idx) + ';\n'
-        html += '''
-function switchList(idx) {
-    window.location.href = '/?view=shoplist&list=' + idx;
-}
-
-async function shoplistAction(body) {
-    const res = await fetch('/api/shoplist', {
-        method: 'POST',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify(body)
-    });
-    return await res.json();
-}
+        html += '</div>'
 
-async function createList() {
-    const name = prompt('New list name:');
-    if (!name) return;
-    await shoplistAction({action: 'create_list', name: name});
-    location.reload();
-}
+        # Fill the list from a recipe selection (missing ingredients only)
+        if current_list and recipes:
+            html += '<div class="panel"><h2>🍽 From Recipes</h2>'
+            html += '<input type="text" id="recipe-pick" list="recipe-options" placeholder="Pick recipes..." onchange="pickRecipe(this)" style="width:100%;padding:10px 14px;background:#0d1117;border:1px solid #30363d;border-radius:6px;color:#c9d1d9;font-family:inherit;font-size:13px">'
+            html += '<datalist id="recipe-options">'
+            for r in recipes:
+                title = r.get('title', r['name']).replace('Recipe: ', '')
+                html += f'<option value="{r["name"]}">{title}</option>'
+            html += '</datalist>'
+            html += '<div id="recipe-chips" class="tags-cloud" style="margin:12px 0"></div>'
+            html += '<div id="missing-preview"></div>'
+            html += '<button id="add-missing" onclick="addMissing()" style="display:none;margin-top:12px;background:#238636;border:none;border-radius:6px;color:white;padding:8px 14px;cursor:pointer;font-size:12px;font-family:inherit">+ Add missing to list</button>'
+            html += '</div>'
 
-async function renameList() {
-    const name = prompt('New name:', document.getElementById('list-name').textContent);
-    if (!name) return;
-    await shoplistAction({action: 'rename_list', list_idx: currentListIdx, name: name});
-    location.reload();
-}
+        html += '</div>'
 
-async function deleteList() {
-    if (!confirm('Delete this list?')) return;
-    await shoplistAction({action: 'delete_list', list_idx: currentListIdx});
-    window.location.href = '/?view=shoplist';
-}
+        # Page state for the shop list functions in static/dashboard.js
+        html += '<script>\n'
+        html += 'const currentListIdx = ' + str(selected_idx) + ';\n'
+        html += f"const shopLang = '{lang}';\n"
+        html += '</script>'
 
-async function addItem() {
-    const input = document.getElementById('new-item');
-    const text = input.value.trim();
-    if (!text) return;
-    await shoplistAction({action: 'add_item', list_idx: currentListIdx, text: text});
-    location.reload();
-}
+        return html
 
-async function toggleItem(itemIdx) {
-    await shoplistAction({action: 'toggle_item', list_idx: currentListIdx, item_idx: itemIdx});
-    location.reload();
-}
+    def render_mealplan(self, d, days=7, lang='pl'):
+        """Generated plan: days x meals grid and the shopping list it needs"""
+        plan = meal_plan(lang, days)
+        planned = [r for day in plan for r in day.values() if r]
+        labels = {'breakfast': 'Breakfast', 'lunch': 'Lunch', 'dinner': 'Dinner'}
+        scores = recipe_scores(lang)
+
+        html = '<div style="max-width:1000px;margin:0 auto"><div class="panel">'
+        html += '<div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:15px">'
+        html += f'<h2>📅 Meal Plan ({days} days)</h2><div style="display:flex;gap:10px">'
+        for n in (3, 7, 14):
+            color = '#58a6ff' if n == days else '#8b949e'
+            html += f'<a href="/?view=mealplan&days={n}&lang={lang}" style="color:{color};font-size:12px">{n}d</a>'
+        html += '</div></div>'
 
-async function deleteItem(itemIdx) {
-    await shoplistAction({action: 'delete_item', list_idx: currentListIdx, item_idx: itemIdx});
-    location.reload();
-}
-'''
-        html += '</script>'
+        html += '<div style="display:grid;grid-template-columns:60px repeat(3,1fr);gap:6px;font-size:12px">'
+        html += '<div></div>'
+        for meal in MEALS:
+            html += f'<div style="color:#8b949e;font-size:10px;text-transform:uppercase">{labels[meal]}</div>'
+        for i, day in enumerate(plan, 1):
+            html += f'<div style="color:#8b949e">Day {i}</div>'
+            for meal in MEALS:
+                r = day[meal]
+                if r is None:
+                    html += '<div style="color:#484f58">—</div>'
+                    continue
+                title = r.get('title', r['name']).replace('Recipe: ', '')
+                score = scores.get(r['name'], 0)
+                color = '#3fb950' if score == 100 else '#f0883e' if score >= 70 else '#8b949e'
+                html += f'''<a href="/?view=recipes&id={r['name']}&lang={lang}" style="text-decoration:none;color:#c9d1d9;background:#0d1117;border:1px solid #30363d;border-radius:6px;padding:6px 8px">
+                    {title}<div style="color:{color};font-size:10px">{score}%</div></a>'''
+        html += '</div></div>'
 
+        missing = missing_ingredients(planned, d['inventory'], lang)
+        html += f'<div class="panel"><h2>🛒 To Buy ({len(missing)})</h2>'
+        for item in missing:
+            html += f'<div class="ingredient missing"><span class="check">✗</span>{item["text"]}</div>'
+        if missing:
+            names = ','.join(f"'{r['name']}'" for r in planned)
+            html += f'<button onclick="addMissingToList([{names}])" class="edit-btn" style="margin-top:12px">🛒 Missing → Shop List</button>'
+        else:
+            html += '<div style="color:#8b949e">Everything is in stock</div>'
+        html += '</div></div>'
         return html
 
     def render_about(self):
@@ -2369,4 +2831,35 @@ if __name__ == "__main__":
     print(f"  → Network: http://{lan_ip}:{port}")
     print(f"\n  Ctrl+C to stop\n")
 
-    HTTPServer(('', port), Handler).serve_forever()
+    watch = os.environ.get('CHENKIT_WATCH', '1') != '0'
+    workers = int(os.environ.get('CHENKIT_WORKERS', 1))
+    # CHENKIT_ASYNC=1: asyncio front end, requests run on a thread pool; otherwise a thread per connection
+    if os.environ.get('CHENKIT_ASYNC', '') not in ('', '0'):
+        server = AsyncHTTPServer(('', port), Handler)
+    else:
+        server = ThreadingHTTPServer(('', port), Handler)
+
+    if workers > 1:
+        # Pre-fork: data and model are already loaded, so workers share them copy-on-write
+        from prefork import Prefork
+        PREFORK = Prefork(PREFORK_LOCK_FILE)
+        if STORE is not None:
+            STORE.close()
+
+        def on_fork(n):
+            if STORE is not None:
+                STORE.reopen()
+
+        def tick():
+            # The parent only notices edits made outside the dashboard; workers reload on the version bump
+            if WATCHER.poll():
+                with PREFORK.write_lock:
+                    PREFORK.bump()
+
+        print(f"  {workers} worker processes" + (" (watching data folders)" if watch else "") + "\n")
+        PREFORK.serve(server, workers, on_fork, tick if watch else None, WATCHER.interval)
+    else:
+        # Pick up edits made outside the dashboard (editor, ingest.py, git pull); CHENKIT_WATCH=0 turns it off
+        if watch:
+            print(f"  Watching data folders ({WATCHER.start(apply_changes)})\n")
+        server.serve_forever()
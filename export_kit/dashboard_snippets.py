@@ -62,13 +62,17 @@ def handle_chat_api(query, ALL_RECIPES, ALL_RULES, SEARCH_INDEX):
     context_parts = []
     source_names = []
 
+    # name → document; dashboard.Docs carries the map, plain lists get one built here
+    recipes_by_name = getattr(ALL_RECIPES, 'by_name', None) or {r['name']: r for r in ALL_RECIPES}
+    rules_by_name = getattr(ALL_RULES, 'by_name', None) or {r['name']: r for r in ALL_RULES}
+
     if SEARCH_INDEX:
         # Search recipes
         results = SEARCH_INDEX.search(query, top_k=5, doc_type='recipe')
         for hit in results:
             name = hit.get('name', '')
             source_names.append(name)
-            recipe = next((r for r in ALL_RECIPES if r['name'] == name), None)
+            recipe = recipes_by_name.get(name)
             if recipe:
                 context_parts.append(f"## {recipe.get('title', name)}\n{recipe.get('content', '')[:800]}")
 
@@ -76,7 +80,7 @@ def handle_chat_api(query, ALL_RECIPES, ALL_RULES, SEARCH_INDEX):
         rule_results = SEARCH_INDEX.search(query, top_k=3, doc_type='rule')
         for hit in rule_results:
             name = hit.get('name', '')
-            rule = next((r for r in ALL_RULES if r['name'] == name), None)
+            rule = rules_by_name.get(name)
             if rule:
                 context_parts.append(f"## Zasada: {rule.get('title', name)}\n{rule.get('content', '')[:500]}")
 
@@ -16,9 +16,11 @@ Usage:
 
 import argparse
 import sys
+import threading
+import time
 from pathlib import Path
 
-from ingest_core import IngestProcessor, Transcriber, URLScraper, Blueprint
+from ingest_core import IngestProcessor, InboxWatcher, Transcriber, URLScraper, Blueprint
 
 LOGO = r'''
 ┌─┐┬ ┬┌─┐┌┐┌   ┬┌─┬┌┬┐
@@ -281,62 +283,43 @@ min_items: 1
 
 def cmd_watch(args):
     """Watch inbox folder for new files"""
-    try:
-        from watchdog.observers import Observer
-        from watchdog.events import FileSystemEventHandler
-    except ImportError:
-        print("[!] Watchdog not available")
-        print("    Install: pip install watchdog")
-        sys.exit(1)
-
-    class InboxHandler(FileSystemEventHandler):
-        def __init__(self):
-            self.processor = IngestProcessor(Path(__file__).parent)
-
-        def on_created(self, event):
-            if event.is_directory:
-                return
+    processor = IngestProcessor(Path(__file__).parent)
+    inbox = processor.inbox
+    inbox.mkdir(exist_ok=True)
+    print_lock = threading.Lock()
 
-            path = Path(event.src_path)
+    def on_result(path, result):
+        with print_lock:
             print(f"\n[*] New file: {path.name}")
+            if 'error' in result:
+                print(f"    [!] Error: {result['error']}")
+                return
 
-            try:
-                if path.suffix.lower() in {'.mp3', '.wav', '.m4a', '.ogg'}:
-                    result = self.processor.process_audio(path)
-                elif path.suffix.lower() == '.txt':
-                    result = self.processor.process_text(path.read_text())
-                else:
-                    print(f"    Skipped (unsupported type)")
-                    return
-
-                status = 'OK' if result['valid'] else 'REVIEW'
-                print(f"    [{status}] {result['blueprint']}: {result['suggested_filename']}")
+            status = 'OK' if result['valid'] else 'REVIEW'
+            print(f"    [{status}] {result['blueprint']}: {result['suggested_filename']}")
 
-                if args.auto_save and result['valid']:
-                    saved = self.processor.save(result)
+            if args.auto_save and result['valid']:
+                try:
+                    saved = processor.save(result)
                     print(f"    [+] Saved: {saved}")
+                except Exception as e:
+                    print(f"    [!] Error: {e}")
 
-            except Exception as e:
-                print(f"    [!] Error: {e}")
-
-    inbox = Path(__file__).parent / "inbox"
-    inbox.mkdir(exist_ok=True)
-
-    observer = Observer()
-    observer.schedule(InboxHandler(), str(inbox), recursive=True)
-    observer.start()
+    watcher = InboxWatcher(processor, on_result, workers=args.workers,
+                           queue_size=args.queue_size, settle=args.settle)
+    mode = watcher.start(inbox)
 
-    print(f"[*] Watching: {inbox}")
+    print(f"[*] Watching: {inbox} ({mode}, {watcher.workers} workers)")
+    if mode == 'polling':
+        print("    Watchdog not available, scanning mtimes (pip install watchdog)")
     print("[*] Press Ctrl+C to stop\n")
 
     try:
-        import time
         while True:
             time.sleep(1)
     except KeyboardInterrupt:
         print("\n[*] Stopping...")
-        observer.stop()
-    observer.join()
+    watcher.stop()
 
 
 def main():
@@ -388,6 +371,9 @@ Examples:
     # watch
     p_watch = subparsers.add_parser("watch", help="Watch inbox folder")
     p_watch.add_argument("--auto-save", "-a", action="store_true")
+    p_watch.add_argument("--workers", "-w", type=int, default=2, help="Parallel processing workers")
+    p_watch.add_argument("--queue-size", "-q", type=int, default=8, help="Max files queued before backpressure")
+    p_watch.add_argument("--settle", type=float, default=1.0, help="Seconds a file size must be stable")
 
     args = parser.parse_args()
 
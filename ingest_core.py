@@ -3,11 +3,15 @@
 CHEN-KIT Ingest Core
 Shared logic for CLI and dashboard ingest
 """
+import os
+import queue
 import re
 import subprocess
 import tempfile
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 
 try:
@@ -25,6 +29,18 @@ except ImportError:
     SCRAPE_AVAILABLE = False
     BeautifulSoup = None  # type: ignore
 
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+    Observer = None  # type: ignore
+    FileSystemEventHandler = object  # type: ignore
+
+AUDIO_EXTENSIONS = {'.mp3', '.wav', '.m4a', '.ogg'}
+TEXT_EXTENSIONS = {'.txt'}
+
 
 class Blueprint:
     """Parse and apply .blueprint.md templates"""
@@ -409,6 +425,17 @@ class IngestProcessor:
         result = self.process_text(transcript, source_file=str(path.name), source_type='audio')
         return result
 
+    def process_file(self, path: Path) -> Dict:
+        """Dispatch an inbox file to the audio or text pipeline by extension"""
+        path = Path(path)
+        suffix = path.suffix.lower()
+        if suffix in AUDIO_EXTENSIONS:
+            return self.process_audio(path)
+        if suffix in TEXT_EXTENSIONS:
+            text = path.read_text(encoding='utf-8')
+            return self.process_text(text, source_file=path.name)
+        raise ValueError(f"Unsupported file type: {path.suffix}")
+
     def process_url(self, url: str) -> Dict:
         """URL -> scrape -> classify -> transform"""
         content, meta = URLScraper.scrape(url)
@@ -582,7 +609,7 @@ OUTPUT:"""
         audio_dir = self.inbox / "audio"
         if audio_dir.exists():
             for f in audio_dir.glob("*"):
-                if f.suffix.lower() in {'.mp3', '.wav', '.m4a', '.ogg'}:
+                if f.suffix.lower() in AUDIO_EXTENSIONS:
                     try:
                         results.append(self.process_audio(f))
                     except Exception as e:
@@ -638,6 +665,204 @@ OUTPUT:"""
         return items
 
 
+class _InboxEventHandler(FileSystemEventHandler):
+    """Forward watchdog events to an InboxWatcher without doing any work on the observer thread"""
+
+    def __init__(self, watcher: 'InboxWatcher'):
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.dest_path)
+
+
+class InboxWatcher:
+    """
+    Debounced inbox watcher feeding a bounded worker pool.
+
+    Events only mark a path as pending (duplicates coalesce). A debounce thread
+    hands a file to the queue once its size has been stable for `settle`
+    seconds; a full queue blocks the hand-off, which is the backpressure.
+    Uses watchdog when installed, otherwise an mtime scan with os.scandir.
+    """
+
+    prune_every = 60.0     # seconds between dropping _handled entries of files that are gone
+
+    def __init__(self, processor: IngestProcessor,
+                 on_result: Optional[Callable[[Path, Dict], None]] = None,
+                 workers: int = 2, queue_size: int = 8,
+                 settle: float = 1.0, poll_interval: float = 0.5):
+        self.processor = processor
+        self.on_result = on_result or (lambda path, result: None)
+        self.workers = max(1, workers)
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self.mode = None
+        self._pending: Dict[Path, Tuple[int, float]] = {}  # path -> (size, stable since)
+        self._handled: Dict[Path, Tuple[int, float]] = {}  # path -> (size, mtime) last queued
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._observer = None
+
+    def notify(self, path) -> None:
+        """Mark a path as pending; repeated events for the same file collapse"""
+        path = Path(path)
+        if path.suffix.lower() not in AUDIO_EXTENSIONS | TEXT_EXTENSIONS:
+            return
+        with self._lock:
+            self._pending[path] = (-1, time.monotonic())
+
+    def settled(self) -> List[Path]:
+        """Pop pending files whose size has not changed for `settle` seconds"""
+        now = time.monotonic()
+        ready = []
+        with self._lock:
+            for path, (size, since) in list(self._pending.items()):
+                try:
+                    st = path.stat()
+                except OSError:
+                    # Deleted or moved away before it settled
+                    del self._pending[path]
+                    continue
+                if st.st_size != size:
+                    self._pending[path] = (st.st_size, now)
+                elif now - since >= self.settle:
+                    del self._pending[path]
+                    # Still empty after settling: nothing to ingest; a later write notifies again
+                    if not st.st_size:
+                        continue
+                    signature = (st.st_size, st.st_mtime)
+                    if self._handled.get(path) != signature:
+                        self._handled[path] = signature
+                        ready.append(path)
+        return ready
+
+    def prune(self) -> int:
+        """Forget handled files that no longer exist (moved out of the inbox or deleted)"""
+        with self._lock:
+            gone = [path for path in self._handled if not path.exists()]
+            for path in gone:
+                del self._handled[path]
+        return len(gone)
+
+    def start(self, root: Path, use_watchdog: bool = True) -> str:
+        """Start workers, debouncer and event source. Returns 'watchdog' or 'polling'"""
+        root = Path(root)
+        for i in range(self.workers):
+            self._spawn(self._work, f"ingest-worker-{i}")
+        self._spawn(self._debounce, "ingest-debounce")
+
+        if use_watchdog and WATCHDOG_AVAILABLE:
+            self._observer = Observer()
+            self._observer.schedule(_InboxEventHandler(self), str(root), recursive=True)
+            self._observer.start()
+            self.mode = 'watchdog'
+        else:
+            # Baseline taken before start() returns: files already in the inbox are not new,
+            # anything dropped in afterwards is
+            known = scan_mtimes(root)
+            self._spawn(lambda: self._poll(root, known), "ingest-poll")
+            self.mode = 'polling'
+        return self.mode
+
+    def stop(self, drain: bool = True) -> None:
+        """Stop event sources; optionally let workers finish what is already queued"""
+        self._stop.set()
+        if self._observer:
+            self._observer.stop()
+            self._observer.join()
+        if not drain:
+            while True:
+                try:
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+                except queue.Empty:
+                    break
+        for _ in range(self.workers):
+            self.queue.put(None)
+        for t in self._threads:
+            t.join()
+        self._threads = []
+
+    def _spawn(self, target: Callable, name: str) -> None:
+        t = threading.Thread(target=target, name=name, daemon=True)
+        t.start()
+        self._threads.append(t)
+
+    def _debounce(self) -> None:
+        last_prune = time.monotonic()
+        while not self._stop.is_set():
+            if time.monotonic() - last_prune >= self.prune_every:
+                self.prune()
+                last_prune = time.monotonic()
+            for path in self.settled():
+                # Blocks while the pool is saturated; new events keep coalescing meanwhile
+                while not self._stop.is_set():
+                    try:
+                        self.queue.put(path, timeout=self.poll_interval)
+                        break
+                    except queue.Full:
+                        continue
+            self._stop.wait(self.poll_interval)
+
+    def _work(self) -> None:
+        while True:
+            path = self.queue.get()
+            if path is None:
+                self.queue.task_done()
+                return
+            try:
+                result = self.processor.process_file(path)
+            except Exception as e:
+                result = {'error': str(e), 'file': str(path)}
+            try:
+                self.on_result(path, result)
+            except Exception as e:
+                # A failing callback (e.g. save) must not take the worker down with it
+                print(f"    [!] Error: {path.name}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _poll(self, root: Path, known: Dict[Path, float]) -> None:
+        while not self._stop.wait(self.poll_interval):
+            current = scan_mtimes(root)
+            for path, mtime in current.items():
+                if known.get(path) != mtime:
+                    self.notify(path)
+            known = current
+
+
+def scan_mtimes(root: Path) -> Dict[Path, float]:
+    """Map every file under root to its mtime using os.scandir"""
+    found = {}
+    stack = [str(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        found[Path(entry.path)] = entry.stat().st_mtime
+                except OSError:
+                    continue
+    return found
+
+
 def is_available() -> bool:
     """Check if ingest dependencies are available"""
     return True  # Core always available, features degrade gracefully
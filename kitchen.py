@@ -7,16 +7,22 @@ MS-DOS style CLI for recipes, inventory, and meal planning
 import os
 import sys
 import re
+import json
+import math
+from bisect import bisect_left
 from pathlib import Path
 from typing import List, Dict, Set
 import textwrap
 
-BASE = Path(__file__).parent
+from cookable import CookIndex
+
+BASE = Path(os.environ.get('CHENKIT_DATA') or Path(__file__).parent)
 INVENTORY = BASE / "inventory"
 RECIPES = BASE / "recipes"
 RULES = BASE / "rules"
 TRANSCRIPTS = BASE / "transcripts"
 BOOKS = BASE / "books"
+INDEX_FILE = BASE / ".kitchen_index.json"
 
 # ============================================================================
 #  ASCII UI
@@ -107,6 +113,142 @@ def load_folder(folder: Path) -> List[Dict]:
             files.append(parse_md(f))
     return files
 
+# ============================================================================
+#  SEARCH INDEX
+# ============================================================================
+
+# Folders covered by the index, with the label shown in results
+INDEX_FOLDERS = [(INVENTORY, "INV"), (RECIPES, "RCP"), (RULES, "RUL"), (TRANSCRIPTS, "TRS")]
+
+TOKEN_RE = re.compile(r'\w+')
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased words of 2+ characters"""
+    return [w for w in TOKEN_RE.findall(text.lower()) if len(w) > 1 and not w.isdigit()]
+
+class SearchIndex:
+    """
+    Inverted index over every markdown file in INDEX_FOLDERS.
+    Per-file term counts are persisted to INDEX_FILE; refresh() re-parses
+    only files whose mtime changed, so a search after startup costs one
+    stat() per file. Queries are ranked with BM25, and a query word also
+    matches longer index words it prefixes (pomidor → pomidorowa).
+    """
+    VERSION = 1
+    K1 = 1.2
+    B = 0.75
+    PREFIX_WEIGHT = 0.5
+
+    def __init__(self, path: Path = INDEX_FILE, folders=None):
+        self.path = path
+        self.folders = folders or INDEX_FOLDERS
+        self.docs = {}        # file path → {mtime, label, name, title, items, length, terms}
+        self.postings = {}    # term → {file path: count}
+        self.vocabulary = []  # sorted terms, for prefix expansion
+        self.load()
+
+    def load(self):
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return
+        if data.get('version') == self.VERSION:
+            self.docs = data.get('docs', {})
+            self._rebuild_postings()
+
+    def save(self):
+        tmp = self.path.with_suffix('.tmp')
+        tmp.write_text(json.dumps({'version': self.VERSION, 'docs': self.docs}, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, self.path)
+
+    def _rebuild_postings(self):
+        self.postings = {}
+        for key, doc in self.docs.items():
+            for term, count in doc['terms'].items():
+                self.postings.setdefault(term, {})[key] = count
+        self.vocabulary = sorted(self.postings)
+
+    def refresh(self) -> int:
+        """Re-index new and modified files, drop deleted ones; returns how many changed"""
+        seen = set()
+        changed = 0
+        for folder, label in self.folders:
+            if not folder.exists():
+                continue
+            for f in sorted(folder.glob("*.md")):
+                if f.name.startswith('_'):
+                    continue
+                key = str(f)
+                seen.add(key)
+                mtime = f.stat().st_mtime_ns
+                doc = self.docs.get(key)
+                if doc is not None and doc['mtime'] == mtime:
+                    continue
+                parsed = parse_md(f)
+                terms = {}
+                for term in tokenize(parsed['content']):
+                    terms[term] = terms.get(term, 0) + 1
+                self.docs[key] = {
+                    'mtime': mtime, 'label': label, 'name': parsed['name'],
+                    'title': parsed.get('title', parsed['name']), 'items': parsed['items'],
+                    'length': sum(terms.values()), 'terms': terms,
+                }
+                changed += 1
+        for key in [k for k in self.docs if k not in seen]:
+            del self.docs[key]
+            changed += 1
+        if changed:
+            self._rebuild_postings()
+            self.save()
+        return changed
+
+    def expand(self, word: str) -> List[tuple]:
+        """(index term, weight) pairs a query word matches"""
+        matches = [(word, 1.0)] if word in self.postings else []
+        if len(word) >= 3:
+            i = bisect_left(self.vocabulary, word)
+            while i < len(self.vocabulary) and self.vocabulary[i].startswith(word):
+                if self.vocabulary[i] != word:
+                    matches.append((self.vocabulary[i], self.PREFIX_WEIGHT))
+                i += 1
+        return matches
+
+    def search(self, query: str, label: str = None) -> List[tuple]:
+        """(score, doc) best first; documents matching more query words always rank higher"""
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words or not self.docs:
+            return []
+        n = len(self.docs)
+        avg_length = sum(d['length'] for d in self.docs.values()) / n or 1
+        scores = {}
+        matched = {}
+        for word in words:
+            hit = set()
+            for term, weight in self.expand(word):
+                postings = self.postings[term]
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for key, tf in postings.items():
+                    doc = self.docs[key]
+                    if label and doc['label'] != label:
+                        continue
+                    norm = tf + self.K1 * (1 - self.B + self.B * doc['length'] / avg_length)
+                    scores[key] = scores.get(key, 0) + weight * idf * tf * (self.K1 + 1) / norm
+                    hit.add(key)
+            for key in hit:
+                matched[key] = matched.get(key, 0) + 1
+        ranked = sorted(scores, key=lambda k: (matched[k], scores[k]), reverse=True)
+        return [(scores[k], self.docs[k]) for k in ranked]
+
+_INDEX = None
+
+def get_index() -> SearchIndex:
+    """The CLI's search index, loaded once and refreshed against the files on every search"""
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = SearchIndex()
+    _INDEX.refresh()
+    return _INDEX
+
 # ============================================================================
 #  INVENTORY
 # ============================================================================
@@ -150,8 +292,14 @@ def search_inventory():
     if not query:
         return
 
-    items = get_all_inventory_items()
-    matches = [i for i in items if query in i.lower()]
+    # Index narrows to inventory files mentioning every word; items are then matched per line
+    words = tokenize(query)
+    matches = set()
+    for _, doc in get_index().search(query, label="INV"):
+        for item in doc['items']:
+            item_words = tokenize(item)
+            if all(any(w.startswith(q) for w in item_words) for q in words):
+                matches.add(item)
 
     print(f"\n  Found {len(matches)} matches:\n")
     for item in sorted(matches):
@@ -226,16 +374,12 @@ def search_recipes():
     if not query:
         return
 
-    recipes = load_folder(RECIPES)
-    matches = []
-    for r in recipes:
-        if query in r['content'].lower():
-            matches.append(r)
+    matches = get_index().search(query, label="RCP")
 
     print(f"\n  Found {len(matches)} matches:\n")
-    for r in matches:
-        title = r.get('title', r['name']).replace('Recipe: ', '')
-        print(f"    - {title}")
+    for score, r in matches:
+        title = r['title'].replace('Recipe: ', '')
+        print(f"    - {title}  ({score:.1f})")
 
     pause()
 
@@ -353,21 +497,13 @@ def propose_meal():
     print(f"  Recipes:   {len(recipes)} available")
     print(f"  Rules:     {len(rules)} active")
 
-    # Score recipes by available ingredients
-    scored = []
-    for r in recipes:
-        if not r['items']:
-            continue
-
-        available = 0
-        for item in r['items']:
-            if any(item.lower() in inv.lower() or inv.lower() in item.lower()
-                   for inv in inventory):
-                available += 1
-
-        score = available / len(r['items']) if r['items'] else 0
-        scored.append((score, r))
-
+    # Score recipes by available ingredients: each distinct item is matched
+    # against the inventory once, then scoring is bitset popcounts
+    index = CookIndex(r['items'] for r in recipes)
+    inventory_lower = [inv.lower() for inv in inventory]
+    pantry = index.pantry(lambda item: any(item.lower() in inv or inv in item.lower()
+                                           for inv in inventory_lower))
+    scored = [(score / 100, r) for score, r, size in zip(index.scores(pantry), recipes, index.sizes) if size]
     scored.sort(reverse=True, key=lambda x: x[0])
 
     print("\n  RECOMMENDED (by ingredient availability):")
@@ -380,6 +516,14 @@ def propose_meal():
         print(f"\n  {title}")
         print(f"  [{bar}] {pct}% ingredients available")
 
+    one_away = index.one_away(pantry)
+    if one_away:
+        print("\n  ONE INGREDIENT AWAY:")
+        print("  " + "-" * 40)
+        for i, item in one_away[:5]:
+            title = recipes[i].get('title', recipes[i]['name']).replace('Recipe: ', '')
+            print(f"  {title}  (need: {item})")
+
     if not scored:
         print("\n  No recipes with ingredients found.")
         print("  Add ingredients to your recipes!")
@@ -463,14 +607,7 @@ def global_search():
     if not query:
         return
 
-    results = []
-
-    # Search all folders
-    for folder, label in [(INVENTORY, "INV"), (RECIPES, "RCP"),
-                          (RULES, "RUL"), (TRANSCRIPTS, "TRS")]:
-        for doc in load_folder(folder):
-            if query in doc['content'].lower():
-                results.append((label, doc.get('title', doc['name'])))
+    results = [(doc['label'], doc['title']) for _, doc in get_index().search(query)]
 
     print(f"\n  Found {len(results)} matches:\n")
     for label, name in results:
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+CHEN-KIT Meal Planner
+Fills days x breakfast/lunch/dinner from recipe bitsets (see cookable.py):
+favours recipes covered by the pantry, keeps the shared shopping list short,
+and skips recipes the core rules forbid
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+MEALS = ['breakfast', 'lunch', 'dinner']
+
+# Objective weights: a fully stocked recipe is worth HAVE_WEIGHT, matching the
+# meal-time guidance GUIDANCE_BONUS, and every distinct item to buy costs BUY_WEIGHT
+HAVE_WEIGHT = 4.0
+GUIDANCE_BONUS = 1.5
+BUY_WEIGHT = 1.0
+
+# Local search passes after the greedy fill (stops early once a pass changes nothing)
+PASSES = 4
+
+FOLD = str.maketrans('ąćęłńóśźż', 'acelnoszz')
+ENDINGS = ('owego', 'owej', 'ego', 'ych', 'ami', 'ach', 'owe', 'owa', 'ów', 'ow', 'ym', 'om', 'em',
+           'a', 'e', 'i', 'o', 'u', 'y')
+WORD_RE = re.compile(r'[^\W\d_]+')
+
+# Words in rule lines that carry no ingredient
+RULE_STOPWORDS = {'unikac', 'unikać', 'polaczenie', 'połączenie', 'nie', 'lub', 'oraz', 'i', 'w', 'z', 'na', 'np', 'szczegolnie', 'szczególnie'}
+ALTERNATIVES_RE = re.compile(r',|\s+i\s+|\s+oraz\s+|\s+lub\s+')
+
+# Category words in combination bans that recipes spell out as concrete ingredients
+GROUP_SYNONYMS = {
+    'tlus': {'tlus', 'olej', 'masl', 'oliw', 'ghee', 'marg', 'smal'},
+    'cukr': {'cukr', 'syro', 'ksyl', 'eryt'},
+}
+
+
+def stem(word: str) -> str:
+    """Crude Polish stem: fold diacritics, drop one inflection ending and a mobile e, keep 4 letters"""
+    w = word.lower().translate(FOLD)
+    for end in ENDINGS:
+        if w.endswith(end) and len(w) - len(end) >= 3:
+            w = w[:-len(end)]
+            break
+    w = re.sub(r'ie([^aeiouy])$', r'\1', w)   # cukier → cukr
+    return w[:4]
+
+
+def text_stems(texts: Iterable[str]) -> Set[str]:
+    return {stem(w) for text in texts for w in WORD_RE.findall(text) if len(w) > 2}
+
+
+def _rule_text(line: str) -> str:
+    """Rule line without its **label:** and (asides)"""
+    line = re.sub(r'\*\*[^*]*\*\*', ' ', line)
+    return re.sub(r'\(.*?\)', ' ', line)
+
+
+def parse_forbidden(lines: Iterable[str]) -> List[List[Set[str]]]:
+    """
+    Zakazy lines as bans. Each ban is a list of stem groups and a recipe breaks
+    it when every group has a hit: "Cukier + Mąka + Tłuszcz" is three groups,
+    "Unikać masła orzechowego" one group needing both words, and alternatives
+    ("cukru białego i cukrów prostych") become separate bans.
+    """
+    bans = []
+    for line in lines:
+        text = _rule_text(line)
+        if '+' in text:
+            groups = []
+            for part in text.split('+'):
+                words = [stem(w) for w in WORD_RE.findall(part) if w.lower() not in RULE_STOPWORDS]
+                groups.append(set().union(*(GROUP_SYNONYMS.get(w, {w}) for w in words)))
+            if all(groups):
+                bans.append(groups)
+            continue
+        for phrase in ALTERNATIVES_RE.split(text):
+            words = [stem(w) for w in WORD_RE.findall(phrase) if w.lower() not in RULE_STOPWORDS and len(w) > 2]
+            if words:
+                bans.append([{w} for w in words])
+    return bans
+
+
+def violates(stems: Set[str], bans: List[List[Set[str]]]) -> bool:
+    return any(all(group & stems for group in ban) for ban in bans)
+
+
+def guidance_stems(text: str) -> Set[str]:
+    """Example foods named in a meal rule's (np. ...) asides, e.g. owsianki, tofu, fasola; "Nie ..." sentences are skipped"""
+    stems = set()
+    allowed = ' '.join(s for s in re.split(r'(?<=\.)\s+', text) if not s.lower().startswith('nie '))
+    for aside in re.findall(r'\((.*?)\)', allowed):
+        stems |= {stem(w) for w in WORD_RE.findall(aside) if w.lower() not in RULE_STOPWORDS and len(w) > 2}
+    return stems
+
+
+def plan_meals(needs: List[int], pantry: int, candidates: Dict[str, List[Tuple[int, float]]],
+               days: int = 7, passes: int = PASSES) -> List[Dict[str, Optional[int]]]:
+    """
+    Pick a recipe index (or None) for every day and meal.
+
+    candidates maps each meal to (recipe index, bonus) pairs. The objective is
+    sum(HAVE_WEIGHT * share of recipe in pantry + bonus) - BUY_WEIGHT * size of
+    the union of everything missing. A greedy fill is followed by local search
+    that swaps single slots while the objective improves; recipes repeat only
+    when a meal has fewer candidates than days.
+    """
+    missing = [need & ~pantry for need in needs]
+    sizes = [need.bit_count() for need in needs]
+
+    def value(i, bonus):
+        have = (sizes[i] - missing[i].bit_count()) / sizes[i] if sizes[i] else 0
+        return HAVE_WEIGHT * have + bonus
+
+    slots = [(day, meal) for day in range(days) for meal in MEALS]
+    options = {meal: [(i, value(i, bonus)) for i, bonus in candidates.get(meal, [])] for meal in MEALS}
+    chosen = {}      # slot → (recipe index, value)
+    used = {}        # recipe index → slots holding it
+    shopping = 0
+
+    def gain(i, v, others):
+        return v - BUY_WEIGHT * (missing[i] & ~others).bit_count()
+
+    def best(meal, others, allow):
+        top = None
+        for i, v in options[meal]:
+            if not allow(i):
+                continue
+            g = gain(i, v, others)
+            if top is None or g > top[1]:
+                top = (i, g, v)
+        return top
+
+    # Greedy: each slot takes the best unused recipe given what is already on the list
+    for slot in slots:
+        meal = slot[1]
+        pick = best(meal, shopping, lambda i: i not in used) or best(meal, shopping, lambda i: True)
+        if pick is None:
+            continue
+        i, _, v = pick
+        chosen[slot] = (i, v)
+        used.setdefault(i, set()).add(slot)
+        shopping |= missing[i]
+
+    # Local search: replace one slot at a time against the rest of the plan
+    for _ in range(passes):
+        improved = False
+        for slot in slots:
+            if slot not in chosen:
+                continue
+            current, current_value = chosen[slot]
+            others = 0
+            for other, (j, _) in chosen.items():
+                if other != slot:
+                    others |= missing[j]
+            pick = best(slot[1], others, lambda i: i == current or i not in used)
+            if pick and pick[0] != current and pick[1] > gain(current, current_value, others) + 1e-9:
+                used[current].discard(slot)
+                if not used[current]:
+                    del used[current]
+                chosen[slot] = (pick[0], pick[2])
+                used.setdefault(pick[0], set()).add(slot)
+                improved = True
+        if not improved:
+            break
+
+    plan = [{meal: None for meal in MEALS} for _ in range(days)]
+    for (day, meal), (i, _) in chosen.items():
+        plan[day][meal] = i
+    return plan
+
+
+def shopping_bits(needs: List[int], pantry: int, plan: List[Dict[str, Optional[int]]]) -> int:
+    """Union of ingredients the plan still needs to buy"""
+    bits = 0
+    for day in plan:
+        for i in day.values():
+            if i is not None:
+                bits |= needs[i] & ~pantry
+    return bits
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+CHEN-KIT Metrics
+Request counters and latency histograms per route, plus timed blocks
+(reloads, reindexing), exported as Prometheus text or JSON
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterable, Tuple
+
+# Histogram upper bounds in seconds (Prometheus-style, +Inf implied)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; observe() is a bisect and two adds"""
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self) -> Iterable[Tuple[str, int]]:
+        total = 0
+        for bound, n in zip(BUCKETS + (float('inf'),), self.counts):
+            total += n
+            yield ('+Inf' if bound == float('inf') else repr(bound)), total
+
+    def quantile(self, q: float) -> float:
+        """Estimate in seconds, interpolated inside the bucket holding the q-th observation"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = BUCKETS[i - 1] if i else 0.0
+                high = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+                return low + (high - low) * (rank - seen) / n
+            seen += n
+        return BUCKETS[-1]
+
+
+class Metrics:
+    """Process-wide registry; all updates take one lock for a few additions"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = {}    # (method, route) → Histogram
+        self.statuses = {}    # (method, route, status) → count
+        self.timers = {}      # (kind, target) → Histogram
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float):
+        key = (method, route)
+        with self.lock:
+            hist = self.requests.get(key)
+            if hist is None:
+                hist = self.requests[key] = Histogram()
+            hist.observe(seconds)
+            skey = (method, route, status)
+            self.statuses[skey] = self.statuses.get(skey, 0) + 1
+
+    def observe_timer(self, kind: str, target: str, seconds: float):
+        with self.lock:
+            hist = self.timers.get((kind, target))
+            if hist is None:
+                hist = self.timers[(kind, target)] = Histogram()
+            hist.observe(seconds)
+
+    @contextmanager
+    def timer(self, kind: str, target: str = ''):
+        """Time a block, e.g. with METRICS.timer('reload', 'recipes'): ..."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_timer(kind, target, time.perf_counter() - start)
+
+    def snapshot(self, caches: Dict = None, gauges: Dict = None) -> Dict:
+        """JSON view: per-route counts, statuses and latency estimates in ms"""
+        def summary(hist):
+            return {
+                'count': hist.count,
+                'sum_ms': round(hist.sum * 1000, 3),
+                'mean_ms': round(hist.sum * 1000 / hist.count, 3) if hist.count else 0.0,
+                'p50_ms': round(hist.quantile(0.5) * 1000, 3),
+                'p90_ms': round(hist.quantile(0.9) * 1000, 3),
+                'p99_ms': round(hist.quantile(0.99) * 1000, 3),
+            }
+
+        with self.lock:
+            routes = []
+            for (method, route), hist in sorted(self.requests.items()):
+                statuses = {str(s): n for (m, r, s), n in self.statuses.items() if (m, r) == (method, route)}
+                routes.append({'method': method, 'route': route, 'statuses': statuses, **summary(hist)})
+            timers = [{'kind': kind, 'target': target, **summary(hist)}
+                      for (kind, target), hist in sorted(self.timers.items())]
+        return {
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'gauges': gauges or {},
+            'routes': routes,
+            'timers': timers,
+            'caches': {name: cache_stats(cache) for name, cache in (caches or {}).items()},
+        }
+
+    def prometheus(self, caches: Dict = None, gauges: Dict = None, prefix: str = 'chenkit') -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        lines = []
+
+        def histogram(name, help_text, items):
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} histogram')
+            for labels, hist in items:
+                for le, n in hist.cumulative():
+                    lines.append(f'{prefix}_{name}_bucket{{{labels},le="{le}"}} {n}')
+                lines.append(f'{prefix}_{name}_sum{{{labels}}} {hist.sum:.6f}')
+                lines.append(f'{prefix}_{name}_count{{{labels}}} {hist.count}')
+
+        with self.lock:
+            requests = [(f'method="{m}",route="{_escape(r)}"', h) for (m, r), h in sorted(self.requests.items())]
+            statuses = sorted(self.statuses.items())
+            timers = [(f'kind="{k}",target="{_escape(t)}"', h) for (k, t), h in sorted(self.timers.items())]
+
+        lines.append(f'# HELP {prefix}_requests_total Requests by route and status')
+        lines.append(f'# TYPE {prefix}_requests_total counter')
+        for (method, route, status), n in statuses:
+            lines.append(f'{prefix}_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {n}')
+        histogram('request_duration_seconds', 'Request latency by route', requests)
+        histogram('operation_duration_seconds', 'Reload and reindex durations', timers)
+
+        stats = {name: cache_stats(cache) for name, cache in (caches or {}).items()}
+        for metric, kind, key, help_text in (('cache_hits_total', 'counter', 'hits', 'Cache hits'),
+                                             ('cache_misses_total', 'counter', 'misses', 'Cache misses'),
+                                             ('cache_hit_ratio', 'gauge', 'hit_ratio', 'Hits / lookups'),
+                                             ('cache_entries', 'gauge', 'entries', 'Cached entries')):
+            lines.append(f'# HELP {prefix}_{metric} {help_text}')
+            lines.append(f'# TYPE {prefix}_{metric} {kind}')
+            for name, s in stats.items():
+                lines.append(f'{prefix}_{metric}{{cache="{name}"}} {s[key]}')
+
+        lines.append(f'# TYPE {prefix}_uptime_seconds gauge')
+        lines.append(f'{prefix}_uptime_seconds {time.time() - self.started:.1f}')
+        for name, value in (gauges or {}).items():
+            lines.append(f'# TYPE {prefix}_{name} gauge')
+            lines.append(f'{prefix}_{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def cache_stats(cache) -> Dict:
+    """Hit/miss counters of anything with hits, misses and entries (FragmentCache)"""
+    hits, misses = cache.hits, cache.misses
+    return {'hits': hits, 'misses': misses, 'entries': len(cache.entries),
+            'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else 0.0}
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+METRICS = Metrics()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+CHEN-KIT Pre-fork Serving
+The parent loads the data, binds the listening socket and forks N workers
+that all accept on it, so the parsed kitchen is shared copy-on-write and
+rendering runs on every core. Writes go through one cross-process lock and
+bump a data version in shared memory; each worker compares that version on
+every request and catches up from disk when it moved. Unix only (fork, flock).
+"""
+
+import fcntl
+import gc
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import traceback
+
+
+class WriteLock:
+    """
+    One writer at a time across processes (flock) and threads (a local lock).
+    flock belongs to an open file, so every process opens the lock file for
+    itself; a worker that dies mid-write releases the lock with its fd.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.local = threading.Lock()
+        self.fd = None
+        self.pid = None
+
+    def __enter__(self):
+        self.local.acquire()
+        try:
+            if self.pid != os.getpid():      # first use in this process (or inherited through fork)
+                if self.fd is not None:
+                    os.close(self.fd)
+                self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                self.pid = os.getpid()
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        except BaseException:
+            self.local.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.local.release()
+
+
+class Prefork:
+    """Shared state of one pre-fork server: the data version and the write lock"""
+
+    def __init__(self, lock_path):
+        self.version = multiprocessing.RawValue('Q', 0)   # read without a lock; written under write_lock
+        self.write_lock = WriteLock(lock_path)
+        self.worker = 0          # 0 in the parent, 1..N in the workers
+        self.children = {}       # pid → worker number
+
+    def bump(self) -> int:
+        """New data version for every worker; call with write_lock held"""
+        self.version.value += 1
+        return self.version.value
+
+    def serve(self, server, workers: int, on_fork=None, tick=None, interval: float = 1.0):
+        """Fork workers running server.serve_forever() on the shared socket.
+
+        The parent only supervises: it restarts workers that die, calls tick()
+        every interval (the file watcher) and stops them all on SIGINT/SIGTERM.
+        on_fork(n) runs first thing in worker n (reopen per-process handles).
+        """
+        # Every worker wakes for a new connection; the losers get EAGAIN instead of blocking in accept()
+        server.socket.setblocking(False)
+        # Objects loaded so far never move to a younger generation, so GC passes stop dirtying their pages
+        gc.collect()
+        gc.freeze()
+        for n in range(1, workers + 1):
+            self._spawn(n, server, on_fork)
+
+        def stop(signum, frame):
+            raise KeyboardInterrupt
+        signal.signal(signal.SIGTERM, stop)
+        try:
+            while True:
+                self._reap(server, on_fork)
+                if tick:
+                    try:
+                        tick()
+                    except Exception as e:
+                        print(f"[CHEN-KIT] Watcher failed: {e}")
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            for pid in self.children:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+            for pid in list(self.children):
+                os.waitpid(pid, 0)
+            self.children.clear()
+            server.server_close()
+
+    def _spawn(self, n, server, on_fork):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = n
+            return
+        code = 0
+        parent = os.getppid()
+
+        def orphaned():
+            # serve_forever() calls this between polls; a worker must not outlive a killed parent
+            if os.getppid() != parent:
+                raise SystemExit
+        try:
+            self.worker = n
+            self.children = {}
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            if on_fork:
+                on_fork(n)
+            server.service_actions = orphaned
+            server.serve_forever()
+        except (KeyboardInterrupt, SystemExit):
+            pass
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _reap(self, server, on_fork):
+        """Replace workers that exited"""
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if not pid:
+                return
+            n = self.children.pop(pid, None)
+            if n is not None:
+                print(f"[CHEN-KIT] Worker {n} exited ({status}), restarting")
+                self._spawn(n, server, on_fork)
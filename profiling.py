@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+CHEN-KIT Request Profiling
+Opt-in cProfile wrapper for single requests. Profiled requests keep their
+top-N hot functions and collapsed call stacks in a ring buffer, viewable at
+/admin/profiles and downloadable as flame data (flamegraph.pl / speedscope)
+"""
+
+import cProfile
+import html
+import itertools
+import marshal
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+# CHENKIT_PROFILE=1 profiles every request; otherwise only requests with ?profile=1
+PROFILE_ALL = os.environ.get('CHENKIT_PROFILE', '') not in ('', '0')
+RING_SIZE = int(os.environ.get('CHENKIT_PROFILE_KEEP', 50))
+TOP_N = 25
+MAX_DEPTH = 64         # deepest folded stack; deeper frames are cut off
+PROFILE_FLAG_RE = re.compile(r'[?&]profile=1(?:&|$)')
+# Never profiled: the admin pages themselves, scrapes and static files would flush the ring
+UNPROFILED = ('/admin/', '/api/metrics', '/static/')
+
+
+def wants_profile(path: str) -> bool:
+    """True for requests to run under the profiler"""
+    if path.startswith(UNPROFILED):
+        return False
+    return PROFILE_ALL or PROFILE_FLAG_RE.search(path) is not None
+
+
+def func_label(func) -> str:
+    """'dashboard.py:1234(render_recipes)' for a pstats (file, line, name) key"""
+    filename, line, name = func
+    if filename == '~':     # builtins: ('~', 0, "<method 'replace' of 'str' objects>")
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def top_functions(stats: Dict, n: int = TOP_N) -> List[Dict]:
+    """Hottest functions by own time, with call counts and cumulative time in ms"""
+    rows = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:n]
+    return [{'function': func_label(func), 'calls': nc, 'primitive_calls': cc,
+             'own_ms': round(tt * 1000, 3), 'cumulative_ms': round(ct * 1000, 3)}
+            for func, (cc, nc, tt, ct, callers) in rows]
+
+
+def folded_stacks(stats: Dict) -> Dict[str, float]:
+    """Collapsed stacks ('a;b;c' → seconds) rebuilt from the caller graph.
+
+    cProfile only records caller→callee edges, so a function's time is split
+    over its call paths in proportion to the time each edge contributed.
+    """
+    children = {}
+    for func, (cc, nc, tt, ct, callers) in stats.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge[2], edge[3]))
+    roots = [func for func, entry in stats.items() if not entry[4]]
+    folded = {}
+
+    def walk(func, own, total, path):
+        path = path + [func_label(func)]
+        key = ';'.join(path)
+        folded[key] = folded.get(key, 0.0) + own
+        full = stats[func][3]
+        if len(path) >= MAX_DEPTH or not full:
+            return
+        scale = min(total / full, 1.0)
+        for child, edge_own, edge_total in children.get(func, ()):
+            if func_label(child) in path:       # recursion: the time is already counted above
+                continue
+            walk(child, edge_own * scale, edge_total * scale, path)
+
+    for root in roots:
+        walk(root, stats[root][2], stats[root][3], [])
+    return {stack: seconds for stack, seconds in folded.items() if seconds > 0}
+
+
+class Profiles:
+    """Ring buffer of the last profiled requests"""
+
+    def __init__(self, size: int = RING_SIZE):
+        self.lock = threading.Lock()
+        self.active = threading.Lock()
+        self.entries = deque(maxlen=size)
+        self.ids = itertools.count(1)
+
+    def run(self, method: str, path: str, route: str, handle):
+        """Run handle() under cProfile and keep the result.
+
+        One profile at a time: on Python 3.12+ cProfile is process-wide, so a
+        request arriving while another is profiled just runs unprofiled.
+        """
+        if not self.active.acquire(blocking=False):
+            return handle()
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profiler.runcall(handle)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.active.release()
+            self.add(method, path, route, elapsed, profiler)
+
+    def add(self, method: str, path: str, route: str, elapsed: float, profiler) -> Dict:
+        profiler.create_stats()
+        stats = profiler.stats
+        stats.pop(('~', 0, "<method 'disable' of '_lsprof.Profiler' objects>"), None)
+        entry = {
+            'id': next(self.ids),
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'method': method,
+            'path': path,
+            'route': route,
+            'total_ms': round(elapsed * 1000, 3),
+            'calls': sum(nc for cc, nc, tt, ct, callers in stats.values()),
+            'top': top_functions(stats),
+            'folded': folded_stacks(stats),
+            'pstats': marshal.dumps(stats),
+        }
+        with self.lock:
+            self.entries.append(entry)
+        return entry
+
+    def get(self, profile_id) -> Optional[Dict]:
+        with self.lock:
+            return next((e for e in self.entries if str(e['id']) == str(profile_id)), None)
+
+    def recent(self) -> List[Dict]:
+        with self.lock:
+            return list(reversed(self.entries))
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+def folded_text(entry: Dict) -> str:
+    """flamegraph.pl input: one 'frame;frame;frame microseconds' line per stack"""
+    lines = [f"{stack} {round(seconds * 1e6)}" for stack, seconds in sorted(entry['folded'].items())]
+    return '\n'.join(line for line in lines if not line.endswith(' 0')) + '\n'
+
+
+def summary(entry: Dict) -> Dict:
+    """JSON view of an entry without the raw stats"""
+    return {k: v for k, v in entry.items() if k not in ('pstats', 'folded')}
+
+
+def render_profiles(entries: List[Dict], css_url: str) -> str:
+    """Admin page: recent profiled requests, newest first"""
+    rows = []
+    for e in entries:
+        hot = e['top'][0]['function'] if e['top'] else ''
+        rows.append(f"<tr><td><a href=\"/admin/profiles/{e['id']}\">#{e['id']}</a></td><td>{e['time']}</td>"
+                    f"<td>{e['method']}</td><td>{html.escape(e['path'])}</td><td class=\"num\">{e['total_ms']:.1f}</td>"
+                    f"<td class=\"num\">{e['calls']}</td><td><code>{html.escape(hot)}</code></td></tr>")
+    mode = 'every request (CHENKIT_PROFILE)' if PROFILE_ALL else 'requests with <code>?profile=1</code>'
+    body = (f"<p>Profiling {mode}. Keeping the last {RING_SIZE}.</p>"
+            "<form method=\"POST\" action=\"/admin/profiles?clear=1\"><button>Clear</button></form>"
+            "<table><tr><th>#</th><th>Time</th><th></th><th>Path</th><th>ms</th><th>Calls</th><th>Hottest</th></tr>"
+            + ''.join(rows) + "</table>") if rows else (
+            f"<p>No profiled requests yet. Add <code>?profile=1</code> to any URL, "
+            f"or start the server with <code>CHENKIT_PROFILE=1</code>.</p>")
+    return _page('Request profiles', body, css_url)
+
+
+def render_profile(entry: Dict, css_url: str) -> str:
+    """Admin page: top functions of one request, with flame data downloads"""
+    rows = ''.join(f"<tr><td><code>{html.escape(r['function'])}</code></td><td class=\"num\">{r['calls']}</td>"
+                   f"<td class=\"num\">{r['own_ms']:.3f}</td><td class=\"num\">{r['cumulative_ms']:.3f}</td></tr>"
+                   for r in entry['top'])
+    base = f"/admin/profiles/{entry['id']}"
+    body = (f"<p><a href=\"/admin/profiles\">← all profiles</a></p>"
+            f"<p>{entry['method']} <code>{html.escape(entry['path'])}</code> — {entry['total_ms']:.1f} ms, "
+            f"{entry['calls']} calls, {entry['time']}</p>"
+            f"<p>Download: <a href=\"{base}?format=folded\">folded stacks</a> (flamegraph.pl, speedscope) · "
+            f"<a href=\"{base}?format=pstats\">pstats</a> (snakeviz, python -m pstats) · "
+            f"<a href=\"{base}?format=json\">JSON</a></p>"
+            "<table><tr><th>Function</th><th>Calls</th><th>Own ms</th><th>Cumulative ms</th></tr>"
+            + rows + "</table>")
+    return _page(f"Profile #{entry['id']}", body, css_url)
+
+
+def _page(title: str, body: str, css_url: str) -> str:
+    return (f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{title} — CHEN-KIT</title>"
+            f"<link rel=\"stylesheet\" href=\"{css_url}\">"
+            "<style>body{padding:20px}table{border-collapse:collapse;font-size:13px}"
+            "td,th{padding:3px 10px;border-bottom:1px solid #30363d;text-align:left}"
+            ".num{text-align:right;font-variant-numeric:tabular-nums}</style></head>"
+            f"<body><h2>{title}</h2>{body}</body></html>")
+
+
+PROFILES = Profiles()
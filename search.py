@@ -171,6 +171,31 @@ class SemanticIndex:
         self._build_connections(recipes, rules)
         return count
 
+    def remove(self, doc_type: str, name: str) -> None:
+        """Drop a document with all its sections and chunks."""
+        self.collection.delete(where={"$and": [{"type": doc_type}, {"name": name}]})
+
+    def update(self, changes: Dict[str, Tuple[set, List[Dict]]],
+               recipes: List[Dict], rules: List[Dict]) -> int:
+        """Re-embed only changed documents.
+
+        changes maps 'recipe' / 'rule' / 'transcript' to (names to drop,
+        documents to index again). Returns how many were indexed.
+        """
+        index = {'recipe': self.index_recipe, 'rule': self.index_rule,
+                 'transcript': self.index_transcript}
+        count = 0
+        for doc_type, (names, docs) in changes.items():
+            for name in names:
+                self.remove(doc_type, name)
+            for doc in docs:
+                index[doc_type](doc)
+                count += 1
+
+        if 'recipe' in changes or 'rule' in changes:
+            self._build_connections(recipes, rules)
+        return count
+
     def search(self, query: str, top_k: int = 10,
                doc_type: str = None) -> List[Dict]:
         """
@@ -0,0 +1,437 @@
+// Style toggle
+function toggleRetro() {
+    document.body.classList.toggle('retro');
+    const btn = document.getElementById('style-toggle');
+    if (document.body.classList.contains('retro')) {
+        btn.textContent = '◉ RETRO';
+        btn.style.background = '#00ff88';
+        btn.style.color = '#0a0a0a';
+        localStorage.setItem('chen-kit-retro', '1');
+    } else {
+        btn.textContent = '◐ RETRO';
+        btn.style.background = '#21262d';
+        btn.style.color = '#8b949e';
+        localStorage.removeItem('chen-kit-retro');
+    }
+}
+// Restore retro mode from localStorage
+if (localStorage.getItem('chen-kit-retro')) {
+    document.body.classList.add('retro');
+    document.getElementById('style-toggle').textContent = '◉ RETRO';
+    document.getElementById('style-toggle').style.background = '#00ff88';
+    document.getElementById('style-toggle').style.color = '#0a0a0a';
+}
+
+// PL/EN language toggle — server-side translation via lang= param
+function toggleLang() {
+    const url = new URL(window.location.href);
+    const current = url.searchParams.get('lang') || 'pl';
+    const next = current === 'en' ? 'pl' : 'en';
+    url.searchParams.set('lang', next);
+    window.location.href = url.toString();
+}
+// Update button state from URL
+(function() {
+    const url = new URL(window.location.href);
+    const lang = url.searchParams.get('lang') || 'pl';
+    const btn = document.getElementById('lang-toggle');
+    if (btn) {
+        btn.textContent = lang.toUpperCase();
+        btn.style.color = lang === 'en' ? '#3fb950' : '#f0883e';
+    }
+})();
+
+// Sidebar: the page carries the first window of rows; the rest load from /api/sidebar
+// as the list scrolls. Rows are shared across selections, so the selection is marked here.
+function markSidebarSelection(root) {
+    const selected = document.querySelector('.sidebar').dataset.selected;
+    if (!selected) return;
+    root.querySelectorAll('a[data-name="' + CSS.escape(selected) + '"] .list-item')
+        .forEach(div => div.classList.add('selected'));
+}
+(function() {
+    const sidebar = document.querySelector('.sidebar');
+    markSidebarSelection(sidebar);
+    const more = sidebar.querySelector('.sidebar-more');
+    if (!more || !('IntersectionObserver' in window)) return;
+
+    let loading = false;
+    const observer = new IntersectionObserver(entries => {
+        if (loading || !entries.some(e => e.isIntersecting)) return;
+        loading = true;
+        fetch(more.dataset.src)
+            .then(res => res.json())
+            .then(page => {
+                const box = document.createElement('div');
+                box.innerHTML = page.items.map(row => row.html).join('');
+                markSidebarSelection(box);
+                more.before(...box.childNodes);
+                if (page.next_cursor) {
+                    const url = new URL(more.dataset.src, window.location.href);
+                    url.searchParams.set('cursor', page.next_cursor);
+                    more.dataset.src = url.pathname + url.search;
+                    more.dataset.shown = +more.dataset.shown + page.items.length;
+                    more.textContent = (page.total - more.dataset.shown) + ' more…';
+                } else {
+                    observer.disconnect();
+                    more.remove();
+                }
+            })
+            .finally(() => { loading = false; });
+    }, { root: sidebar, rootMargin: '400px' });
+    observer.observe(more);
+})();
+
+// Keyboard navigation
+(function() {
+    const sidebar = document.querySelector('.sidebar');
+    // Re-read on each use: rows are appended as the sidebar scrolls
+    const links = () => Array.from(sidebar.querySelectorAll('a[href]'));
+    let currentIdx = links().findIndex(a => a.querySelector('.selected'));
+    if (currentIdx < 0) currentIdx = 0;
+
+    function highlight(idx) {
+        links().forEach((item, i) => {
+            const div = item.querySelector('.list-item');
+            if (div) {
+                if (i === idx) {
+                    div.classList.add('selected');
+                    item.scrollIntoView({ block: 'nearest', behavior: 'smooth' });
+                } else {
+                    div.classList.remove('selected');
+                }
+            }
+        });
+    }
+
+    document.addEventListener('keydown', e => {
+        // Ignore if typing in input
+        if (e.target.tagName === 'INPUT' || e.target.tagName === 'TEXTAREA') return;
+
+        if (e.key === 'ArrowDown' || e.key === 'j') {
+            e.preventDefault();
+            currentIdx = Math.min(currentIdx + 1, links().length - 1);
+            highlight(currentIdx);
+        } else if (e.key === 'ArrowUp' || e.key === 'k') {
+            e.preventDefault();
+            currentIdx = Math.max(currentIdx - 1, 0);
+            highlight(currentIdx);
+        } else if (e.key === 'Enter') {
+            e.preventDefault();
+            const items = links();
+            if (items[currentIdx]) items[currentIdx].click();
+        } else if (e.key === '/') {
+            e.preventDefault();
+            document.querySelector('.search-box input')?.focus();
+        }
+    });
+
+    // Click to update currentIdx
+    sidebar.addEventListener('click', e => {
+        const link = e.target.closest('a[href]');
+        if (link) currentIdx = links().indexOf(link);
+    });
+})();
+
+// Home: ASCII boiling pot animation
+(function(){
+    const canvas = document.getElementById('pot-canvas');
+    if (!canvas) return;
+    let width = 45, height = 28, grid = [], time = 0, bubbles = [];
+
+    function initGrid() {
+        grid = [];
+        for (let y = 0; y < height; y++) {
+            let row = [];
+            for (let x = 0; x < width; x++) row.push(' ');
+            grid.push(row);
+        }
+    }
+
+    function render() {
+        let html = '';
+        for (let y = 0; y < height; y++) {
+            for (let x = 0; x < width; x++) html += grid[y][x];
+            html += '\n';
+        }
+        canvas.textContent = html;
+    }
+
+    function update() {
+        initGrid();
+        const t = time * 0.1;
+        const potLeft = 8, potRight = 36, potTop = 6, potBottom = 20, waterTop = 10;
+
+        // Handles
+        grid[potTop + 2][potLeft - 2] = '●';
+        grid[potTop + 2][potLeft - 1] = '═';
+        grid[potTop + 2][potRight + 1] = '═';
+        grid[potTop + 2][potRight + 2] = '●';
+
+        // Pot body
+        for (let x = potLeft; x <= potRight; x++) {
+            grid[potTop][x] = '─';
+            grid[potBottom][x] = '═';
+        }
+        for (let y = potTop; y <= potBottom; y++) {
+            grid[y][potLeft] = '│';
+            grid[y][potRight] = '│';
+        }
+        grid[potTop][potLeft] = '┌';
+        grid[potTop][potRight] = '┐';
+        grid[potBottom][potLeft] = '╘';
+        grid[potBottom][potRight] = '╛';
+
+        // Lid wobble
+        const lidWobble = Math.sin(t * 2) * 0.5;
+        const lidY = Math.floor(potTop - 1 + lidWobble);
+        for (let x = potLeft + 2; x <= potRight - 2; x++) {
+            grid[lidY][x] = '▀';
+        }
+        grid[lidY - 1][Math.floor((potLeft + potRight) / 2)] = '○';
+
+        // Boiling water
+        for (let x = potLeft + 1; x < potRight; x++) {
+            const wave = Math.sin(x * 0.4 + t * 3) * 0.5;
+            const surfaceY = Math.floor(waterTop + wave);
+            grid[surfaceY][x] = '~';
+        }
+
+        // Fill water
+        for (let y = waterTop + 1; y < potBottom; y++) {
+            for (let x = potLeft + 1; x < potRight; x++) {
+                if (grid[y][x] === ' ') grid[y][x] = '░';
+            }
+        }
+
+        // Bubbles
+        if (time % 4 === 0) {
+            const chars = ['o', 'O', '°', '○'];
+            bubbles.push({
+                x: potLeft + 3 + Math.random() * (potRight - potLeft - 6),
+                y: potBottom - 2,
+                speed: 0.15 + Math.random() * 0.2,
+                char: chars[Math.floor(Math.random() * chars.length)]
+            });
+        }
+        bubbles = bubbles.filter(b => {
+            b.y -= b.speed;
+            b.x += Math.sin(time * 0.2 + b.x) * 0.1;
+            const bx = Math.floor(b.x), by = Math.floor(b.y);
+            if (by > waterTop && by < potBottom && bx > potLeft && bx < potRight) {
+                grid[by][bx] = b.char;
+                return true;
+            }
+            return by > waterTop - 1;
+        });
+
+        // Steam
+        const steamChars = ['░', '▒', '·', '∙'];
+        for (let i = 0; i < 8; i++) {
+            const side = i < 4 ? potLeft + 4 : potRight - 4;
+            const phase = i * 1.5;
+            const steamY = lidY - 1 - ((t * 0.3 + phase) % 5);
+            const wobble = Math.sin(t * 0.4 + phase) * 1.2;
+            const steamX = Math.floor(side + wobble);
+            if (steamY >= 0 && steamY < lidY - 1 && steamX > 0 && steamX < width) {
+                const idx = Math.floor((lidY - 1 - steamY) / 5 * (steamChars.length - 1));
+                grid[Math.floor(steamY)][steamX] = steamChars[idx];
+            }
+        }
+
+        // Stove
+        for (let x = potLeft - 1; x <= potRight + 1; x++) grid[potBottom + 2][x] = '▬';
+
+        // Flames
+        const flames = ['▲', '△', '^'];
+        for (let i = 0; i < 6; i++) {
+            const fx = potLeft + 3 + i * 4 + Math.sin(t * 3 + i) * 0.3;
+            const flicker = Math.floor(Math.abs(Math.sin(t * 4 + i * 2)) * flames.length);
+            if (fx > potLeft && fx < potRight) {
+                grid[potBottom + 1][Math.floor(fx)] = flames[flicker];
+            }
+        }
+
+        time++;
+    }
+
+    function animate() {
+        update();
+        render();
+        requestAnimationFrame(animate);
+    }
+
+    initGrid();
+    requestAnimationFrame(animate);
+})();
+
+// Recipes
+async function createNewRecipe() {
+    const name = prompt('Recipe name:');
+    if (!name) return;
+    const res = await fetch('/api/create_recipe', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({name: name})
+    });
+    const data = await res.json();
+    if (data.id) window.location.href = '/?edit=' + data.id + '&type=recipe';
+}
+async function deleteRecipe(id) {
+    if (!confirm('Delete this recipe permanently?')) return;
+    await fetch('/api/delete_recipe', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({id: id})
+    });
+    window.location.href = '/';
+}
+async function addMissingToList(id) {
+    const lang = new URL(window.location.href).searchParams.get('lang') || 'pl';
+    const res = await fetch('/api/shoplist', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({action: 'add_recipes', list_idx: 0, recipes: [].concat(id), lang: lang})
+    });
+    const data = await res.json();
+    alert(data.delta ? 'Added ' + data.delta.texts.length + ' items to the shop list' : 'Nothing missing');
+}
+
+// Inventory
+async function clearAllInventory() {
+    if (!confirm('Delete ALL inventory items? This gives you a fresh start. Categories will remain but all items will be removed.')) return;
+    await fetch('/api/clear_inventory', {method: 'POST', headers: {'Content-Type': 'application/json'}, body: '{}'});
+    location.reload();
+}
+
+// Knowledge base
+async function createNewArticle() {
+    const name = prompt('Article title:');
+    if (!name) return;
+    const category = prompt('Category path (e.g. diet/core, health/tcm, wellness/mental):', 'general');
+    if (category === null) return;
+    const res = await fetch('/api/create_knowledge', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({name: name, category: category || 'general'})
+    });
+    const data = await res.json();
+    if (data.id) window.location.href = '/?edit=' + data.id + '&type=rules';
+}
+async function deleteKnowledge(id) {
+    if (!confirm('Delete this article permanently?')) return;
+    await fetch('/api/delete_knowledge', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({id: id})
+    });
+    window.location.href = '/?view=knowledge';
+}
+
+// Shop list (currentListIdx and shopLang are set inline by the page)
+let pickedRecipes = [];
+
+function pickRecipe(input) {
+    const name = input.value.trim();
+    const known = document.querySelector('#recipe-options option[value="' + CSS.escape(name) + '"]');
+    input.value = '';
+    if (!known) return;
+    pickedRecipes.push(name);
+    refreshMissing();
+}
+
+function unpickRecipe(i) {
+    pickedRecipes.splice(i, 1);
+    refreshMissing();
+}
+
+async function refreshMissing() {
+    document.getElementById('recipe-chips').innerHTML = pickedRecipes.map((n, i) =>
+        `<span class="tag" style="cursor:pointer" onclick="unpickRecipe(${i})">${n} ✕</span>`).join('');
+    const preview = document.getElementById('missing-preview');
+    const button = document.getElementById('add-missing');
+    if (!pickedRecipes.length) { preview.innerHTML = ''; button.style.display = 'none'; return; }
+    const qs = pickedRecipes.map(n => 'recipe=' + encodeURIComponent(n)).join('&');
+    const res = await fetch('/api/shoplist/missing?lang=' + shopLang + '&' + qs);
+    const data = await res.json();
+    preview.innerHTML = data.items.length
+        ? data.items.map(m => `<div class="ingredient missing"><span class="check">✗</span>${m.text}</div>`).join('')
+        : '<div style="color:#3fb950;font-size:12px">Everything is in the inventory</div>';
+    button.style.display = data.items.length ? 'inline-block' : 'none';
+}
+
+async function addMissing() {
+    await shoplistAction({action: 'add_recipes', list_idx: currentListIdx, recipes: pickedRecipes, lang: shopLang});
+    location.reload();
+}
+
+function switchList(idx) {
+    window.location.href = '/?view=shoplist&list=' + idx;
+}
+
+async function shoplistAction(body) {
+    const res = await fetch('/api/shoplist', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify(body)
+    });
+    return await res.json();
+}
+
+async function createList() {
+    const name = prompt('New list name:');
+    if (!name) return;
+    await shoplistAction({action: 'create_list', name: name});
+    location.reload();
+}
+
+async function renameList() {
+    const name = prompt('New name:', document.getElementById('list-name').textContent);
+    if (!name) return;
+    await shoplistAction({action: 'rename_list', list_idx: currentListIdx, name: name});
+    location.reload();
+}
+
+async function deleteList() {
+    if (!confirm('Delete this list?')) return;
+    await shoplistAction({action: 'delete_list', list_idx: currentListIdx});
+    window.location.href = '/?view=shoplist';
+}
+
+async function addItem() {
+    const input = document.getElementById('new-item');
+    const text = input.value.trim();
+    if (!text) return;
+    await shoplistAction({action: 'add_item', list_idx: currentListIdx, text: text});
+    location.reload();
+}
+
+async function toggleItem(itemId) {
+    const row = document.getElementById('shop-item-' + itemId);
+    const res = await shoplistAction({action: 'toggle_item', list_idx: currentListIdx, item_id: itemId,
+                                      checked: row.dataset.checked !== '1'});
+    if (!res.delta) { location.reload(); return; }
+    // Patch the row from the delta instead of reloading the whole page
+    const checked = res.delta.checked;
+    row.dataset.checked = checked ? '1' : '0';
+    const box = row.querySelector('.shop-check');
+    box.style.background = checked ? '#3fb950' : 'transparent';
+    box.style.borderColor = checked ? '#3fb950' : '#30363d';
+    box.innerHTML = checked ? '<span style="color:white;font-size:13px">✓</span>' : '';
+    const text = row.querySelector('.shop-text');
+    text.style.color = checked ? '#8b949e' : '#c9d1d9';
+    text.style.textDecoration = checked ? 'line-through' : 'none';
+    const done = document.querySelectorAll('.shop-item[data-checked="1"]').length;
+    const total = document.querySelectorAll('.shop-item').length;
+    document.getElementById('checked-count').textContent = done;
+    const pct = total ? Math.floor(done / total * 100) : 0;
+    const pctEl = document.getElementById('progress-pct');
+    if (pctEl) pctEl.textContent = pct + '%';
+    const bar = document.getElementById('progress-bar');
+    if (bar) bar.style.width = pct + '%';
+}
+
+async function deleteItem(itemId) {
+    await shoplistAction({action: 'delete_item', list_idx: currentListIdx, item_id: itemId});
+    location.reload();
+}
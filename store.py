@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+CHEN-KIT Query Store
+Optional SQLite mirror of the parsed markdown: an FTS5 trigram index over
+recipe and rule content (substring search with snippets), plus normalized
+tag, meta and ingredient tables. Markdown stays the source of truth; the
+store is derived from parse_md() output and synced per changed document.
+"""
+
+import hashlib
+import html
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+STORE_VERSION = 1
+MIN_QUERY = 3          # trigram MATCH needs three characters; shorter queries stay Python scans
+SNIPPET_TOKENS = 40      # trigram tokens, so roughly characters
+
+SCHEMA = '''
+CREATE TABLE docs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    lang TEXT NOT NULL,
+    name TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    title TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    UNIQUE (kind, lang, name)
+);
+CREATE INDEX docs_order ON docs (kind, lang, filename);
+CREATE TABLE tags (doc_id INTEGER NOT NULL REFERENCES docs (id) ON DELETE CASCADE, tag TEXT NOT NULL);
+CREATE INDEX tags_tag ON tags (tag, doc_id);
+CREATE TABLE meta (doc_id INTEGER NOT NULL REFERENCES docs (id) ON DELETE CASCADE, key TEXT NOT NULL, value TEXT NOT NULL);
+CREATE INDEX meta_key ON meta (key, value, doc_id);
+CREATE TABLE items (doc_id INTEGER NOT NULL REFERENCES docs (id) ON DELETE CASCADE, position INTEGER NOT NULL,
+                    text TEXT NOT NULL, key TEXT NOT NULL);
+CREATE INDEX items_key ON items (key, doc_id);
+CREATE VIRTUAL TABLE recipe_fts USING fts5 (content, tokenize = 'trigram');
+CREATE VIRTUAL TABLE rule_fts USING fts5 (content, tokenize = 'trigram');
+'''
+
+
+def fts5_available() -> bool:
+    """True when this sqlite3 build has FTS5 with the trigram tokenizer (SQLite 3.34+)"""
+    try:
+        conn = sqlite3.connect(':memory:')
+        conn.execute("CREATE VIRTUAL TABLE t USING fts5 (c, tokenize = 'trigram')")
+        conn.close()
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def digest(doc: Dict) -> str:
+    return hashlib.sha1(doc['content'].encode('utf-8')).hexdigest()
+
+
+def phrase(query: str) -> str:
+    """FTS5 phrase for a raw query; with the trigram tokenizer it matches as a substring"""
+    return '"' + query.replace('"', '""') + '"'
+
+
+def snippet_html(raw: str) -> str:
+    """Escape a snippet and turn its \\x02 / \\x03 markers into <mark> tags"""
+    return html.escape(raw).replace('\x02', '<mark>').replace('\x03', '</mark>')
+
+
+class DocStore:
+    """
+    One connection behind a lock; every query is an indexed lookup that
+    returns document names, so callers map them back to their parsed docs.
+    tags(doc) and ingredients(doc) -> [(text, key)] fill the normalized
+    tables the same way the dashboard reads them.
+    """
+
+    def __init__(self, path, tags: Callable[[Dict], List[str]],
+                 ingredients: Callable[[Dict], List[Tuple[str, str]]]):
+        self.path = str(path)
+        self.tags = tags
+        self.ingredients = ingredients
+        self.lock = threading.Lock()
+        self.conn = self._connect()
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != STORE_VERSION:
+            if version and self.path != ':memory:':    # written by another schema: start over
+                self.conn.close()
+                for suffix in ('', '-wal', '-shm'):
+                    Path(self.path + suffix).unlink(missing_ok=True)
+                self.conn = self._connect()
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f'PRAGMA user_version = {STORE_VERSION}')
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA foreign_keys = ON')
+        if self.path != ':memory:':
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+        return conn
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def reopen(self):
+        """Fresh connection after a fork (close() in the parent first; SQLite handles must not cross a fork)"""
+        with self.lock:
+            self.conn = self._connect()
+
+    # --- sync ---
+
+    def sync(self, kind: str, lang: str, docs, names: Optional[Iterable[str]] = None) -> int:
+        """Bring one collection in line with docs (a dashboard Docs list).
+
+        With names, only those documents are written or deleted (a file change);
+        without, every document is compared by content digest, so a restart
+        against an existing store rewrites only what changed on disk.
+        Returns how many documents were written or deleted.
+        """
+        with self.lock:
+            # IMMEDIATE: pre-fork workers sync the same change, so take the write lock before reading digests
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                stored = dict(self.conn.execute(
+                    'SELECT name, digest FROM docs WHERE kind = ? AND lang = ?', (kind, lang)).fetchall())
+                if names is None:
+                    names = set(stored) | set(docs.by_name)
+                written = 0
+                for name in names:
+                    doc = docs.by_name.get(name)
+                    if doc is not None and stored.get(name) == digest(doc):
+                        continue
+                    if name in stored:
+                        self._delete(kind, lang, name)
+                    if doc is not None:
+                        self._insert(kind, lang, doc)
+                    written += 1
+                self.conn.execute('COMMIT')
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+            return written
+
+    def _delete(self, kind, lang, name):
+        row = self.conn.execute('SELECT id FROM docs WHERE kind = ? AND lang = ? AND name = ?',
+                                (kind, lang, name)).fetchone()
+        if row:
+            self.conn.execute(f'DELETE FROM {kind}_fts WHERE rowid = ?', row)
+            self.conn.execute('DELETE FROM docs WHERE id = ?', row)
+
+    def _insert(self, kind, lang, doc):
+        doc_id = self.conn.execute(
+            'INSERT INTO docs (kind, lang, name, filename, title, digest) VALUES (?, ?, ?, ?, ?, ?)',
+            (kind, lang, doc['name'], doc['name'] + '.md', doc.get('title', doc['name']), digest(doc))).lastrowid
+        self.conn.execute(f'INSERT INTO {kind}_fts (rowid, content) VALUES (?, ?)', (doc_id, doc['content']))
+        self.conn.executemany('INSERT INTO tags (doc_id, tag) VALUES (?, ?)',
+                              [(doc_id, tag) for tag in dict.fromkeys(self.tags(doc))])
+        self.conn.executemany('INSERT INTO meta (doc_id, key, value) VALUES (?, ?, ?)',
+                              [(doc_id, key, value) for key, value in doc['meta'].items()])
+        if kind == 'recipe':
+            self.conn.executemany('INSERT INTO items (doc_id, position, text, key) VALUES (?, ?, ?, ?)',
+                                  [(doc_id, i, text, key) for i, (text, key) in enumerate(self.ingredients(doc))])
+
+    # --- queries ---
+
+    def search(self, kind: str, lang: str, query: str) -> Optional[List[str]]:
+        """Names of documents containing query (case-insensitive substring), in file order.
+        None when the query is too short for the trigram index."""
+        if len(query) < MIN_QUERY:
+            return None
+        with self.lock:
+            return [name for (name,) in self.conn.execute(
+                f'SELECT d.name FROM {kind}_fts JOIN docs d ON d.id = {kind}_fts.rowid '
+                f'WHERE {kind}_fts MATCH ? AND d.lang = ? ORDER BY d.filename', (phrase(query), lang))]
+
+    def snippets(self, kind: str, lang: str, query: str, names: Optional[List[str]] = None) -> Dict[str, str]:
+        """name → snippet html around the match, for names (one page of hits) or every hit.
+        Snippets cost far more than the match itself, so ask only for rows that are shown."""
+        if len(query) < MIN_QUERY:
+            return {}
+        sql = (f"SELECT d.name, snippet({kind}_fts, 0, char(2), char(3), '…', {SNIPPET_TOKENS}) "
+               f"FROM {kind}_fts JOIN docs d ON d.id = {kind}_fts.rowid "
+               f"WHERE {kind}_fts MATCH ? AND d.lang = ?")
+        args = [phrase(query), lang]
+        if names is not None:
+            if not names:
+                return {}
+            sql += f" AND d.name IN ({', '.join('?' * len(names))})"
+            args += names
+        with self.lock:
+            return {name: snippet_html(raw) for name, raw in self.conn.execute(sql, args)}
+
+    def with_tag(self, kind: str, lang: str, tag: str) -> List[str]:
+        """Names of documents carrying a tag, in file order"""
+        with self.lock:
+            return [name for (name,) in self.conn.execute(
+                'SELECT d.name FROM tags t JOIN docs d ON d.id = t.doc_id '
+                'WHERE t.tag = ? AND d.kind = ? AND d.lang = ? ORDER BY d.filename',
+                (tag.lower(), kind, lang))]
+
+    def with_meta(self, kind: str, lang: str, key: str, value: str) -> List[str]:
+        """Names of documents whose meta key equals value (e.g. category), in file order"""
+        with self.lock:
+            return [name for (name,) in self.conn.execute(
+                'SELECT d.name FROM meta m JOIN docs d ON d.id = m.doc_id '
+                'WHERE m.key = ? AND m.value = ? AND d.kind = ? AND d.lang = ? ORDER BY d.filename',
+                (key, value, kind, lang))]
+
+    def using_ingredient(self, lang: str, key: str) -> List[str]:
+        """Names of recipes with an ingredient of this merge key, in file order"""
+        with self.lock:
+            return [name for (name,) in self.conn.execute(
+                "SELECT DISTINCT d.name FROM items i JOIN docs d ON d.id = i.doc_id "
+                "WHERE i.key = ? AND d.kind = 'recipe' AND d.lang = ? ORDER BY d.filename",
+                (key, lang))]
+
+    def counts(self) -> Dict[str, int]:
+        with self.lock:
+            return {f'{kind}_{lang}': n for kind, lang, n in self.conn.execute(
+                'SELECT kind, lang, COUNT(*) FROM docs GROUP BY kind, lang')}
@@ -10,12 +10,18 @@ import threading
 import urllib.request
 from http.server import HTTPServer
 
+from constellation import build_layout
+from mealplan import plan_meals, shopping_bits, parse_forbidden, violates, text_stems
+
 # Import dashboard components
 from dashboard import (
     ALL_RECIPES, ALL_RULES, ALL_TRANSCRIPTS, ALL_INVENTORY,
     ALL_INV_DATA, INV_BY_CAT, TAGS_STATS, RULES_DO, RULES_DONT,
     SEMANTIC_ENABLED, SEARCH_INDEX, Handler,
-    parse_md, load_folder, score_recipe, categorize_recipe, has_forbidden_combo
+    parse_md, load_folder, score_recipe, categorize_recipe, has_forbidden_combo,
+    parse_quantity, missing_ingredients, gzip_bytes, accepts_gzip, api_payload,
+    render_sidebar, SIDEBAR_WINDOW, get_data, get_core_rules, bump_data_version,
+    meal_plan, recipe_meals, route_label, FRAGMENTS, FragmentCache
 )
 
 def test_data_loading():
@@ -69,6 +75,19 @@ def test_rules_structure():
     print(f"  Has sections: {len(sample.get('sections', {}))} sections ✓")
     return True
 
+def test_name_maps():
+    """Test every dataset carries a name → document map matching its list."""
+    print("\n[TEST] Name Maps")
+
+    for lang in ('pl', 'en'):
+        d = get_data(lang)
+        for key in ('recipes', 'rules', 'transcripts', 'inv_data'):
+            docs = d[key]
+            assert len(docs.by_name) == len(docs), f"{lang}/{key}: duplicate or missing names"
+            assert all(docs.by_name[doc['name']] is doc for doc in docs), f"{lang}/{key}: stale map"
+        print(f"  {lang}: {len(d['recipes'].by_name)} recipes, {len(d['rules'].by_name)} rules ✓")
+    return True
+
 def test_semantic_search():
     """Test semantic search functionality."""
     print("\n[TEST] Semantic Search")
@@ -106,12 +125,309 @@ def test_recipe_scoring():
     assert max(scores) <= 100, "Score exceeds 100"
     assert min(scores) >= 0, "Score below 0"
 
+    # Alternating PL/EN inventories, also from several threads, must not mix their cached rows
+    en_inventory = get_data('en')['inventory']
+    want = {id(inv): [score_recipe(r, inv) for r in ALL_RECIPES[:20]] for inv in (ALL_INVENTORY, en_inventory)}
+    assert want[id(ALL_INVENTORY)] == scores
+    mismatches = []
+
+    def score_both():
+        for _ in range(20):
+            for inv in (ALL_INVENTORY, en_inventory):
+                if [score_recipe(r, inv) for r in ALL_RECIPES[:20]] != want[id(inv)]:
+                    mismatches.append(id(inv))
+
+    threads = [threading.Thread(target=score_both) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not mismatches, f"{len(mismatches)} scorings used the other language's inventory"
+
     # Check some recipes have high scores
     high_score_count = sum(1 for s in scores if s >= 50)
     print(f"  Score range: {min(scores)}-{max(scores)} ✓")
     print(f"  High scoring (≥50%): {high_score_count}/20 ✓")
     return True
 
+def test_cook_index():
+    """Test bitset availability, missing counts and one-away queries."""
+    from cookable import CookIndex
+    from dashboard import recipe_scores, count_ready
+    print("\n[TEST] Cook Index")
+
+    index = CookIndex([
+        ['Tofu', 'Ryz'],
+        ['Tofu', 'Ryz', 'Imbir'],
+        ['Jablko', 'Jablko'],
+        [],
+    ])
+    assert len(index.texts) == 5, "texts should be shared across recipes, repeats within one kept"
+    asked = []
+    pantry = index.pantry(lambda text: asked.append(text) or text.lower().startswith(('tofu', 'ryz')))
+    assert sorted(asked) == ['Imbir', 'Jablko', 'Ryz', 'Tofu'], "inventory matched once per text"
+    assert index.scores(pantry) == [100, 66, 0, 0]
+    assert index.missing(pantry) == [0, 1, 2, 0]
+    assert index.ready(pantry) == [0], "recipes without ingredients are never ready"
+    assert index.one_away(pantry) == [(1, 'Imbir')]
+    assert index.missing_texts(1, pantry) == ['Imbir']
+
+    # Items sharing a stem are separate: sesame of one colour is not sesame of any colour
+    index = CookIndex([['Czarny sezam', '6 lyzeczek sezamu (bialy/czarny)']])
+    assert index.scores(index.pantry(lambda text: text == 'Czarny sezam')) == [50]
+
+    # The bitsets agree with score_recipe() on the shipped kitchen, so lists and recipe pages match
+    for lang in ('pl', 'en'):
+        d = get_data(lang)
+        scores = recipe_scores(lang)
+        want = {r['name']: score_recipe(r, d['inventory']) for r in d['recipes']}
+        wrong = [name for name in want if scores[name] != want[name]]
+        assert not wrong, f"{lang}: {len(wrong)} recipes differ from score_recipe, e.g. {wrong[:3]}"
+        ready = sum(1 for r in d['recipes'] if r['items'] and want[r['name']] >= 100)
+        assert count_ready(lang) == ready, (lang, count_ready(lang), ready)
+
+    print(f"  {len(recipe_scores())} recipes scored like score_recipe, {count_ready()} ready ✓")
+    return True
+
+def test_missing_ingredients():
+    """Test recipe-to-shopping-list aggregation."""
+    print("\n[TEST] Missing Ingredients")
+
+    assert parse_quantity("2 lyzki syropu klonowego") == (2.0, 'tbsp', 'syropu klonowego')
+    assert parse_quantity("Tofu 200g") == (200.0, 'g', 'Tofu')
+    assert parse_quantity("Kurczak lub tofu")[0] is None
+
+    recipe = {'name': 'a', 'items': ['2 lyzki syropu klonowego', '1 lyzka syropu klonowego', 'Tofu']}
+    missing = missing_ingredients([recipe, recipe], {'Tofu naturalne'})
+    assert len(missing) == 1, f"Expected 1 merged item, got {missing}"
+    assert missing[0]['amounts'] == {'tbsp': 6.0}, "Quantities not merged across recipes"
+
+    print(f"  Merged: {missing[0]['text']} ✓")
+    return True
+
+def test_compression():
+    """Test gzip negotiation and encoding."""
+    import gzip
+    print("\n[TEST] Compression")
+
+    assert accepts_gzip("gzip, deflate, br")
+    assert accepts_gzip("*")
+    assert not accepts_gzip("gzip;q=0")
+    assert not accepts_gzip("gzip;q=abc"), "a malformed q-value must not raise"
+    assert accepts_gzip("gzip;q=0.5")
+    assert not accepts_gzip("")
+
+    body = ("<div>" * 500).encode()
+    packed = gzip_bytes(body)
+    assert gzip.decompress(packed) == body, "gzip round trip failed"
+    assert len(packed) < len(body)
+
+    print(f"  {len(body)} → {len(packed)} bytes ✓")
+    return True
+
+def test_constellation_layout():
+    """Test server-side constellation layout and packed buffers."""
+    import base64
+    print("\n[TEST] Constellation Layout")
+
+    data = {
+        'recipes': [
+            {'title': 'A', 'tags': ['dinner'], 'ingredients': ['Tofu', 'Ryz']},
+            {'title': 'B', 'tags': ['Dinner'], 'ingredients': ['tofu', 'Cebula']},
+            {'title': 'C', 'tags': [], 'ingredients': ['Jablko']},
+        ],
+        'rules': [{'title': 'R', 'category': 'diet', 'tags': ['dinner']}],
+    }
+    layout = build_layout(data, iterations=10, chunk_size=3)
+    base = layout['base']
+    counts = {t: c for t, _, c in base['ranges']}
+    assert counts == {'recipe': 3, 'ingredient': 4, 'tag': 1, 'knowledge': 1, 'category': 1}, counts
+    assert base['chunks'] == len(layout['chunks']) == 2, "ingredients not split into chunks"
+    assert layout['chunks'][0]['labels'][0] == 'Tofu', "most connected ingredient should stream first"
+
+    n = edges = 0
+    for part in [base] + layout['chunks']:
+        assert part['start'] == n, "parts not contiguous"
+        n += len(part['ids'])
+        assert len(base64.b64decode(part['positions'])) == len(part['ids']) * 3 * 4, "positions not Float32 xyz per node"
+        part_edges = len(base64.b64decode(part['edges'])) // 8
+        assert len(base64.b64decode(part['edge_positions'])) == part_edges * 6 * 4
+        edges += part_edges
+    assert n == 10 and edges == base['edge_total'] == 9, (n, edges)
+
+    print(f"  {n} nodes, {edges} edges in {base['chunks'] + 1} parts ✓")
+    return True
+
+def test_constellation_endpoint():
+    """Test /api/constellation.json revalidation, chunk errors and the shape the client indexes."""
+    import base64
+    import json
+    from array import array
+    print("\n[TEST] Constellation Endpoint")
+
+    def unpack(b64, typecode):
+        values = array(typecode, base64.b64decode(b64))
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return values
+
+    status, headers, body = fetch("/api/constellation.json")
+    assert status == 200 and headers['Cache-Control'] == 'no-cache'
+    etag = headers['ETag']
+    status, headers, body304 = fetch("/api/constellation.json", {'If-None-Match': etag})
+    assert status == 304 and body304 == b'' and headers['ETag'] == etag
+    base = json.loads(body)
+
+    # ranges: [type, start, count], contiguous, sizing every client buffer
+    total = 0
+    type_of = []
+    for node_type, start, count in base['ranges']:
+        assert start == total, "ranges not contiguous"
+        type_of += [node_type] * count
+        total += count
+
+    parts = [base]
+    for i in range(base['chunks']):
+        status, headers, body = fetch(f"/api/constellation.json?chunk={i}")
+        assert status == 200, f"chunk {i}: {status}"
+        parts.append(json.loads(body))
+    for chunk in (str(base['chunks']), "-1", "abc"):
+        assert fetch(f"/api/constellation.json?chunk={chunk}")[0] == 404, f"?chunk={chunk} should 404"
+
+    loaded = edges = 0
+    degree = [0] * total
+    for part in parts:
+        assert part['start'] == loaded, "parts must follow on (addPart rejects gaps)"
+        loaded += len(part['ids'])
+        assert len(part['labels']) == len(part['ids'])
+        assert len(unpack(part['positions'], 'f')) == len(part['ids']) * 3
+        pairs = unpack(part['edges'], 'I')
+        assert len(pairs) % 2 == 0
+        assert len(unpack(part['edge_positions'], 'f')) == len(pairs) * 3
+        # adjacency[] only has entries for nodes loaded so far
+        assert all(i < loaded for i in pairs), "edge to a node that is not loaded yet"
+        ends = list(pairs[1::2])
+        if part is not base:
+            # ingredientEdgeEnd assumes each chunk's edges are grouped by ingredient
+            assert all(type_of[j] == 'ingredient' for j in ends) and ends == sorted(ends)
+        for i in pairs:
+            degree[i] += 1
+        edges += len(pairs) // 2
+    assert loaded == total and edges == base['edge_total'], (loaded, total, edges)
+    assert base['max_degree'] == max(degree, default=0), "highlight buffer sized from max_degree"
+
+    # The client restarts from the base when a chunk names another build
+    assert {part['version'] for part in parts} == {base['version']}
+    bump_data_version()
+    assert json.loads(fetch("/api/constellation.json")[2])['version'] == base['version'], \
+        "same data must give the same version in every worker"
+
+    print(f"  {total} nodes in {len(parts)} parts, 304 on revalidation, bad chunks 404 ✓")
+    return True
+
+def test_json_api():
+    """Test JSON API pagination, field selection and errors."""
+    print("\n[TEST] JSON API")
+
+    status, page = api_payload('/api/recipes', {'limit': ['10']})
+    assert status == 200 and len(page['items']) == 10 and page['total'] == len(ALL_RECIPES)
+    assert set(page['items'][0]) <= {'name', 'title', 'meta'}, "list should default to summary fields"
+
+    seen = [r['name'] for r in page['items']]
+    while page['next_cursor']:
+        status, page = api_payload('/api/recipes', {'limit': ['50'], 'cursor': [page['next_cursor']],
+                                                    'fields': ['name']})
+        seen += [r['name'] for r in page['items']]
+    assert seen == [r['name'] for r in ALL_RECIPES], "cursor pages should cover every recipe once"
+
+    name = ALL_RECIPES[0]['name']
+    status, doc = api_payload(f'/api/recipes/{name}', {})
+    assert status == 200 and doc['name'] == name
+    assert not any(k.startswith('_') for k in doc), "private cache keys leaked"
+
+    assert api_payload('/api/recipes/no-such-recipe', {})[0] == 404
+    assert api_payload('/api/recipes', {'cursor': ['@@']})[0] == 400
+    assert api_payload('/api/search', {})[0] == 400
+    assert api_payload('/api/nothing', {}) is None
+
+    print(f"  {len(seen)} recipes paged ✓")
+    return True
+
+def test_sidebar_window():
+    """Test windowed sidebar rendering and its /api/sidebar continuation."""
+    print("\n[TEST] Sidebar Window")
+
+    html = render_sidebar('recipes', 'pl')
+    assert html.count('data-name=') == SIDEBAR_WINDOW, "first window not sized to SIDEBAR_WINDOW"
+    assert 'sidebar-more' in html and 'selected' not in html
+
+    last = ALL_RECIPES[-1]['name']
+    assert f'data-name="{last}"' in render_sidebar('recipes', 'pl', selected=last), "window should reach the selection"
+
+    status, page = api_payload('/api/sidebar', {'view': ['recipes'], 'limit': ['1000']})
+    assert status == 200 and len(page['items']) == len(ALL_RECIPES) == page['total']
+    assert api_payload('/api/sidebar', {'view': ['nope']})[0] == 400
+
+    print(f"  {SIDEBAR_WINDOW}/{page['total']} rows in the first window ✓")
+    return True
+
+def test_derived_cache():
+    """Test derived summaries are memoized per data version."""
+    print("\n[TEST] Derived Cache")
+
+    core = get_core_rules()
+    assert get_core_rules() is core, "core rules re-parsed without a change"
+    en = get_data('en')
+    assert get_data('en')['rules_do'] is en['rules_do'], "English rules summary recomputed"
+
+    bump_data_version()
+    assert get_core_rules() is not core, "reload should invalidate derived data"
+    assert get_core_rules() == core
+
+    # A reload while a fragment renders: that render is returned but not cached for the new version
+    cache = FragmentCache()
+    def build_during_reload():
+        bump_data_version()
+        cache.get('other', lambda: "other")      # another request already renders the new version
+        return "old data"
+    assert cache.get('view', build_during_reload) == "old data"
+    assert cache.get('view', lambda: "new data") == "new data", "stale render cached across a reload"
+    assert cache.get('view', lambda: "rebuilt") == "new data"
+
+    print(f"  core rules: {len(core['forbidden'])} prohibitions ✓")
+    return True
+
+def test_kitchen_index():
+    """Test the CLI's persisted inverted index: ranking, prefix match, mtime refresh."""
+    import os
+    import tempfile
+    from pathlib import Path
+    from kitchen import SearchIndex
+    print("\n[TEST] Kitchen Search Index")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp) / "recipes"
+        folder.mkdir()
+        (folder / "a.md").write_text("# Tofu z pomidorami\n- [ ] Tofu\n- [ ] Pomidory\n", encoding='utf-8')
+        (folder / "b.md").write_text("# Zupa pomidorowa\n- [ ] Pomidory\n", encoding='utf-8')
+        index_file = Path(tmp) / "index.json"
+
+        index = SearchIndex(index_file, [(folder, "RCP")])
+        assert index.refresh() == 2
+        titles = [doc['title'] for _, doc in index.search("tofu pomidor")]
+        assert titles == ["Tofu z pomidorami", "Zupa pomidorowa"], titles
+
+        # A fresh instance loads the persisted index and re-parses nothing
+        index = SearchIndex(index_file, [(folder, "RCP")])
+        assert index.refresh() == 0
+        os.utime(folder / "b.md", ns=(1, 1))
+        (folder / "a.md").unlink()
+        assert index.refresh() == 2, "modified and deleted files should be picked up"
+        assert [doc['title'] for _, doc in index.search("tofu")] == []
+
+    print("  ranked, persisted, refreshed by mtime ✓")
+    return True
+
 def test_categorization():
     """Test recipe categorization."""
     print("\n[TEST] Recipe Categorization")
@@ -140,6 +456,533 @@ def test_forbidden_detection():
     print(f"  With forbidden combos: {forbidden_count} ✓")
     return True
 
+def test_meal_plan():
+    """Test the meal plan solver and the generated plan."""
+    print("\n[TEST] Meal Plan")
+
+    # Two breakfasts share the missing item 4, a third needs 5 and 6: the plan buys only 4
+    needs = [0b10011, 0b10101, 0b1100011]
+    plan = plan_meals(needs, 0b111, {'breakfast': [(0, 0), (1, 0), (2, 0)]}, days=2)
+    assert [day['breakfast'] for day in plan] == [0, 1], f"Wrong picks: {plan}"
+    assert shopping_bits(needs, 0b111, plan) == 0b10000
+    assert plan[0]['lunch'] is None
+    print("  solver keeps the shopping list short ✓")
+
+    bans = parse_forbidden(['**ZAKAZ:** Połączenie Cukier + Mąka + Tłuszcz.', 'Unikać masła orzechowego.'])
+    assert violates(text_stems(['Mąka pszenna', 'cukier', 'olej']), bans)
+    assert not violates(text_stems(['Mąka pszenna', 'olej']), bans)
+    assert violates(text_stems(['Masło orzechowe']), bans)
+    assert not violates(text_stems(['Masło klarowane']), bans)
+    print("  forbidden combos parsed from the core rules ✓")
+
+    start = time.perf_counter()
+    plan = meal_plan('pl', 7)
+    elapsed = time.perf_counter() - start
+    planned = [r for day in plan for r in day.values() if r]
+    assert len(plan) == 7 and planned, "Empty plan"
+    assert len({r['name'] for r in planned}) == len(planned), "Recipe repeated"
+    assert not any(has_forbidden_combo(r) for r in planned), "Forbidden recipe planned"
+    for day in plan:
+        for meal, r in day.items():
+            assert r is None or meal in recipe_meals(r), f"{r['name']} is not a {meal}"
+    print(f"  {len(planned)} meals planned in {elapsed * 1000:.0f}ms ✓")
+    return True
+
+def test_shoplist_store():
+    """Test the shopping list log: replay, torn last line, compaction, stable item ids."""
+    import json
+    import tempfile
+    from pathlib import Path
+    from dashboard import ShoplistStore
+    print("\n[TEST] Shoplist Store")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snap, log = Path(tmp) / "s.json", Path(tmp) / "s.log"
+        store = ShoplistStore(snap, log, compact_every=100)
+        store.action({'action': 'add_items', 'list_idx': 0, 'texts': ['tofu', 'ryż', 'miso', 'imbir']})
+        items = store.snapshot()['lists'][0]['items']
+        assert [i['id'] for i in items] == [1, 2, 3, 4]
+
+        # Two phones showing the same list: one deletes ryż, the other then taps miso
+        assert store.action({'action': 'delete_item', 'list_idx': 0, 'item_id': 2})
+        assert store.action({'action': 'toggle_item', 'list_idx': 0, 'item_id': 3, 'checked': True})
+        assert store.action({'action': 'delete_item', 'list_idx': 0, 'item_id': 2}) is None, "stale id rejected"
+        assert store.action({'action': 'toggle_item', 'list_idx': 0, 'item_idx': 1}) is None, "ids only"
+        after = {i['text']: i['checked'] for i in store.snapshot()['lists'][0]['items']}
+        assert after == {'tofu': False, 'miso': True, 'imbir': False}, after
+
+        # Replay from the log, ignoring a torn final write
+        with open(log, 'a', encoding='utf-8') as f:
+            f.write('{"action": "add_item", "list_idx": 0, "te')
+        replayed = ShoplistStore(snap, log)
+        assert replayed.snapshot() == store.snapshot() and replayed.seq == store.seq == 3
+        assert replayed.action({'action': 'add_item', 'list_idx': 0, 'text': 'sos sojowy'})['id'] == 5
+
+        # Compaction folds the log into the snapshot; ids keep counting from there
+        replayed.compact()
+        assert not log.exists() and json.loads(snap.read_text(encoding='utf-8'))['seq'] == 4
+        reloaded = ShoplistStore(snap, log)
+        assert reloaded.snapshot() == replayed.snapshot()
+        assert reloaded.action({'action': 'add_item', 'list_idx': 0, 'text': 'nori'})['id'] == 6
+
+        # Data written before item ids: the snapshot is numbered, position-addressed log records still replay
+        snap.write_text(json.dumps({'lists': [{'name': 'Old', 'items': [{'text': 'a', 'checked': False},
+                                                                        {'text': 'b', 'checked': False}]}], 'seq': 1}))
+        log.write_text(json.dumps({'action': 'toggle_item', 'list_idx': 0, 'item_idx': 1, 'checked': True, 'seq': 2}) + '\n')
+        legacy = ShoplistStore(snap, log)
+        assert legacy.snapshot()['lists'][0]['items'] == [{'id': 1, 'text': 'a', 'checked': False},
+                                                          {'id': 2, 'text': 'b', 'checked': True}]
+    print("  replay, torn line, compaction, stale ids rejected ✓")
+    return True
+
+def test_synthetic_corpus():
+    """Test the synthetic kitchen: a seed fixes the tree, the real kitchen is never overwritten."""
+    import tempfile
+    from pathlib import Path
+    from bench.corpus import generate, BASE
+    print("\n[TEST] Synthetic Corpus")
+
+    def tree(root):
+        return {str(f.relative_to(root)): f.read_bytes() for f in sorted(root.rglob('*')) if f.is_file()}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        a, b, c = Path(tmp) / "a", Path(tmp) / "b", Path(tmp) / "c"
+        sizes = generate(a, recipes=30, seed=7)
+        generate(b, recipes=30, seed=7)
+        generate(c, recipes=30, seed=8)
+        files = len(tree(a))
+        assert tree(a) == tree(b), "same seed must give the same kitchen"
+        assert tree(a) != tree(c)
+        assert len(load_folder(a / "recipes")) == sizes['recipes'] == 30
+
+        for out, kwargs in ((BASE, {'force': True}), (a, {})):
+            try:
+                generate(out, recipes=5, **kwargs)
+                assert False, f"generate() should refuse {out}"
+            except ValueError:
+                pass
+        assert tree(a) == tree(b), "a refused run must not touch the target"
+        generate(a, recipes=5, seed=7, force=True)
+        assert len(load_folder(a / "recipes")) == 5
+    print(f"  seed 7 reproducible ({files} files), repo and non-empty targets refused ✓")
+    return True
+
+def test_metrics():
+    """Test route labels, histograms and both metrics formats."""
+    from metrics import Metrics
+    print("\n[TEST] Metrics")
+
+    assert route_label('GET', '/?view=rules&id=x') == 'view=knowledge'
+    assert route_label('GET', '/?q=tofu') == 'view=recipes'
+    assert route_label('GET', '/api/recipes/some-recipe?fields=title') == '/api/recipes/:name'
+    assert route_label('POST', '/?del_inv=Ryz&cat=Kasze') == '/?del_inv'
+    assert route_label('GET', '/wp-login.php') == 'other', "unknown paths must not become labels"
+
+    metrics = Metrics()
+    for seconds in (0.0004, 0.003, 0.003, 0.2):
+        metrics.observe_request('GET', 'view=home', 200, seconds)
+    with metrics.timer('reload', 'recipes'):
+        pass
+    text = metrics.prometheus({'fragments': FRAGMENTS}, {'data_version': 3})
+    assert 'chenkit_requests_total{method="GET",route="view=home",status="200"} 4' in text
+    assert 'chenkit_request_duration_seconds_bucket{method="GET",route="view=home",le="0.005"} 3' in text
+    assert 'chenkit_request_duration_seconds_bucket{method="GET",route="view=home",le="+Inf"} 4' in text
+    assert 'chenkit_operation_duration_seconds_count{kind="reload",target="recipes"} 1' in text
+    assert 'chenkit_cache_hit_ratio{cache="fragments"}' in text
+
+    snapshot = metrics.snapshot({'fragments': FRAGMENTS})
+    route = snapshot['routes'][0]
+    assert route['count'] == 4 and route['statuses'] == {'200': 4}
+    assert 2.5 <= route['p50_ms'] <= 5, f"p50 outside its bucket: {route['p50_ms']}"
+    print(f"  {len(text.splitlines())} Prometheus lines, p50 {route['p50_ms']}ms ✓")
+    return True
+
+def test_profiling():
+    """Test the profiling ring buffer, top functions and folded stacks."""
+    from profiling import Profiles, wants_profile, folded_text
+    print("\n[TEST] Profiling")
+
+    assert wants_profile('/?view=recipes&profile=1')
+    assert not wants_profile('/admin/profiles?profile=1'), "admin pages must not profile themselves"
+
+    def inner():
+        return sum(i * i for i in range(20000))
+
+    def outer():
+        inner()
+        inner()
+
+    profiles = Profiles(size=2)
+    for _ in range(3):
+        profiles.run('GET', '/?profile=1', 'view=recipes', outer)
+    entries = profiles.recent()
+    assert len(entries) == 2 and entries[0]['id'] == 3, "ring buffer keeps the newest entries"
+    entry = entries[0]
+    assert any('(inner)' in row['function'] for row in entry['top'])
+    stacks = [line.rsplit(' ', 1)[0] for line in folded_text(entry).splitlines()]
+    assert any('(outer);' in s and s.endswith('(inner)') for s in stacks), stacks
+    total = sum(entry['folded'].values()) * 1000
+    assert abs(total - sum(r['own_ms'] for r in entry['top'])) < 1, "folded stacks must account for the profiled time"
+    print(f"  {len(entry['folded'])} stacks, {entry['total_ms']:.1f}ms ✓")
+    return True
+
+def test_inbox_watcher():
+    """Test the ingest inbox watcher: coalescing, debounce, a failing callback, polling."""
+    import tempfile
+    from pathlib import Path
+    from ingest_core import InboxWatcher, scan_mtimes
+    print("\n[TEST] Inbox Watcher")
+
+    class EchoProcessor:
+        def process_file(self, path):
+            return {'file': str(path), 'text': Path(path).read_text(encoding='utf-8')}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inbox = Path(tmp)
+        (inbox / "sub").mkdir()
+        note = inbox / "note.txt"
+        note.write_text("tofu", encoding='utf-8')
+        empty = inbox / "sub" / "empty.txt"
+        empty.write_text("", encoding='utf-8')
+        assert set(scan_mtimes(inbox)) == {note, empty}
+
+        # Repeated events collapse; a file is handed over once, after it settles
+        watcher = InboxWatcher(EchoProcessor(), settle=0.1)
+        for _ in range(5):
+            watcher.notify(note)
+        watcher.notify(empty)
+        watcher.notify(inbox / "image.png")
+        assert len(watcher._pending) == 2
+        assert watcher.settled() == [], "first look only records the size"
+        time.sleep(0.15)
+        assert watcher.settled() == [note], "empty files are dropped, not queued"
+        assert not watcher._pending
+        watcher.notify(note)
+        watcher.settled()
+        time.sleep(0.15)
+        assert watcher.settled() == [], "an unchanged file is not processed twice"
+        note.unlink()
+        assert watcher.prune() == 1 and not watcher._handled
+
+        # Polling fallback with one worker whose callback fails on the first file
+        results = []
+
+        def on_result(path, result):
+            results.append(path.name)
+            if len(results) == 1:
+                raise OSError("disk full")
+
+        watcher = InboxWatcher(EchoProcessor(), on_result, workers=1, settle=0.05, poll_interval=0.05)
+        assert watcher.start(inbox, use_watchdog=False) == 'polling'
+        try:
+            (inbox / "a.txt").write_text("ryż", encoding='utf-8')
+            deadline = time.time() + 5
+            while not results and time.time() < deadline:
+                time.sleep(0.05)
+            (inbox / "b.txt").write_text("miso", encoding='utf-8')
+            while len(results) < 2 and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            stopper = threading.Thread(target=watcher.stop)
+            stopper.start()
+            stopper.join(5)
+        assert results == ['a.txt', 'b.txt'], f"worker should survive a failing callback: {results}"
+        assert not stopper.is_alive(), "stop() must not hang"
+    print("  coalescing, debounce, empty files, worker errors, polling ✓")
+    return True
+
+def test_file_watcher():
+    """Test mtime polling and incremental folder reloads."""
+    import tempfile
+    from pathlib import Path
+    from watcher import FolderWatcher
+    from dashboard import reload_docs, load_folder
+    print("\n[TEST] File Watcher")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp) / "recipes"
+        folder.mkdir()
+        for name in ('a', 'b', 'c'):
+            (folder / f"{name}.md").write_text(f"# {name}\n\n- [ ] tofu\n", encoding='utf-8')
+        docs = load_folder(folder)
+        watcher = FolderWatcher({'recipes': folder, 'recipes_en': folder / "en"})
+        assert watcher.poll() == {}, "nothing changed yet"
+
+        (folder / "b.md").write_text("# b changed\n\n- [ ] ryz\n- [ ] tofu\n", encoding='utf-8')
+        (folder / "a-b.md").write_text("# a-b\n", encoding='utf-8')
+        (folder / "c.md").unlink()
+        (folder / "_draft.md").write_text("# ignored\n", encoding='utf-8')
+        changes = watcher.poll()
+        assert set(changes) == {'recipes'}
+        assert changes['recipes'].changed == {'b', 'a-b'} and changes['recipes'].removed == {'c'}
+
+        reloaded = reload_docs(docs, folder, changes['recipes'])
+        assert reloaded.by_name['a'] is docs.by_name['a'], "unchanged files must not be parsed again"
+        assert reloaded.by_name['b']['title'] == 'b changed'
+        assert [d['name'] for d in reloaded] == [d['name'] for d in load_folder(folder)]
+
+        # A rewrite the signature cannot see still counts when the writer names the file
+        assert watcher.poll([folder / "a.md"])['recipes'].changed == {'a'}
+    print(f"  {len(reloaded)} docs, 2 changed + 1 removed picked up ✓")
+    return True
+
+def test_doc_store():
+    """Test the SQLite store: FTS matches equal the keyword scan, tags, incremental sync."""
+    from store import DocStore, fts5_available
+    from dashboard import ALL_RECIPES, Docs, recipe_tags, recipe_ingredients
+    print("\n[TEST] SQLite Store")
+    if not fts5_available():
+        print("  ⚠ sqlite3 without FTS5 trigram, skipped")
+        return True
+
+    store = DocStore(':memory:', recipe_tags, lambda r: [(i['text'], i['key']) for i in recipe_ingredients(r)])
+    assert store.sync('recipe', 'pl', ALL_RECIPES) == len(ALL_RECIPES)
+    assert store.sync('recipe', 'pl', ALL_RECIPES) == 0, "unchanged documents must not be rewritten"
+
+    for query in ('tofu', 'RYŻ', 'mleko kokosowe', 'a"b'):
+        want = [r['name'] for r in ALL_RECIPES if query.lower() in r['content'].lower()]
+        assert store.search('recipe', 'pl', query) == want, f"FTS differs from the scan for {query!r}"
+    assert store.search('recipe', 'pl', 'ab') is None, "short queries fall back to the scan"
+    assert store.with_tag('recipe', 'pl', 'lunch') == [r['name'] for r in ALL_RECIPES if 'lunch' in recipe_tags(r)]
+    name = store.search('recipe', 'pl', 'tofu')[0]
+    assert '<mark>' in store.snippets('recipe', 'pl', 'tofu', [name])[name].lower()
+
+    fewer = Docs(r for r in ALL_RECIPES if r['name'] != name)
+    assert store.sync('recipe', 'pl', fewer, [name]) == 1
+    assert name not in store.search('recipe', 'pl', 'tofu')
+    print(f"  {store.counts()['recipe_pl']} recipes indexed, FTS matches the scan ✓")
+    return True
+
+def test_prefork():
+    """Test shared shopping list files and the pre-fork version broadcast."""
+    import os
+    import signal
+    import tempfile
+    import http.client
+    from pathlib import Path
+    from http.server import BaseHTTPRequestHandler
+    from dashboard import ShoplistStore
+    print("\n[TEST] Pre-fork Workers")
+    if not hasattr(os, 'fork'):
+        print("  ⚠ no os.fork on this platform, skipped")
+        return True
+    from prefork import Prefork
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        # Two workers' stores over the same files, including a compaction by one of them
+        a = ShoplistStore(tmp / "s.json", tmp / "s.log", compact_every=3)
+        b = ShoplistStore(tmp / "s.json", tmp / "s.log", compact_every=3)
+        a.action({'action': 'add_item', 'text': 'tofu'})
+        b.refresh()
+        b.action({'action': 'add_item', 'text': 'ryż'})
+        a.refresh()
+        a.action({'action': 'add_item', 'text': 'miso'})
+        assert not (tmp / "s.log").exists(), "third record should compact the log"
+        b.refresh()
+        assert b.snapshot() == a.snapshot() and b.seq == a.seq == 3
+        assert [i['text'] for i in b.snapshot()['lists'][0]['items']] == ['tofu', 'ryż', 'miso']
+
+        # Two workers on one socket: a write in either is seen by both
+        prefork = Prefork(tmp / "lock")
+
+        class VersionHandler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                body = f"{prefork.worker} {prefork.version.value}".encode()
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                with prefork.write_lock:
+                    prefork.bump()
+                self.do_GET()
+
+        server = HTTPServer(('127.0.0.1', 0), VersionHandler)
+        port = server.server_address[1]
+        master = os.fork()
+        if master == 0:
+            try:
+                prefork.serve(server, 2, interval=0.1)
+            finally:
+                os._exit(0)
+        server.server_close()
+
+        def request(method):
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            conn.request(method, '/')
+            worker, version = conn.getresponse().read().decode().split()
+            conn.close()
+            return worker, int(version)
+
+        try:
+            request('POST')
+            seen = [request('GET') for _ in range(20)]
+        finally:
+            os.kill(master, signal.SIGTERM)
+            os.waitpid(master, 0)
+        assert all(version == 1 for worker, version in seen), seen
+        assert {worker for worker, version in seen} <= {'1', '2'}
+    print(f"  workers {sorted({w for w, v in seen})} all at version 1, shoplist in sync ✓")
+    return True
+
+def test_async_server():
+    """Test the asyncio front end: same routes, keep-alive, idle connections."""
+    import json
+    import socket
+    import http.client
+    from asyncserver import AsyncHTTPServer
+    print("\n[TEST] Asyncio Server")
+
+    server = AsyncHTTPServer(('127.0.0.1', 0), Handler)
+    port = server.server_address[1]
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05})
+    thread.start()
+    idle = []
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        conn.request('GET', '/')
+        resp = conn.getresponse()
+        assert resp.status == 200 and 'CHEN-KIT' in resp.read().decode('utf-8')
+        sock = conn.sock
+        conn.request('GET', f"/api/recipes/{ALL_RECIPES[0]['name']}")
+        resp = conn.getresponse()
+        assert resp.status == 200 and json.loads(resp.read())['name'] == ALL_RECIPES[0]['name']
+        assert conn.sock is sock, "keep-alive connection should be reused"
+        conn.request('DELETE', '/')
+        resp = conn.getresponse()
+        resp.read()
+        assert resp.status == 501
+        conn.close()
+
+        idle = [socket.create_connection(('127.0.0.1', port)) for _ in range(50)]
+        time.sleep(0.2)
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        conn.request('GET', '/api/metrics?format=json')
+        gauges = json.loads(conn.getresponse().read())['gauges']
+        conn.close()
+        assert gauges['open_connections'] >= 51, gauges
+    finally:
+        for s in idle:
+            s.close()
+        server.shutdown()
+        server.server_close()
+        thread.join(5)
+
+    # Handler code, static files included, never runs on the event loop's thread
+    class ThreadRecorder(Handler):
+        seen = []
+
+        def do_GET(self):
+            ThreadRecorder.seen.append(threading.current_thread().name)
+            self.send_body(b'ok', 'text/plain')
+
+    server = AsyncHTTPServer(('127.0.0.1', 0), ThreadRecorder)
+    thread = threading.Thread(target=server.serve_forever, name='event-loop', kwargs={'poll_interval': 0.05})
+    thread.start()
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+        for path in ('/static/dashboard.css', '/'):
+            conn.request('GET', path)
+            conn.getresponse().read()
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(5)
+    assert len(ThreadRecorder.seen) == 2 and 'event-loop' not in ThreadRecorder.seen, ThreadRecorder.seen
+    print(f"  keep-alive reused, {gauges['open_connections']} open connections on one loop ✓")
+    return True
+
+def fetch(path, headers=None):
+    """One request against a fresh single-request server: (status, headers, body)"""
+    import http.client
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.handle_request)
+    thread.start()
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+        conn.request('GET', path, headers=headers or {})
+        resp = conn.getresponse()
+        body = resp.read()
+        conn.close()
+        return resp.status, resp.headers, body
+    finally:
+        thread.join(5)
+        server.server_close()
+
+def test_fragment_rebuild():
+    """Test a cached view is rendered again after sync_data picks up an edit."""
+    from dashboard import RECIPES, sync_data
+    print("\n[TEST] Fragment Rebuild")
+
+    path = "/?view=recipes&q=fragmentowka"
+    page = fetch(path)[2].decode('utf-8')
+    assert "Zupa fragmentowka" not in page
+    assert fetch(path)[2].decode('utf-8') == page, "second render should come from the cache"
+
+    recipe = RECIPES / "zz-test-fragment.md"
+    try:
+        recipe.write_text("# Recipe: Zupa fragmentowka\ntags: [soup]\n\n## Ingredients\n- [ ] Tofu\n",
+                          encoding='utf-8')
+        misses = FRAGMENTS.misses
+        sync_data(recipe)
+        page = fetch(path)[2].decode('utf-8')
+        assert "Zupa fragmentowka" in page, "fragment not rebuilt after the edit"
+        assert FRAGMENTS.misses > misses
+    finally:
+        recipe.unlink(missing_ok=True)
+        sync_data(recipe)
+    assert "Zupa fragmentowka" not in fetch(path)[2].decode('utf-8'), "stale fragment after the delete"
+
+    print("  view re-rendered after sync_data ✓")
+    return True
+
+def test_static_caching():
+    """Test versioned static URLs are immutable and ETags revalidate to 304."""
+    from dashboard import static_url, STATIC_ASSETS
+    print("\n[TEST] Static Caching")
+
+    url = static_url('dashboard.css')
+    etag = STATIC_ASSETS['dashboard.css']['etag']
+    assert url == f"/static/dashboard.css?v={etag}"
+    assert url in fetch("/")[2].decode('utf-8'), "page should link the versioned URL"
+
+    status, headers, body = fetch(url)
+    assert status == 200 and body == STATIC_ASSETS['dashboard.css']['body']
+    assert headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+    assert headers['ETag'] == f'"{etag}"'
+    for path in ("/static/dashboard.css", "/static/dashboard.css?v=0ld"):
+        assert fetch(path)[1]['Cache-Control'] == 'no-cache', f"{path} must revalidate"
+
+    status, headers, body = fetch(url, {'If-None-Match': headers['ETag']})
+    assert status == 304 and body == b'' and headers['ETag'] == f'"{etag}"'
+    assert fetch("/static/dashboard.css", {'If-None-Match': '"0ld"'})[0] == 200
+    assert fetch("/static/nope.css")[0] == 404
+
+    print(f"  {url}: immutable, If-None-Match → 304 ✓")
+    return True
+
+def test_escaped_params():
+    """Test query params echoed into the page are HTML-escaped."""
+    from urllib.parse import quote
+    print("\n[TEST] Escaped Params")
+
+    attack = '"><script>alert(1)</script>'
+    for path in (f"/?view=recipes&id={quote(attack)}", f"/?q={quote(attack)}", f"/?view=knowledge&q={quote(attack)}",
+                 f"/?lang={quote(attack)}"):
+        status, _, body = fetch(path)
+        page = body.decode('utf-8')
+        assert status == 200
+        assert '<script>alert(1)' not in page, f"unescaped param in {path}"
+    assert 'data-selected="&quot;&gt;&lt;script&gt;' in fetch(f"/?view=recipes&id={quote(attack)}")[2].decode()
+    print("  id, q (recipes, knowledge) and lang escaped ✓")
+    return True
+
 def test_http_handler():
     """Test HTTP handler responds correctly."""
     print("\n[TEST] HTTP Handler")
@@ -178,10 +1021,33 @@ def run_all_tests():
         test_data_loading,
         test_recipe_structure,
         test_rules_structure,
+        test_name_maps,
         test_semantic_search,
         test_recipe_scoring,
+        test_cook_index,
+        test_missing_ingredients,
+        test_compression,
+        test_constellation_layout,
+        test_constellation_endpoint,
+        test_json_api,
+        test_sidebar_window,
+        test_derived_cache,
+        test_kitchen_index,
         test_categorization,
         test_forbidden_detection,
+        test_meal_plan,
+        test_shoplist_store,
+        test_synthetic_corpus,
+        test_metrics,
+        test_profiling,
+        test_inbox_watcher,
+        test_file_watcher,
+        test_doc_store,
+        test_prefork,
+        test_async_server,
+        test_static_caching,
+        test_escaped_params,
+        test_fragment_rebuild,
         test_http_handler,
     ]
 
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+CHEN-KIT File Watcher
+Polls the kitchen folders with os.scandir and reports which markdown files
+were added, modified or removed since the last scan. With watchdog installed
+(inotify / FSEvents), events wake the poller at once instead of after a full
+interval; the mtime diff stays the source of truth either way.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Set, Tuple
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+    Observer = None  # type: ignore
+    FileSystemEventHandler = object  # type: ignore
+
+Signature = Tuple[int, int, int]   # (mtime_ns, size, inode)
+
+
+class Changes:
+    """Names (file stems) changed or removed in one folder"""
+    __slots__ = ('changed', 'removed')
+
+    def __init__(self, changed: Iterable[str] = (), removed: Iterable[str] = ()):
+        self.changed: Set[str] = set(changed)
+        self.removed: Set[str] = set(removed)
+
+    def merge(self, other: 'Changes'):
+        """Fold in a later scan: the newest state of each name wins"""
+        self.changed = (self.changed - other.removed) | other.changed
+        self.removed = (self.removed - other.changed) | other.removed
+
+    def __bool__(self):
+        return bool(self.changed or self.removed)
+
+    def __repr__(self):
+        return f"Changes(changed={sorted(self.changed)}, removed={sorted(self.removed)})"
+
+
+def scan(folder: Path) -> Dict[str, Signature]:
+    """Signature of every *.md file in a folder (not recursive; '_' files are skipped like load_folder does)"""
+    found = {}
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.endswith('.md') or name.startswith('_'):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:       # removed between readdir and stat
+                    continue
+                found[name[:-3]] = (st.st_mtime_ns, st.st_size, st.st_ino)
+    except (FileNotFoundError, NotADirectoryError):
+        pass
+    return found
+
+
+class _WakeHandler(FileSystemEventHandler):
+    """Any event just wakes the poller; it works out what changed itself"""
+
+    def __init__(self, wake: threading.Event):
+        self.wake = wake
+
+    def on_any_event(self, event):
+        self.wake.set()
+
+
+class FolderWatcher:
+    """
+    Snapshot of several folders; poll() diffs a fresh scan against it.
+    Cost is one stat() per file per poll; only changed names are reported,
+    so callers re-read just those files.
+    """
+
+    def __init__(self, folders: Dict[str, Path], interval: float = 1.0, settle: float = 0.2):
+        self.folders = folders
+        self.interval = interval
+        self.settle = settle            # wait for a burst (git pull, ingest) to finish before reporting
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.wake = threading.Event()
+        self.thread = None
+        self.mode = None
+        self._observer = None
+        self.snapshot = {key: scan(folder) for key, folder in folders.items()}
+
+    def poll(self, touched: Iterable[Path] = ()) -> Dict[str, Changes]:
+        """Changes since the last poll, keyed like folders.
+
+        Paths in touched are reported as changed even if their signature did
+        not move (a rewrite within one mtime tick that kept the size).
+        """
+        forced = {}
+        for path in touched:
+            path = Path(path)
+            for key, folder in self.folders.items():
+                if path.parent == folder:
+                    forced.setdefault(key, set()).add(path.stem)
+        changes = {}
+        with self.lock:
+            for key, folder in self.folders.items():
+                old, new = self.snapshot[key], scan(folder)
+                self.snapshot[key] = new
+                changed = {name for name, sig in new.items() if old.get(name) != sig}
+                changed |= forced.get(key, set()) & new.keys()
+                found = Changes(changed, old.keys() - new.keys())
+                if found:
+                    changes[key] = found
+        return changes
+
+    def start(self, apply: Callable[[Dict[str, Changes]], None], use_watchdog: bool = True) -> str:
+        """Poll in a daemon thread and hand each settled batch of changes to apply().
+        Returns 'watchdog' or 'polling'."""
+        timeout = self.interval
+        if use_watchdog and WATCHDOG_AVAILABLE:
+            try:
+                self._observer = Observer()
+                for folder in self.folders.values():
+                    # en/ lives inside its parent, which is watched recursively
+                    if folder.is_dir() and folder.parent not in self.folders.values():
+                        self._observer.schedule(_WakeHandler(self.wake), str(folder), recursive=True)
+                self._observer.start()
+                self.mode = 'watchdog'
+                timeout = 10 * self.interval     # events wake it; the timeout is only a safety net
+            except OSError:                      # out of inotify watches, unsupported filesystem
+                self._observer = None
+        if self._observer is None:
+            self.mode = 'polling'
+        self.thread = threading.Thread(target=self._run, args=(apply, timeout), name='chenkit-watcher', daemon=True)
+        self.thread.start()
+        return self.mode
+
+    def stop(self):
+        self.stopped.set()
+        self.wake.set()
+        if self._observer:
+            self._observer.stop()
+            self._observer.join()
+
+    def _run(self, apply, timeout):
+        while not self.stopped.is_set():
+            self.wake.wait(timeout)
+            self.wake.clear()
+            if self.stopped.is_set():
+                break
+            changes = self.poll()
+            if not changes:
+                continue
+            deadline = time.monotonic() + 10 * self.interval
+            while time.monotonic() < deadline and not self.stopped.wait(self.settle):
+                more = self.poll()
+                if not more:
+                    break
+                for key, found in more.items():
+                    if key in changes:
+                        changes[key].merge(found)
+                    else:
+                        changes[key] = found
+            try:
+                apply(changes)
+            except Exception as e:
+                print(f"[CHEN-KIT] Reload failed: {e}")